@@ -30,6 +30,21 @@ if __name__ == "__main__":
     agent_config.update(config.agent)
     if config.train.distributed_batch_size:
         agent_config["batch_size"] = config.train.distributed_batch_size
+    if config.train.replay_ratio:
+        agent_config["replay_ratio"] = config.train.replay_ratio
+
+    resource_manager = (
+        ResourceManager(
+            config.train.num_workers,
+            learner_cores=config.train.learner_cores,
+            actor_threads=config.train.actor_threads
+            if config.train.actor_threads
+            else 1,
+            pin_cores=config.train.pin_cores != False,
+        )
+        if config.train.plan_resource
+        else None
+    )
 
     trans_queue = mp.Queue(10)
     interact_sync_queue = mp.Queue(1)
@@ -67,6 +82,7 @@ if __name__ == "__main__":
             LogManager,
             log_manager_config,
             config_manager,
+            resource_manager,
         ),
     )
     distributed_manager_config = (
@@ -76,21 +92,28 @@ if __name__ == "__main__":
         {"device": "cpu", **agent_config},
         config.train.num_workers,
         "async",
+        0,
+        resource_manager,
     )
     interact = mp.Process(
         target=interact_process,
         args=(
-            DistributedManager,
+            LocalDistributedManager
+            if config.train.distributed_backend == "local"
+            else DistributedManager,
             distributed_manager_config,
             trans_queue,
             interact_sync_queue,
             config.train.run_step,
             config.train.update_period,
+            resource_manager,
         ),
     )
     manage.start()
     interact.start()
     try:
+        if resource_manager:
+            resource_manager.apply("learner")
         agent = Agent(**agent_config)
         assert agent.action_type == env.action_type
         if config.train.load_path:
@@ -0,0 +1,49 @@
+import argparse
+
+import cv2
+import numpy as np
+
+from core.env.utils import ImgProcessor
+from .utils import measure
+
+
+def resize_first(imgs, img_width, img_height):
+    # previous pipeline: resize the RGB images, then convert them to gray.
+    return np.stack(
+        [
+            cv2.cvtColor(
+                cv2.resize(img, dsize=(img_width, img_height)), cv2.COLOR_RGB2GRAY
+            )[None]
+            for img in imgs
+        ]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_envs", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--height", type=int, default=210)
+    parser.add_argument("--width", type=int, default=160)
+    parser.add_argument("--img_height", type=int, default=84)
+    parser.add_argument("--img_width", type=int, default=84)
+    parser.add_argument("--iteration", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=10)
+    args = parser.parse_args()
+
+    img_processor = ImgProcessor(True, args.img_width, args.img_height)
+    print(f"{'num_envs':<10}{'pipeline':<15}{'ms':>10}{'frames/s':>12}")
+    for num_envs in args.num_envs:
+        imgs = np.random.randint(
+            0, 256, size=(num_envs, args.height, args.width, 3), dtype=np.uint8
+        )
+        gray_imgs = np.ascontiguousarray(imgs[..., 0])
+        pipelines = {
+            "resize_first": lambda: resize_first(imgs, args.img_width, args.img_height),
+            "convert_img": lambda: [img_processor.convert_img(img) for img in imgs],
+            "convert_imgs": lambda: img_processor.convert_imgs(imgs),
+            # ALE grayscale observation (obs_type="grayscale")
+            "gray_obs": lambda: img_processor.convert_imgs(gray_imgs),
+        }
+        for name, pipeline in pipelines.items():
+            ms = measure(pipeline, args.iteration, args.warmup)
+            print(f"{num_envs:<10}{name:<15}{ms:>10.3f}{num_envs / ms * 1e3:>12.0f}")
@@ -0,0 +1,66 @@
+import argparse
+
+import numpy as np
+import torch
+
+from core import Agent
+from .utils import measure
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=str, nargs="+", default=["rnd_ppo", "icm_ppo"])
+    parser.add_argument("--head", type=str, default="cnn")
+    parser.add_argument("--batch_norm", type=int, nargs="+", default=[1, 0])
+    parser.add_argument("--n_step", type=int, default=128)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--n_epoch", type=int, default=3)
+    parser.add_argument("--iteration", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--num_threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.num_threads:
+        torch.set_num_threads(args.num_threads)
+
+    state_size, action_size = ([4, 84, 84] if args.head == "cnn" else 8), 4
+    shape = state_size if args.head == "cnn" else [state_size]
+    states = np.random.randint(0, 256, size=(args.n_step + 1, 1, *shape))
+    transitions = [
+        {
+            "state": states[t],
+            "action": np.random.randint(0, action_size, size=(1, 1)),
+            "reward": np.random.random((1, 1)),
+            "next_state": states[t + 1],
+            "done": np.zeros((1, 1)),
+        }
+        for t in range(args.n_step)
+    ]
+
+    def learn(agent):
+        agent.memory.store(transitions)
+        agent.learn()
+
+    print(f"{'agent':<12}{'batch_norm':<12}{'learn (ms)':>12}")
+    for name in args.agents:
+        for batch_norm in args.batch_norm:
+            torch.manual_seed(0)
+            network_key = "rnd_network" if name == "rnd_ppo" else "icm_network"
+            agent = Agent(
+                name,
+                state_size=state_size,
+                action_size=action_size,
+                network="discrete_policy_separate_value",
+                head=args.head,
+                n_step=args.n_step,
+                batch_size=args.batch_size,
+                n_epoch=args.n_epoch,
+                batch_norm=bool(batch_norm),
+                device=args.device,
+                **{network_key: f"{name.split('_')[0]}_{args.head}"},
+            )
+            agent.memory.first_store = False
+
+            learn_ms = measure(lambda: learn(agent), args.iteration, args.warmup)
+            print(f"{name:<12}{batch_norm:<12}{learn_ms:>12.3f}")
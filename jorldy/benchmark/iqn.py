@@ -0,0 +1,61 @@
+import argparse
+
+import numpy as np
+import torch
+
+from core import Agent
+from .utils import measure
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--agents", type=str, nargs="+", default=["iqn", "m_iqn", "rainbow_iqn"]
+    )
+    parser.add_argument("--head", type=str, default="mlp")
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--num_sample", type=int, default=64)
+    parser.add_argument("--iteration", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--num_threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.num_threads:
+        torch.set_num_threads(args.num_threads)
+
+    state_size, action_size = ([4, 84, 84] if args.head == "cnn" else 8), 6
+    shape = state_size if args.head == "cnn" else [state_size]
+    state = np.random.random((1, *shape)).astype(np.float32)
+    transitions = [
+        {
+            "state": np.random.random((1, *shape)),
+            "action": np.random.randint(0, action_size, size=(1, 1)),
+            "reward": np.random.random((1, 1)),
+            "next_state": np.random.random((1, *shape)),
+            "done": np.zeros((1, 1)),
+            "episode": np.zeros((1, 1), dtype=np.int64),
+        }
+        for _ in range(args.batch_size)
+    ]
+
+    print(f"{'agent':<15}{'act (ms)':>10}{'learn (ms)':>12}")
+    for name in args.agents:
+        torch.manual_seed(0)
+        agent = Agent(
+            name,
+            state_size=state_size,
+            action_size=action_size,
+            head=args.head,
+            num_sample=args.num_sample,
+            batch_size=args.batch_size,
+            buffer_size=args.batch_size,
+            device=args.device,
+        )
+        agent.memory.store(transitions)
+
+        act_ms = measure(
+            lambda: agent.act(state, training=False), args.iteration, args.warmup
+        )
+        learn_ms = measure(agent.learn, args.iteration, args.warmup)
+        print(f"{name:<15}{act_ms:>10.3f}{learn_ms:>12.3f}")
@@ -0,0 +1,67 @@
+import argparse
+
+import numpy as np
+import torch
+
+from core import Agent
+from .utils import measure
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--n_step", type=int, default=8)
+    parser.add_argument("--num_sample", type=int, default=30)
+    parser.add_argument("--hidden_size", type=int, default=512)
+    parser.add_argument("--iteration", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--num_threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.num_threads:
+        torch.set_num_threads(args.num_threads)
+
+    state_size, action_size = 8, 4
+    print(f"{'action_type':<15}{'critic_loss_type':<20}{'learn (ms)':>12}")
+    for actor, critic in [
+        ("discrete_policy", "dqn"),
+        ("continuous_policy", "ddpg_critic"),
+    ]:
+        continuous = actor.startswith("continuous")
+        action = (
+            np.random.uniform(-1, 1, size=(1, args.n_step, action_size))
+            if continuous
+            else np.random.randint(0, action_size, size=(1, args.n_step, 1))
+        )
+        transitions = [
+            {
+                "state": np.random.random((1, args.n_step, state_size)),
+                "action": action,
+                "reward": np.random.random((1, args.n_step, 1)),
+                "next_state": np.random.random((1, args.n_step, state_size)),
+                "done": np.zeros((1, args.n_step, 1)),
+                "prob": np.random.uniform(0.1, 1, size=(1, args.n_step, 1)),
+            }
+            for _ in range(args.batch_size)
+        ]
+        for critic_loss_type in ["1step_TD", "retrace"]:
+            torch.manual_seed(0)
+            agent = Agent(
+                "mpo",
+                state_size=state_size,
+                action_size=action_size,
+                hidden_size=args.hidden_size,
+                actor=actor,
+                critic=critic,
+                critic_loss_type=critic_loss_type,
+                n_step=args.n_step,
+                num_sample=args.num_sample,
+                batch_size=args.batch_size,
+                buffer_size=args.batch_size,
+                device=args.device,
+            )
+            agent.memory.store(transitions)
+
+            learn_ms = measure(agent.learn, args.iteration, args.warmup)
+            print(f"{actor.split('_')[0]:<15}{critic_loss_type:<20}{learn_ms:>12.3f}")
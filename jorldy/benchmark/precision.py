@@ -0,0 +1,57 @@
+import argparse
+
+import numpy as np
+import torch
+
+from core import Agent
+from .utils import measure
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agent", type=str, default="dqn")
+    parser.add_argument("--head", type=str, default="cnn")
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--iteration", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--num_threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.num_threads:
+        torch.set_num_threads(args.num_threads)
+
+    state_size, action_size = [4, 84, 84], 6
+    state = np.random.randint(0, 255, size=(1, *state_size)).astype(np.float32)
+    transitions = [
+        {
+            "state": np.random.randint(0, 255, size=(1, *state_size)),
+            "action": np.random.randint(0, action_size, size=(1, 1)),
+            "reward": np.random.random((1, 1)),
+            "next_state": np.random.randint(0, 255, size=(1, *state_size)),
+            "done": np.zeros((1, 1)),
+        }
+        for _ in range(args.batch_size)
+    ]
+
+    print(f"{'precision':<10}{'memory_format':<20}{'act (ms)':>10}{'learn (ms)':>12}")
+    for precision in ["fp32", "bf16"]:
+        for memory_format in ["contiguous_format", "channels_last"]:
+            torch.manual_seed(0)
+            agent = Agent(
+                args.agent,
+                state_size=state_size,
+                action_size=action_size,
+                head=args.head,
+                batch_size=args.batch_size,
+                buffer_size=args.batch_size,
+                device="cpu",
+                precision=precision,
+                memory_format=memory_format,
+            )
+            agent.memory.store(transitions)
+
+            act_ms = measure(
+                lambda: agent.act(state, training=False), args.iteration, args.warmup
+            )
+            learn_ms = measure(agent.learn, args.iteration, args.warmup)
+            print(f"{precision:<10}{memory_format:<20}{act_ms:>10.3f}{learn_ms:>12.3f}")
@@ -0,0 +1,10 @@
+import time
+
+
+def measure(func, iteration, warmup):
+    for _ in range(warmup):
+        func()
+    start = time.perf_counter()
+    for _ in range(iteration):
+        func()
+    return (time.perf_counter() - start) / iteration * 1e3
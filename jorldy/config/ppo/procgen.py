@@ -7,6 +7,8 @@ env = {
     "stack_frame": 4,
     "no_op": False,
     "reward_clip": True,
+    # the number of levels stepped in one batch by each process. ex) --env.num_envs 16
+    "num_envs": 1,
 }
 
 agent = {
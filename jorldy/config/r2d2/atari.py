@@ -0,0 +1,50 @@
+### R2D2 Atari Config ###
+
+env = {
+    # "name": it should be defined in the command. ex) python main.py --config config.AGENT.atari --env.name breakout
+    "render": False,
+    "gray_img": True,
+    "img_width": 84,
+    "img_height": 84,
+    "stack_frame": 4,
+    "no_op": False,
+    "reward_clip": True,
+    "dead_penalty": True,
+}
+
+agent = {
+    "name": "r2d2",
+    "network": "r2d2",
+    "head": "cnn_lstm",
+    "gamma": 0.997,
+    "epsilon_init": 1.0,
+    "epsilon_min": 0.01,
+    "explore_ratio": 0.1,
+    "buffer_size": 25000,
+    "batch_size": 64,
+    "start_train_step": 100000,
+    "target_update_period": 2500,
+    "seq_len": 80,
+    "burn_in": 40,
+    "overlap": 40,
+}
+
+optim = {
+    "name": "adam",
+    "lr": 1e-4,
+    "eps": 1e-3,
+}
+
+train = {
+    "training": True,
+    "load_path": None,
+    "run_step": 30000000,
+    "print_period": 10000,
+    "save_period": 100000,
+    "eval_iteration": 5,
+    "record": True,
+    "record_period": 300000,
+    # distributed setting
+    "update_period": 32,
+    "num_workers": 16,
+}
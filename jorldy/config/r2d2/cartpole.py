@@ -0,0 +1,41 @@
+### R2D2 CartPole Config ###
+
+env = {
+    "name": "cartpole",
+    "action_type": "discrete",
+    "render": False,
+}
+
+agent = {
+    "name": "r2d2",
+    "network": "r2d2",
+    "head": "mlp_lstm",
+    "hidden_size": 64,
+    "gamma": 0.99,
+    "epsilon_init": 1.0,
+    "epsilon_min": 0.01,
+    "explore_ratio": 0.2,
+    "buffer_size": 10000,
+    "batch_size": 32,
+    "start_train_step": 2000,
+    "target_update_period": 500,
+    "seq_len": 16,
+    "burn_in": 4,
+}
+
+optim = {
+    "name": "adam",
+    "lr": 0.0001,
+}
+
+train = {
+    "training": True,
+    "load_path": None,
+    "run_step": 100000,
+    "print_period": 1000,
+    "save_period": 10000,
+    "eval_iteration": 10,
+    # distributed setting
+    "update_period": 32,
+    "num_workers": 8,
+}
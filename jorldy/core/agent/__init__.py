@@ -39,4 +39,29 @@ class Agent:
         if not name in agent_dict.keys():
             print(f"### can use only follows {[opt for opt in agent_dict.keys()]}")
             raise Exception
-        return agent_dict[name](*args, **kwargs)
+        agent = agent_dict[name](*args, **kwargs)
+        if kwargs.get("replay_ratio"):
+            agent.set_replay_ratio(
+                kwargs["replay_ratio"], kwargs.get("replay_tolerance", 0.0)
+            )
+        precision, memory_format = kwargs.get("precision"), kwargs.get("memory_format")
+        if precision or memory_format:
+            agent.set_precision(
+                precision if precision else "fp32",
+                memory_format if memory_format else "contiguous_format",
+            )
+        if kwargs.get("compile"):
+            agent.set_compile(kwargs["compile"])
+        return agent
+
+    @classmethod
+    def for_inference(cls, name, *args, load_path=None, **kwargs):
+        """
+        Build a policy-only agent for acting (actors, evaluation), without the replay memory and the members used only for learning.
+        Agents which support the inference flag skip building target networks and optimizers, and load only the networks used in act.
+        """
+        kwargs["buffer_size"], kwargs["inference"] = 1, True
+        agent = cls(name, *args, **kwargs)
+        if load_path:
+            agent.load(load_path)
+        return agent.set_inference()
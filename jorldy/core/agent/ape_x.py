@@ -6,6 +6,7 @@ import numpy as np
 
 from core.buffer import PERBuffer
 from .dqn import DQN
+from .utils import select_q, select_greedy
 
 
 class ApeX(DQN):
@@ -22,6 +23,7 @@ class ApeX(DQN):
         learn_period (int): period to train (unit: step)
         uniform_sample_prob (float): ratio of uniform random sampling.
         n_step: number of steps in multi-step Q learning.
+            1-step transitions are stored, and n-step returns are computed at sample time, so n_step can be changed without re-collecting data.
     """
 
     def __init__(
@@ -77,7 +79,7 @@ class ApeX(DQN):
 
     def learn(self):
         transitions, weights, indices, sampled_p, mean_p = self.memory.sample(
-            self.beta, self.batch_size
+            self.beta, self.batch_size, self.n_step, self.gamma
         )
         for key in transitions.keys():
             transitions[key] = self.as_tensor(transitions[key])
@@ -87,22 +89,15 @@ class ApeX(DQN):
         reward = transitions["reward"]
         next_state = transitions["next_state"]
         done = transitions["done"]
+        discount = transitions["discount"]
 
-        eye = torch.eye(self.action_size).to(self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state), action)
 
         with torch.no_grad():
             max_Q = torch.max(q).item()
             next_q = self.network(next_state)
-            max_a = torch.argmax(next_q, axis=1)
-            max_one_hot_action = eye[max_a.long()]
-
-            next_target_q = self.target_network(next_state)
-            target_q = (next_target_q * max_one_hot_action).sum(1, keepdims=True)
-
-            for i in reversed(range(self.n_step)):
-                target_q = reward[:, i] + (1 - done[:, i]) * self.gamma * target_q
+            next_target_q = select_greedy(next_q, self.target_network(next_state))
+            target_q = reward + (1 - done) * discount * next_target_q
 
         # Update sum tree
         td_error = abs(target_q - q)
@@ -114,7 +109,7 @@ class ApeX(DQN):
 
         loss = (weights * (td_error ** 2)).mean()
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         torch.nn.utils.clip_grad_norm_(self.network.parameters(), self.clip_grad_norm)
         self.optimizer.step()
 
@@ -144,12 +139,14 @@ class ApeX(DQN):
         self.beta = min(1.0, self.beta + (self.beta_add * delta_t))
 
         if (
-            self.learn_period_stamp >= self.learn_period
-            and self.memory.buffer_counter >= self.batch_size
+            self.memory.buffer_counter >= self.batch_size
             and self.time_t >= self.start_train_step
         ):
-            result = self.learn()
-            self.learn_period_stamp = 0
+            learn_period = self.learn_period_stamp >= self.learn_period
+            for _ in range(self.permit_learn(len(transitions), int(learn_period))):
+                result = self.learn()
+            if learn_period:
+                self.learn_period_stamp = 0
 
         # Process per step if train start
         if self.num_learn > 0 and self.target_update_stamp >= self.target_update_period:
@@ -167,19 +164,10 @@ class ApeX(DQN):
         return self
 
     def interact_callback(self, transition):
+        # the initial priority is computed with the n-step return on the actor side, and the 1-step transition is stored.
         _transition = {}
-        self.tmp_buffer.append(transition)
+        self.tmp_buffer.append(self.tag_episode(transition))
         if len(self.tmp_buffer) == self.tmp_buffer.maxlen:
-            _transition["state"] = self.tmp_buffer[0]["state"]
-            _transition["action"] = self.tmp_buffer[0]["action"]
-            _transition["next_state"] = self.tmp_buffer[-1]["state"]
-
-            for key in self.tmp_buffer[0].keys():
-                if key not in ["state", "action", "next_state"]:
-                    _transition[key] = np.stack(
-                        [t[key] for t in self.tmp_buffer][:-1], axis=1
-                    )
-
             target_q = self.tmp_buffer[-1]["q"]
             for i in reversed(range(self.n_step)):
                 target_q = (
@@ -188,6 +176,7 @@ class ApeX(DQN):
                 )
             priority = abs(target_q - self.tmp_buffer[0]["q"])
 
+            _transition = dict(self.tmp_buffer[0])
             _transition["priority"] = priority
             del _transition["q"]
 
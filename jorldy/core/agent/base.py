@@ -1,8 +1,31 @@
 from abc import *
+import os
+import numpy as np
 import torch
+import torch.distributed as dist
+
+from core.optimizer import DataParallelOptimizer, MixedPrecisionOptimizer
+from core.network.utils import (
+    LossScaler,
+    set_mixed_precision,
+    unscale_grad,
+    set_compile,
+)
+from .utils import RateLimiter
 
 
 class BaseAgent(ABC):
+    rate_limiter = None
+    loss_scaler = None
+    loss_scale_hooks = []
+    # data parallel learners should learn at the same steps, so learn schedule should not depend on the contents of each shard.
+    data_parallel = True
+    # members used in act, which are kept in set_inference.
+    inference_members = ["network"]
+    inference = False
+    # id of the current episode, used to tag transitions in tag_episode.
+    episode_id = None
+
     @abstractmethod
     def act(self, state):
         """
@@ -74,6 +97,20 @@ class BaseAgent(ABC):
     def sync_in(self, weights):
         self.network.load_state_dict(weights)
 
+    def set_replay_ratio(self, replay_ratio, tolerance=0.0):
+        """
+        Keep replay_ratio learns per inserted transition with a rate limiter, instead of learning once per process (or per learn_period).
+        When the learner is ahead of the ratio by more than tolerance, learning is skipped until enough transitions are inserted. Actors are not blocked.
+        """
+        self.rate_limiter = RateLimiter(replay_ratio, tolerance)
+        return self
+
+    def permit_learn(self, num_insert, default=1):
+        """
+        Return the number of learns allowed after num_insert transitions are inserted. Without a rate limiter, default is returned.
+        """
+        return self.rate_limiter.permit(num_insert) if self.rate_limiter else default
+
     def sync_out(self, device="cpu"):
         weights = self.network.state_dict()
         for k, v in weights.items():
@@ -86,5 +123,107 @@ class BaseAgent(ABC):
     def set_distributed(self, *args, **kwargs):
         return self
 
+    def set_precision(self, precision="fp32", memory_format="contiguous_format"):
+        """
+        Run forward of the networks in autocast with precision ('fp32', 'bf16' or 'fp16'), and convert the networks and their inputs to memory_format ('contiguous_format' or 'channels_last').
+        When precision is fp16, losses are scaled once with a dynamic loss scale by scale_loss, and gradients are unscaled on parameters.
+        """
+        loss_scaler = (
+            (self.loss_scaler if self.loss_scaler else LossScaler())
+            if precision == "fp16"
+            else None
+        )
+        for key, value in vars(self).items():
+            if isinstance(value, torch.nn.Module):
+                set_mixed_precision(
+                    value, self.device.type, precision, memory_format, loss_scaler
+                )
+            if isinstance(value, MixedPrecisionOptimizer):
+                value = value.optimizer
+            if isinstance(value, torch.optim.Optimizer):
+                setattr(
+                    self,
+                    key,
+                    MixedPrecisionOptimizer(value, loss_scaler)
+                    if loss_scaler
+                    else value,
+                )
+        # parameters outside of networks (e.g. lagrange multipliers of mpo)
+        for hook in self.loss_scale_hooks:
+            hook.remove()
+        params = [v for v in vars(self).values() if isinstance(v, torch.nn.Parameter)]
+        self.loss_scale_hooks = unscale_grad(params, loss_scaler) if loss_scaler else []
+        self.loss_scaler = loss_scaler
+        return self
+
+    def scale_loss(self, loss):
+        # scale loss once before backward for fp16 precision, gradients are unscaled on parameters.
+        return loss * self.loss_scaler.scale if self.loss_scaler else loss
+
+    def set_compile(self, mode="trace"):
+        """
+        Compile the inference path of the networks used in act ('trace': TorchScript trace, 'compile': torch.compile).
+        The network falls back to eager mode if it is not supported, and is recompiled after its weights are loaded.
+        """
+        for key in ["network", "actor"]:
+            if isinstance(getattr(self, key, None), torch.nn.Module):
+                set_compile(getattr(self, key), mode)
+        return self
+
+    def set_data_parallel(self):
+        """
+        Share the networks of rank 0 with all learners, and average the gradients over learners before each optimizer step.
+        torch.distributed process group should be initialized before calling it.
+        """
+        assert (
+            self.data_parallel
+        ), f"{self.__class__.__name__} does not support data parallel learners."
+        for value in vars(self).values():
+            if isinstance(value, torch.nn.Module):
+                for tensor in value.state_dict().values():
+                    dist.broadcast(tensor, src=0)
+        for key, value in vars(self).items():
+            if isinstance(value, torch.optim.Optimizer):
+                setattr(self, key, DataParallelOptimizer(value))
+        return self
+
+    def set_inference(self):
+        """
+        Drop the members used only for learning (optimizers and the networks not in inference_members), so the agent is light to copy and send to actors.
+        After it, the agent can act, interact_callback and sync_in, but can not learn, save or load.
+        """
+        optimizers = (
+            torch.optim.Optimizer,
+            DataParallelOptimizer,
+            MixedPrecisionOptimizer,
+        )
+        for key, value in list(vars(self).items()):
+            if isinstance(value, optimizers) or (
+                isinstance(value, torch.nn.Module) and key not in self.inference_members
+            ):
+                delattr(self, key)
+        self.inference = True
+        return self
+
     def interact_callback(self, transition):
         return transition
+
+    def tag_episode(self, transition):
+        """
+        Tag a transition with the id of its episode, so that n-step returns can be computed from 1-step transitions at sample time.
+        Ids are drawn randomly at the beginning of each episode to be unique across distributed actors, and per env of vectorized envs.
+        """
+        done = np.asarray(transition["done"]).reshape(len(transition["done"]), -1)
+        if self.episode_id is None or len(self.episode_id) != len(done):
+            self.episode_id = self.new_episode_id(len(done))
+        transition["episode"] = np.broadcast_to(
+            self.episode_id[:, None], done.shape
+        ).copy()
+        end = np.any(done, axis=1)
+        self.episode_id[end] = self.new_episode_id(end.sum())
+        return transition
+
+    def new_episode_id(self, num):
+        # 56-bit ids are non-negative, and -1 is left for empty slots of the buffer.
+        ids = np.frombuffer(os.urandom(8 * num), dtype=np.uint64) >> np.uint64(8)
+        return ids.astype(np.int64)
@@ -5,6 +5,7 @@ import torch.nn.functional as F
 import numpy as np
 
 from .dqn import DQN
+from .utils import project_distribution, select_dist, select_greedy
 
 
 class C51(DQN):
@@ -62,46 +63,20 @@ class C51(DQN):
         logit = self.network(state)
         p_logit, q_action = self.logits2Q(logit)
 
-        action_eye = torch.eye(self.action_size, device=self.device)
-        action_onehot = action_eye[action.long()]
+        p_action = torch.squeeze(select_dist(p_logit, action), 1)
 
-        p_action = torch.squeeze(action_onehot @ p_logit, 1)
-
-        target_dist = torch.zeros(
-            self.batch_size, self.num_support, device=self.device, requires_grad=False
-        )
         with torch.no_grad():
             target_p_logit, target_q_action = self.logits2Q(
                 self.target_network(next_state)
             )
 
-            target_action = torch.argmax(target_q_action, -1, keepdim=True)
-            target_action_onehot = action_eye[target_action.long()]
-            target_p_action = torch.squeeze(target_action_onehot @ target_p_logit, 1)
+            target_p_action = torch.squeeze(
+                select_greedy(target_q_action, target_p_logit), 1
+            )
 
             Tz = reward.expand(-1, self.num_support) + (1 - done) * self.gamma * self.z
-            b = torch.clamp(Tz - self.v_min, 0, self.v_max - self.v_min) / self.delta_z
-            l = torch.floor(b).long()
-            u = torch.ceil(b).long()
-
-            support_eye = torch.eye(self.num_support, device=self.device)
-            l_support_onehot = support_eye[l]
-            u_support_onehot = support_eye[u]
-
-            l_support_binary = torch.unsqueeze(u - b, -1)
-            u_support_binary = torch.unsqueeze(b - l, -1)
-            target_p_action_binary = torch.unsqueeze(target_p_action, -1)
-
-            lluu = (
-                l_support_onehot * l_support_binary
-                + u_support_onehot * u_support_binary
-            )
-            target_dist += done * torch.mean(
-                l_support_onehot * u_support_onehot + lluu, 1
-            )
-            target_dist += (1 - done) * torch.sum(target_p_action_binary * lluu, 1)
-            target_dist /= torch.clamp(
-                torch.sum(target_dist, 1, keepdim=True), min=1e-8
+            target_dist = project_distribution(
+                target_p_action, Tz, done, self.v_min, self.v_max, self.delta_z
             )
 
         max_Q = torch.max(q_action).item()
@@ -110,7 +85,7 @@ class C51(DQN):
 
         loss = -(target_dist * torch.clamp(p_action, min=1e-8).log()).sum(-1).mean()
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -5,6 +5,7 @@ import torch.nn.functional as F
 import os
 
 from core.network import Network
+from core.network.utils import update_target_network
 from core.optimizer import Optimizer
 from core.buffer import ReplayBuffer
 from .base import BaseAgent
@@ -13,6 +14,7 @@ from .utils import OU_Noise
 
 class DDPG(BaseAgent):
     action_type = "continuous"
+    inference_members = ["actor"]
     """Deep deterministic policy gradient (DDPG) agent.
 
     Args:
@@ -33,6 +35,7 @@ class DDPG(BaseAgent):
         sigma (float): diffusion coefficient of the Ornstein-Uhlenbeck process.
         device (str): device to use.
             (e.g. 'cpu' or 'gpu'. None can also be used, and in this case, the cpu is used.)
+        inference (bool): build only the actor used in act, without the critic, the target networks and the optimizers.
     """
 
     def __init__(
@@ -59,6 +62,7 @@ class DDPG(BaseAgent):
         theta=1e-3,
         sigma=2e-3,
         device=None,
+        inference=False,
         **kwargs,
     ):
         self.device = (
@@ -70,26 +74,30 @@ class DDPG(BaseAgent):
         self.actor = Network(
             actor, state_size, action_size, D_hidden=hidden_size, head=head
         ).to(self.device)
-        self.critic = Network(
-            critic, state_size, action_size, D_hidden=hidden_size, head=head
-        ).to(self.device)
-        self.target_actor = Network(
-            actor, state_size, action_size, D_hidden=hidden_size, head=head
-        ).to(self.device)
-        self.target_actor.load_state_dict(self.actor.state_dict())
-        self.target_critic = Network(
-            critic, state_size, action_size, D_hidden=hidden_size, head=head
-        ).to(self.device)
-        self.target_critic.load_state_dict(self.critic.state_dict())
-
-        self.actor_optimizer = Optimizer(
-            optim_config["actor"], self.actor.parameters(), lr=optim_config["actor_lr"]
-        )
-        self.critic_optimizer = Optimizer(
-            optim_config["critic"],
-            self.critic.parameters(),
-            lr=optim_config["critic_lr"],
-        )
+        self.inference = inference
+        if not inference:
+            self.critic = Network(
+                critic, state_size, action_size, D_hidden=hidden_size, head=head
+            ).to(self.device)
+            self.target_actor = Network(
+                actor, state_size, action_size, D_hidden=hidden_size, head=head
+            ).to(self.device)
+            self.target_actor.load_state_dict(self.actor.state_dict())
+            self.target_critic = Network(
+                critic, state_size, action_size, D_hidden=hidden_size, head=head
+            ).to(self.device)
+            self.target_critic.load_state_dict(self.critic.state_dict())
+
+            self.actor_optimizer = Optimizer(
+                optim_config["actor"],
+                self.actor.parameters(),
+                lr=optim_config["actor_lr"],
+            )
+            self.critic_optimizer = Optimizer(
+                optim_config["critic"],
+                self.critic.parameters(),
+                lr=optim_config["critic_lr"],
+            )
 
         self.OU = OU_Noise(action_size, mu, theta, sigma)
 
@@ -128,7 +136,7 @@ class DDPG(BaseAgent):
         critic_loss = F.mse_loss(target_q, q)
 
         self.critic_optimizer.zero_grad()
-        critic_loss.backward()
+        self.scale_loss(critic_loss).backward()
         self.critic_optimizer.step()
 
         max_Q = torch.max(target_q, axis=0).values.cpu().numpy()[0]
@@ -138,7 +146,7 @@ class DDPG(BaseAgent):
         actor_loss = -self.critic(state, action_pred).mean()
 
         self.actor_optimizer.zero_grad()
-        actor_loss.backward()
+        self.scale_loss(actor_loss).backward()
         self.actor_optimizer.step()
 
         self.num_learn += 1
@@ -151,8 +159,7 @@ class DDPG(BaseAgent):
         return result
 
     def update_target_soft(self):
-        for t_p, p in zip(self.target_critic.parameters(), self.critic.parameters()):
-            t_p.data.copy_(self.tau * p.data + (1 - self.tau) * t_p.data)
+        update_target_network(self.target_critic, self.critic, self.tau)
 
     def process(self, transitions, step):
         result = {}
@@ -160,9 +167,9 @@ class DDPG(BaseAgent):
         self.memory.store(transitions)
 
         if self.memory.size >= self.batch_size and step >= self.start_train_step:
-            result = self.learn()
-        if self.num_learn > 0:
-            self.update_target_soft()
+            for _ in range(self.permit_learn(len(transitions))):
+                result = self.learn()
+                self.update_target_soft()
 
         return result
 
@@ -180,6 +187,8 @@ class DDPG(BaseAgent):
         print(f"...Load model from {path}...")
         checkpoint = torch.load(os.path.join(path, "ckpt"), map_location=self.device)
         self.actor.load_state_dict(checkpoint["actor"])
+        if self.inference:
+            return
         self.actor_optimizer.load_state_dict(checkpoint["actor_optimizer"])
 
         self.critic.load_state_dict(checkpoint["critic"])
@@ -4,6 +4,7 @@ torch.backends.cudnn.benchmark = True
 import torch.nn.functional as F
 
 from .dqn import DQN
+from .utils import select_q, select_greedy
 
 
 class Double(DQN):
@@ -21,26 +22,18 @@ class Double(DQN):
         next_state = transitions["next_state"]
         done = transitions["done"]
 
-        eye = torch.eye(self.action_size).to(self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state), action)
 
         with torch.no_grad():
             max_Q = torch.max(q).item()
             next_q = self.network(next_state)
-            max_a = torch.argmax(next_q, axis=1)
-            max_eye = torch.eye(self.action_size).to(self.device)
-            max_one_hot_action = eye[max_a.view(-1).long()]
-
-            next_target_q = self.target_network(next_state)
-            target_q = reward + (next_target_q * max_one_hot_action).sum(
-                1, keepdims=True
-            ) * (self.gamma * (1 - done))
+            next_target_q = select_greedy(next_q, self.target_network(next_state))
+            target_q = reward + next_target_q * (self.gamma * (1 - done))
 
         loss = F.smooth_l1_loss(q, target_q)
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -6,9 +6,11 @@ import numpy as np
 import os
 
 from core.network import Network
+from core.network.utils import update_target_network
 from core.optimizer import Optimizer
 from core.buffer import ReplayBuffer
 from .base import BaseAgent
+from .utils import select_q
 
 
 class DQN(BaseAgent):
@@ -36,6 +38,7 @@ class DQN(BaseAgent):
             (e.g. 'cpu' or 'gpu'. None can also be used, and in this case, the cpu is used.)
         run_step (int): number of run step.
         num_workers: the number of agents in distributed learning
+        inference (bool): build only the network used in act, without the target network and the optimizer.
     """
 
     def __init__(
@@ -58,6 +61,7 @@ class DQN(BaseAgent):
         device=None,
         run_step=1e6,
         num_workers=1,
+        inference=False,
         **kwargs,
     ):
         self.device = (
@@ -70,11 +74,13 @@ class DQN(BaseAgent):
         self.network = Network(
             network, state_size, action_size, D_hidden=hidden_size, head=head
         ).to(self.device)
-        self.target_network = Network(
-            network, state_size, action_size, D_hidden=hidden_size, head=head
-        ).to(self.device)
-        self.target_network.load_state_dict(self.network.state_dict())
-        self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
+        self.inference = inference
+        if not inference:
+            self.target_network = Network(
+                network, state_size, action_size, D_hidden=hidden_size, head=head
+            ).to(self.device)
+            self.target_network.load_state_dict(self.network.state_dict())
+            self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
         self.gamma = gamma
         self.epsilon = epsilon_init
         self.epsilon_init = epsilon_init
@@ -121,9 +127,7 @@ class DQN(BaseAgent):
         next_state = transitions["next_state"]
         done = transitions["done"]
 
-        eye = torch.eye(self.action_size, device=self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state), action)
         with torch.no_grad():
             max_Q = torch.max(q).item()
             next_q = self.target_network(next_state)
@@ -133,7 +137,7 @@ class DQN(BaseAgent):
 
         loss = F.smooth_l1_loss(q, target_q)
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -147,7 +151,7 @@ class DQN(BaseAgent):
         return result
 
     def update_target(self):
-        self.target_network.load_state_dict(self.network.state_dict())
+        update_target_network(self.target_network, self.network)
 
     def process(self, transitions, step):
         result = {}
@@ -159,7 +163,8 @@ class DQN(BaseAgent):
         self.target_update_stamp += delta_t
 
         if self.memory.size >= self.batch_size and self.time_t >= self.start_train_step:
-            result = self.learn()
+            for _ in range(self.permit_learn(len(transitions))):
+                result = self.learn()
 
         # Process per step if train start
         if self.num_learn > 0:
@@ -189,8 +194,9 @@ class DQN(BaseAgent):
         print(f"...Load model from {path}...")
         checkpoint = torch.load(os.path.join(path, "ckpt"), map_location=self.device)
         self.network.load_state_dict(checkpoint["network"])
-        self.target_network.load_state_dict(checkpoint["network"])
-        self.optimizer.load_state_dict(checkpoint["optimizer"])
+        if not self.inference:
+            self.target_network.load_state_dict(checkpoint["network"])
+            self.optimizer.load_state_dict(checkpoint["optimizer"])
 
     def set_distributed(self, id):
         self.epsilon = id / self.num_workers
@@ -7,6 +7,7 @@ import os
 import numpy as np
 
 from .ppo import PPO
+from .utils import unique_observation
 from core.network import Network
 
 
@@ -91,7 +92,15 @@ class ICM_PPO(PPO):
         with torch.no_grad():
             # ICM
             self.icm.update_rms_obs(next_state)
-            r_i, _, _ = self.icm(state, action, next_state, update_ri=True)
+            if self.batch_norm:
+                r_i, _, _ = self.icm(state, action, next_state, update_ri=True)
+            else:
+                # without batch normalization, each observation of the rollout is encoded once.
+                obs, next_idx = unique_observation(state, next_state)
+                state_idx = torch.arange(len(next_idx), device=self.device)
+                r_i, _, _ = self.icm.forward_index(
+                    obs, action, state_idx, next_idx, update_ri=True
+                )
             reward = (
                 self.extrinsic_coeff * reward + self.intrinsic_coeff * r_i.unsqueeze(1)
             )
@@ -159,7 +168,21 @@ class ICM_PPO(PPO):
                 entropy_loss = -m.entropy().mean()
 
                 # ICM
-                _, l_f, l_i = self.icm(_state, _action, _next_state)
+                if self.batch_norm:
+                    _, l_f, l_i = self.icm(_state, _action, _next_state)
+                else:
+                    _idx = torch.as_tensor(idx, device=self.device)
+                    _obs_idx, _inverse = torch.unique(
+                        torch.cat([_idx, next_idx[_idx]]), return_inverse=True
+                    )
+                    _obs = (
+                        [o[_obs_idx] for o in obs]
+                        if isinstance(obs, list)
+                        else obs[_obs_idx]
+                    )
+                    _, l_f, l_i = self.icm.forward_index(
+                        _obs, _action, _inverse[: len(idx)], _inverse[len(idx) :]
+                    )
 
                 loss_origin = (
                     actor_loss
@@ -173,7 +196,7 @@ class ICM_PPO(PPO):
                 )
 
                 self.optimizer.zero_grad(set_to_none=True)
-                loss.backward()
+                self.scale_loss(loss).backward()
                 torch.nn.utils.clip_grad_norm_(
                     self.network.parameters(), self.clip_grad_norm
                 )
@@ -7,6 +7,7 @@ import numpy as np
 from core.network import Network
 from core.optimizer import Optimizer
 from .dqn import DQN
+from .utils import select_dist, select_greedy
 
 
 class IQN(DQN):
@@ -44,12 +45,13 @@ class IQN(DQN):
         self.network = Network(
             network, state_size, action_size, embedding_dim, num_sample, head=head
         ).to(self.device)
-        self.target_network = Network(
-            network, state_size, action_size, embedding_dim, num_sample, head=head
-        ).to(self.device)
-        self.target_network.load_state_dict(self.network.state_dict())
+        if not self.inference:
+            self.target_network = Network(
+                network, state_size, action_size, embedding_dim, num_sample, head=head
+            ).to(self.device)
+            self.target_network.load_state_dict(self.network.state_dict())
 
-        self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
+            self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
 
         self.action_size = action_size
         self.num_support = num_sample
@@ -89,10 +91,7 @@ class IQN(DQN):
         # Get Theta Pred, Tau
         logit, tau = self.network(state)
         logits, q_action = self.logits2Q(logit)
-        action_eye = torch.eye(self.action_size, device=self.device)
-        action_onehot = action_eye[action.long()]
-
-        theta_pred = action_onehot @ logits
+        theta_pred = select_dist(logits, action)
         tau = torch.transpose(tau, 1, 2).contiguous()
 
         with torch.no_grad():
@@ -103,11 +102,8 @@ class IQN(DQN):
             logit_target, _ = self.target_network(next_state)
             logits_target, _ = self.logits2Q(logit_target)
 
-            max_a = torch.argmax(q_next, axis=-1, keepdim=True)
-            max_a_onehot = action_eye[max_a.long()]
-
             theta_target = reward + (1 - done) * self.gamma * torch.squeeze(
-                max_a_onehot @ logits_target, 1
+                select_greedy(q_next, logits_target), 1
             )
             theta_target = torch.unsqueeze(theta_target, 2)
 
@@ -125,7 +121,7 @@ class IQN(DQN):
         min_logit = torch.min(logit).item()
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
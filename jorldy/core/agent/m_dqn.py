@@ -4,7 +4,7 @@ torch.backends.cudnn.benchmark = True
 import torch.nn.functional as F
 
 from .dqn import DQN
-from .utils import stable_scaled_log_softmax, stable_softmax
+from .utils import stable_scaled_log_softmax, stable_softmax, select_q
 
 
 class M_DQN(DQN):
@@ -26,9 +26,7 @@ class M_DQN(DQN):
         next_state = transitions["next_state"]
         done = transitions["done"]
 
-        eye = torch.eye(self.action_size).to(self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state), action)
 
         with torch.no_grad():
             max_Q = torch.max(q).item()
@@ -36,9 +34,7 @@ class M_DQN(DQN):
 
             ############################################ M-DQN ############################################
             target_q = self.target_network(state)
-            log_policy = (
-                stable_scaled_log_softmax(target_q, self.tau) * one_hot_action
-            ).sum(-1, keepdims=True)
+            log_policy = select_q(stable_scaled_log_softmax(target_q, self.tau), action)
             clipped_log_policy = torch.clip(log_policy, min=self.l_0, max=0)
 
             next_log_policy = stable_scaled_log_softmax(next_target_q, self.tau)
@@ -59,7 +55,7 @@ class M_DQN(DQN):
         loss = F.smooth_l1_loss(q, target_q)
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
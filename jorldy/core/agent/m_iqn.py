@@ -4,7 +4,7 @@ torch.backends.cudnn.benchmark = True
 import torch.nn.functional as F
 
 from .iqn import IQN
-from .utils import stable_scaled_log_softmax, stable_softmax
+from .utils import stable_scaled_log_softmax, stable_softmax, select_q, select_dist
 
 
 class M_IQN(IQN):
@@ -29,30 +29,19 @@ class M_IQN(IQN):
         # Get Theta Pred, Tau
         logit, tau = self.network(state)
         logits, q_action = self.logits2Q(logit)
-        action_eye = torch.eye(self.action_size, device=self.device)
-        action_onehot = action_eye[action.long()]
-
-        theta_pred = action_onehot @ logits
+        theta_pred = select_dist(logits, action)
         tau = torch.transpose(tau, 1, 2).contiguous()
 
         with torch.no_grad():
             # Get Theta Target
-            logit_next, _ = self.network(next_state)
-            _, q_next = self.logits2Q(logit_next)
-
             logit_target, _ = self.target_network(next_state)
             logits_target, next_target_q = self.logits2Q(logit_target)
 
-            max_a = torch.argmax(q_next, axis=-1, keepdim=True)
-            max_a_onehot = action_eye[max_a.long()]
-
             ############################################ M-IQN ############################################
-            logit, _ = self.network(state)
-            _, target_q = self.logits2Q(logit)
+            # q of the online network on state is shared with the prediction pass.
+            target_q = q_action.detach()
 
-            log_policy = (
-                stable_scaled_log_softmax(target_q, self.tau) * action_onehot.squeeze()
-            ).sum(-1, keepdims=True)
+            log_policy = select_q(stable_scaled_log_softmax(target_q, self.tau), action)
             clipped_log_policy = torch.clip(log_policy, min=self.l_0, max=0)
 
             munchausen_term = self.alpha * clipped_log_policy
@@ -95,7 +84,7 @@ class M_IQN(IQN):
         min_logit = torch.min(logit).item()
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -6,7 +6,9 @@ import torch.nn.functional as F
 from torch.distributions import Normal
 
 from .base import BaseAgent
+from .utils import retrace
 from core.network import Network
+from core.network.utils import update_target_network
 from core.optimizer import Optimizer
 from core.buffer import ReplayBuffer
 
@@ -45,6 +47,8 @@ class MPO(BaseAgent):
         alpha_sigma (float): Lagrange multipliers of variance part of Gaussian-KL constraint term.
     """
 
+    inference_members = ["actor"]
+
     def __init__(
         self,
         state_size,
@@ -202,15 +206,8 @@ class MPO(BaseAgent):
             with torch.no_grad():
                 mut, stdt = self.target_actor(state)
                 mt = Normal(mut, stdt)
-                zt = torch.atanh(torch.clamp(action, -1 + 1e-7, 1 - 1e-7))
-                log_pit = mt.log_prob(zt)
-                log_probt = log_pit.sum(axis=-1, keepdims=True)
-
                 mu_old = mut
                 std_old = stdt
-                prob_t = torch.exp(log_probt)
-
-                Qt_a = self.target_critic(state, action)
 
                 next_mu, next_std = self.actor(next_state)
                 mn = Normal(next_mu, next_std)
@@ -218,43 +215,34 @@ class MPO(BaseAgent):
                     (self.num_sample,)
                 )  # (num_sample, batch_size * len_tr, dim_action)
                 next_action = torch.tanh(zn)
-
-                Qt_next = self.target_critic(
-                    next_state.unsqueeze(0).repeat_interleave(self.num_sample, dim=0),
-                    next_action,
-                )  # (num_sample, batch_size * len_tr, 1)
+                zt_add = mt.sample(
+                    (self.num_sample,)
+                )  # (num_sample, batch_size * len_tr, dim_action)
+                action_add = torch.tanh(zt_add)
+
+                # the taken actions and the policy samples on state and next_state are evaluated in one batched forward
+                Qt = self.target_critic(
+                    torch.cat(
+                        [
+                            state.expand(self.num_sample + 1, *state.shape),
+                            next_state.expand(self.num_sample, *next_state.shape),
+                        ]
+                    ),
+                    torch.cat([action.unsqueeze(0), action_add, next_action]),
+                )  # (2 * num_sample + 1, batch_size * len_tr, 1)
+                Qt_a, Qt_add, Qt_next = Qt.split([1, self.num_sample, self.num_sample])
+                Qt_a = Qt_a.squeeze(0)
 
                 c = torch.clip(prob / (prob_b + 1e-6), max=1.0)
+                Qret = self.retrace(
+                    reward + self.gamma * (1 - done) * Qt_next.mean(axis=0),
+                    Qt_a,
+                    c,
+                    done,
+                )
 
-                if self.critic_loss_type == "1step_TD":
-                    Qret = reward + self.gamma * (1 - done) * Qt_next.mean(axis=0)
-                elif self.critic_loss_type == "retrace":
-                    Qret = reward + self.gamma * Qt_next.mean(axis=0) * (1 - done)
-
-                    # temporarily reshaping values
-                    # (batch_size * len_tr, item_dim) -> (batch_size, len_tr, item_dim)
-                    Qret = Qret.view(self.batch_size, -1, *Qret.shape[1:])
-                    Qt_a = Qt_a.view(self.batch_size, -1, *Qt_a.shape[1:])
-                    c = c.view(self.batch_size, -1, *c.shape[1:])
-                    done = done.view(self.batch_size, -1, *done.shape[1:])
-                    for i in reversed(range(Qret.shape[1] - 1)):
-                        Qret[:, i] += (
-                            self.gamma
-                            * c[:, i + 1]
-                            * (1 - done[:, i])
-                            * (Qret[:, i + 1] - Qt_a[:, i + 1])
-                        )
-                    Qret = Qret.view(-1, *Qret.shape[2:])
-
-            zt_add = mt.sample(
-                (self.num_sample,)
-            )  # (num_sample, batch_size * len_tr, dim_action)
-            action_add = torch.tanh(zt_add)
             log_pi_add = m.log_prob(zt_add)
             log_prob_add = log_pi_add.sum(axis=-1, keepdims=True)
-            Qt_add = self.target_critic(
-                state.unsqueeze(0).repeat_interleave(self.num_sample, dim=0), action_add
-            )
 
             critic_loss = F.mse_loss(Q, Qret).mean()
 
@@ -304,14 +292,15 @@ class MPO(BaseAgent):
 
         else:
             pi = self.actor(state)  # pi,Q: (batch_size, len_tr, dim_action)
-            pi_next = self.actor(next_state)
             Q = self.critic(state)
             Q_a = Q.gather(1, action.long())
 
             with torch.no_grad():
                 # calculate Q_ret using Retrace
-                Qt = self.target_critic(state)  # Q_target
-                Qt_next = self.target_critic(next_state)
+                pi_next = self.actor(next_state)
+                Qt, Qt_next = self.target_critic(torch.cat([state, next_state])).split(
+                    len(state)
+                )  # Q_target
                 pit = self.target_actor(state)
 
                 Qt_a = Qt.gather(1, action.long())
@@ -323,31 +312,15 @@ class MPO(BaseAgent):
                     prob_t / (prob_b + 1e-6), max=1.0
                 )  # (batch_size * len_tr, 1), prod of importance ratio and gamma
 
-                if self.critic_loss_type == "1step_TD":
-                    Qret = reward + self.gamma * (1 - done) * torch.sum(
-                        pi_next * Qt_next, axis=-1, keepdim=True
-                    )
-                elif self.critic_loss_type == "retrace":
-                    Qret = reward + self.gamma * torch.sum(
-                        pi_next * Qt_next, axis=-1, keepdim=True
-                    ) * (1 - done)
-
-                    # temporarily reshaping values
-                    # (batch_size * len_tr, item_dim) -> (batch_size, len_tr, item_dim)
-                    Qret = Qret.view(self.batch_size, -1, *Qret.shape[1:])
-                    Qt_a = Qt_a.view(self.batch_size, -1, *Qt_a.shape[1:])
-                    c = c.view(self.batch_size, -1, *c.shape[1:])
-                    done = done.view(self.batch_size, -1, *done.shape[1:])
-                    for i in reversed(
-                        range(Qret.shape[1] - 1)
-                    ):  # along the trajectory length
-                        Qret[:, i] += (
-                            self.gamma
-                            * c[:, i + 1]
-                            * (Qret[:, i + 1] - Qt_a[:, i + 1])
-                            * (1 - done[:, i])
-                        )
-                    Qret = Qret.view(-1, *Qret.shape[2:])
+                Qret = self.retrace(
+                    reward
+                    + self.gamma
+                    * (1 - done)
+                    * torch.sum(pi_next * Qt_next, axis=-1, keepdim=True),
+                    Qt_a,
+                    c,
+                    done,
+                )
 
                 pi_old = pit
 
@@ -381,7 +354,7 @@ class MPO(BaseAgent):
 
         self.actor_optimizer.zero_grad()
         self.critic_optimizer.zero_grad()
-        loss.backward()
+        self.scale_loss(loss).backward()
         torch.nn.utils.clip_grad_norm_(self.actor.parameters(), self.clip_grad_norm)
         torch.nn.utils.clip_grad_norm_(self.critic.parameters(), self.clip_grad_norm)
         self.actor_optimizer.step()
@@ -406,6 +379,20 @@ class MPO(BaseAgent):
 
         return result
 
+    def retrace(self, Qret, Qt_a, c, done):
+        if self.critic_loss_type == "1step_TD":
+            return Qret
+        # (batch_size * len_tr, 1) -> (batch_size, len_tr, 1)
+        shape = (self.batch_size, -1, 1)
+        Qret = retrace(
+            Qret.view(shape),
+            Qt_a.view(shape),
+            c.view(shape),
+            done.view(shape),
+            self.gamma,
+        )
+        return Qret.view(-1, 1)
+
     # reset Lagrange multipliers: eta, alpha_{mu, sigma}
     def reset_lgr_muls(self):
         self.eta.data = torch.max(self.eta, self.min_eta)
@@ -413,8 +400,8 @@ class MPO(BaseAgent):
         self.alpha_sigma.data = torch.max(self.alpha_sigma, self.min_alpha_sigma)
 
     def update_target(self):
-        self.target_actor.load_state_dict(self.actor.state_dict())
-        self.target_critic.load_state_dict(self.critic.state_dict())
+        update_target_network(self.target_actor, self.actor)
+        update_target_network(self.target_critic, self.critic)
 
     def save(self, path):
         print(f"...Save model to {path}...")
@@ -1,5 +1,3 @@
-from collections import deque
-import numpy as np
 import torch
 
 torch.backends.cudnn.benchmark = True
@@ -7,6 +5,7 @@ import torch.nn.functional as F
 
 from core.buffer import ReplayBuffer
 from .dqn import DQN
+from .utils import select_q
 
 
 class Multistep(DQN):
@@ -14,19 +13,16 @@ class Multistep(DQN):
 
     Args:
         n_step (int): number of steps in multi-step Q learning.
+            1-step transitions are stored, and n-step returns are computed at sample time, so n_step can be changed without re-collecting data.
     """
 
     def __init__(self, n_step=5, **kwargs):
         super(Multistep, self).__init__(**kwargs)
         self.n_step = n_step
-        self.tmp_buffer = deque(maxlen=n_step)
         self.memory = ReplayBuffer(self.buffer_size)
 
     def learn(self):
-        #         shapes of 1-step implementations: (batch_size, dimension_data)
-        #         shapes of multistep implementations: (batch_size, steps, dimension_data)
-
-        transitions = self.memory.sample(self.batch_size)
+        transitions = self.memory.sample(self.batch_size, self.n_step, self.gamma)
         for key in transitions.keys():
             transitions[key] = self.as_tensor(transitions[key])
 
@@ -35,22 +31,19 @@ class Multistep(DQN):
         reward = transitions["reward"]
         next_state = transitions["next_state"]
         done = transitions["done"]
+        discount = transitions["discount"]
 
-        eye = torch.eye(self.action_size).to(self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state), action)
         with torch.no_grad():
             max_Q = torch.max(q).item()
             next_q = self.target_network(next_state)
-            target_q = next_q.max(1, keepdims=True).values
-
-            for i in reversed(range(self.n_step)):
-                target_q = reward[:, i] + (1 - done[:, i]) * self.gamma * target_q
+            max_next_q = next_q.max(1, keepdims=True).values
+            target_q = reward + (1 - done) * discount * max_next_q
 
         loss = F.smooth_l1_loss(q, target_q)
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -73,7 +66,8 @@ class Multistep(DQN):
         self.target_update_stamp += delta_t
 
         if self.memory.size >= self.batch_size and self.time_t >= self.start_train_step:
-            result = self.learn()
+            for _ in range(self.permit_learn(len(transitions))):
+                result = self.learn()
 
         # Process per step if train start
         if self.num_learn > 0:
@@ -86,17 +80,4 @@ class Multistep(DQN):
         return result
 
     def interact_callback(self, transition):
-        _transition = {}
-        self.tmp_buffer.append(transition)
-        if len(self.tmp_buffer) == self.n_step:
-            _transition["state"] = self.tmp_buffer[0]["state"]
-            _transition["action"] = self.tmp_buffer[0]["action"]
-            _transition["next_state"] = self.tmp_buffer[-1]["next_state"]
-
-            for key in self.tmp_buffer[0].keys():
-                if key not in ["state", "action", "next_state"]:
-                    _transition[key] = np.stack(
-                        [t[key] for t in self.tmp_buffer], axis=1
-                    )
-
-        return _transition
+        return self.tag_episode(transition)
@@ -7,6 +7,7 @@ import numpy as np
 from core.network import Network
 from core.optimizer import Optimizer
 from .dqn import DQN
+from .utils import select_q
 
 
 class Noisy(DQN):
@@ -52,17 +53,18 @@ class Noisy(DQN):
             D_hidden=hidden_size,
             head=head,
         ).to(self.device)
-        self.target_network = Network(
-            network,
-            state_size,
-            action_size,
-            noise_type,
-            D_hidden=hidden_size,
-            head=head,
-        ).to(self.device)
-        self.target_network.load_state_dict(self.network.state_dict())
-
-        self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
+        if not self.inference:
+            self.target_network = Network(
+                network,
+                state_size,
+                action_size,
+                noise_type,
+                D_hidden=hidden_size,
+                head=head,
+            ).to(self.device)
+            self.target_network.load_state_dict(self.network.state_dict())
+
+            self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
 
     @torch.no_grad()
     def act(self, state, training=True):
@@ -91,9 +93,7 @@ class Noisy(DQN):
         next_state = transitions["next_state"]
         done = transitions["done"]
 
-        eye = torch.eye(self.action_size).to(self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state, True) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state, True), action)
 
         with torch.no_grad():
             max_Q = torch.max(q).item()
@@ -105,7 +105,7 @@ class Noisy(DQN):
         loss = F.smooth_l1_loss(q, target_q)
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -131,7 +131,8 @@ class Noisy(DQN):
         self.target_update_stamp += delta_t
 
         if self.memory.size >= self.batch_size and self.time_t >= self.start_train_step:
-            result = self.learn()
+            for _ in range(self.permit_learn(len(transitions))):
+                result = self.learn()
 
         # Process per step if train start
         if self.num_learn > 0:
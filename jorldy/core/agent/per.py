@@ -4,6 +4,7 @@ torch.backends.cudnn.benchmark = True
 
 from .dqn import DQN
 from core.buffer import PERBuffer
+from .utils import select_q, select_greedy
 
 
 class PER(DQN):
@@ -46,21 +47,13 @@ class PER(DQN):
         next_state = transitions["next_state"]
         done = transitions["done"]
 
-        eye = torch.eye(self.action_size).to(self.device)
-        one_hot_action = eye[action.view(-1).long()]
-        q = (self.network(state) * one_hot_action).sum(1, keepdims=True)
+        q = select_q(self.network(state), action)
 
         with torch.no_grad():
             max_Q = torch.max(q).item()
             next_q = self.network(next_state)
-            max_a = torch.argmax(next_q, axis=1)
-            max_eye = torch.eye(self.action_size).to(self.device)
-            max_one_hot_action = eye[max_a.view(-1).long()]
-
-            next_target_q = self.target_network(next_state)
-            target_q = reward + (next_target_q * max_one_hot_action).sum(
-                1, keepdims=True
-            ) * (self.gamma * (1 - done))
+            next_target_q = select_greedy(next_q, self.target_network(next_state))
+            target_q = reward + next_target_q * (self.gamma * (1 - done))
 
         # Update sum tree
         td_error = abs(target_q - q)
@@ -72,7 +65,7 @@ class PER(DQN):
 
         loss = (weights * (td_error ** 2)).mean()
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -100,13 +93,12 @@ class PER(DQN):
         # Annealing beta
         self.beta = min(1.0, self.beta + (self.beta_add * delta_t))
 
-        if (
-            self.learn_period_stamp >= self.learn_period
-            and self.memory.size >= self.batch_size
-            and self.time_t >= self.start_train_step
-        ):
-            result = self.learn()
-            self.learn_period_stamp = 0
+        if self.memory.size >= self.batch_size and self.time_t >= self.start_train_step:
+            learn_period = self.learn_period_stamp >= self.learn_period
+            for _ in range(self.permit_learn(len(transitions), int(learn_period))):
+                result = self.learn()
+            if learn_period:
+                self.learn_period_stamp = 0
 
         # Process per step if train start
         if self.num_learn > 0:
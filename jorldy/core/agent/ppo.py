@@ -150,7 +150,7 @@ class PPO(REINFORCE):
                 )
 
                 self.optimizer.zero_grad(set_to_none=True)
-                loss.backward()
+                self.scale_loss(loss).backward()
                 torch.nn.utils.clip_grad_norm_(
                     self.network.parameters(), self.clip_grad_norm
                 )
@@ -5,6 +5,7 @@ import torch.nn.functional as F
 import numpy as np
 
 from .dqn import DQN
+from .utils import select_dist, select_greedy
 
 
 class QRDQN(DQN):
@@ -60,10 +61,7 @@ class QRDQN(DQN):
         # Get Theta Pred
         logit = self.network(state)
         logits, q_action = self.logits2Q(logit)
-        action_eye = torch.eye(self.action_size, device=self.device)
-        action_onehot = action_eye[action.long()]
-
-        theta_pred = action_onehot @ logits
+        theta_pred = select_dist(logits, action)
 
         with torch.no_grad():
             # Get Theta Target
@@ -73,11 +71,8 @@ class QRDQN(DQN):
             logit_target = self.target_network(next_state)
             logits_target, _ = self.logits2Q(logit_target)
 
-            max_a = torch.argmax(q_next, axis=-1, keepdim=True)
-            max_a_onehot = action_eye[max_a.long()]
-
             theta_target = reward + (1 - done) * self.gamma * torch.squeeze(
-                max_a_onehot @ logits_target, 1
+                select_greedy(q_next, logits_target), 1
             )
             theta_target = torch.unsqueeze(theta_target, 2)
 
@@ -95,7 +90,7 @@ class QRDQN(DQN):
         min_logit = torch.min(logit).item()
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -0,0 +1,124 @@
+import torch
+
+torch.backends.cudnn.benchmark = True
+import torch.nn.functional as F
+import numpy as np
+
+from core.buffer import SequenceBuffer
+from .dqn import DQN
+
+
+class R2D2(DQN):
+    """Recurrent replay DQN (R2D2) agent.
+
+    Args:
+        network (str): key of recurrent network class in _network_dict.txt.
+        head (str): key of recurrent head in _head_dict.txt. One of ['mlp_lstm', 'cnn_lstm']
+        seq_len (int): length of the stored sequences, including burn-in.
+        burn_in (int): the number of steps at the beginning of each sequence only used to unroll the stored hidden state.
+            (sequences which start at the beginning of an episode are learned from the first step)
+        overlap (int): the number of steps shared by adjacent sequences. If None, burn_in is used.
+    """
+
+    def __init__(
+        self,
+        state_size,
+        action_size,
+        network="r2d2",
+        head="mlp_lstm",
+        seq_len=80,
+        burn_in=40,
+        overlap=None,
+        **kwargs,
+    ):
+        super(R2D2, self).__init__(
+            state_size, action_size, network=network, head=head, **kwargs
+        )
+        assert 0 <= burn_in < seq_len
+        self.seq_len = seq_len
+        self.burn_in = burn_in
+        self.overlap = burn_in if overlap is None else overlap
+        self.memory = SequenceBuffer(self.buffer_size, seq_len, self.overlap)
+        self.hidden = None
+
+    @torch.no_grad()
+    def act(self, state, training=True):
+        self.network.train(training)
+        epsilon = self.epsilon if training else self.epsilon_eval
+
+        # hidden state is carried across act calls, and reset at the end of each episode in interact_callback.
+        state = self.as_tensor(state)
+        if self.hidden is not None and self.hidden[0].shape[1] != state.shape[0]:
+            self.hidden = None
+        q, hidden_in, self.hidden = self.network(state.unsqueeze(1), self.hidden)
+
+        if np.random.random() < epsilon:
+            action = np.random.randint(0, self.action_size, size=(state.shape[0], 1))
+        else:
+            action = torch.argmax(q[:, -1], -1, keepdim=True).cpu().numpy()
+        hidden = torch.cat(hidden_in).transpose(0, 1).cpu().numpy()
+        return {"action": action, "hidden": hidden}
+
+    def learn(self):
+        transitions = self.memory.sample(self.batch_size)
+        for key in transitions.keys():
+            transitions[key] = self.as_tensor(transitions[key])
+
+        state = transitions["state"]
+        action = transitions["action"]
+        reward = transitions["reward"]
+        next_state = transitions["next_state"]
+        done = transitions["done"]
+        mask = transitions["mask"]
+        start = transitions["start"]
+        hidden = transitions["hidden"].transpose(0, 1).contiguous()
+        hidden_in = (hidden[:1], hidden[1:])
+
+        # burn-in: gradients through the stored hidden state only flow for sequences at the beginning of an episode.
+        if self.burn_in > 0:
+            q_burn_in, _, hidden_out = self.network(state[:, : self.burn_in], hidden_in)
+            start_mask = start.bool().view(1, -1, 1)
+            hidden_out = tuple(
+                torch.where(start_mask, h, h.detach()) for h in hidden_out
+            )
+            q = self.network(state[:, self.burn_in :], hidden_out)[0]
+            q = torch.cat([q_burn_in, q], 1)
+        else:
+            q = self.network(state, hidden_in)[0]
+        q = q.gather(-1, action.long())
+
+        with torch.no_grad():
+            max_Q = torch.max(q).item()
+            next_q, _, _ = self.target_network(
+                torch.cat([state, next_state], 1), hidden_in
+            )
+            target_q = (
+                reward
+                + (1 - done) * self.gamma * next_q[:, 1:].max(-1, keepdims=True).values
+            )
+            learn_mask = torch.arange(self.seq_len, device=self.device) >= self.burn_in
+            learn_mask = mask * (
+                learn_mask.view(1, -1, 1) | start.bool().view(-1, 1, 1)
+            )
+
+        loss = (F.smooth_l1_loss(q, target_q, reduction="none") * learn_mask).sum()
+        loss = loss / learn_mask.sum().clamp(min=1)
+        self.optimizer.zero_grad(set_to_none=True)
+        self.scale_loss(loss).backward()
+        self.optimizer.step()
+
+        self.num_learn += 1
+
+        result = {
+            "loss": loss.item(),
+            "epsilon": self.epsilon,
+            "max_Q": max_Q,
+        }
+
+        return result
+
+    def interact_callback(self, transition):
+        if self.hidden is not None:
+            keep = self.as_tensor(np.logical_not(transition["done"])).view(1, -1, 1)
+            self.hidden = tuple(h * keep for h in self.hidden)
+        return self.memory.build(transition)
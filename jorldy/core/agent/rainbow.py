@@ -1,4 +1,3 @@
-from collections import deque
 import torch
 
 torch.backends.cudnn.benchmark = True
@@ -9,6 +8,7 @@ from core.network import Network
 from core.optimizer import Optimizer
 from core.buffer import PERBuffer
 from .dqn import DQN
+from .utils import project_distribution, select_dist, select_greedy
 
 
 class Rainbow(DQN):
@@ -28,6 +28,7 @@ class Rainbow(DQN):
         start_train_step (int): steps to start learning.
         target_update_period (int): period to update the target network. (unit: step)
         n_step: number of steps in multi-step Q learning.
+            1-step transitions are stored, and n-step returns are computed at sample time, so n_step can be changed without re-collecting data.
         alpha (float): prioritization exponent.
         beta (float): initial value of degree to use importance sampling.
         learn_period (int): period to train (unit: step)
@@ -40,6 +41,7 @@ class Rainbow(DQN):
         device (str): device to use.
             (e.g. 'cpu' or 'gpu'. None can also be used, and in this case, the cpu is used.)
         run_step (int): number of run step.
+        inference (bool): build only the network used in act, without the target network and the optimizer.
     """
 
     def __init__(
@@ -70,6 +72,7 @@ class Rainbow(DQN):
         num_support=51,
         device=None,
         run_step=1e6,
+        inference=False,
         **kwargs,
     ):
         self.device = (
@@ -87,17 +90,19 @@ class Rainbow(DQN):
             D_hidden=hidden_size,
             head=head,
         ).to(self.device)
-        self.target_network = Network(
-            network,
-            state_size,
-            action_size,
-            num_support,
-            noise_type,
-            D_hidden=hidden_size,
-            head=head,
-        ).to(self.device)
-        self.target_network.load_state_dict(self.network.state_dict())
-        self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
+        self.inference = inference
+        if not inference:
+            self.target_network = Network(
+                network,
+                state_size,
+                action_size,
+                num_support,
+                noise_type,
+                D_hidden=hidden_size,
+                head=head,
+            ).to(self.device)
+            self.target_network.load_state_dict(self.network.state_dict())
+            self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
         self.gamma = gamma
         self.batch_size = batch_size
         self.start_train_step = start_train_step
@@ -108,7 +113,6 @@ class Rainbow(DQN):
 
         # MultiStep
         self.n_step = n_step
-        self.tmp_buffer = deque(maxlen=n_step)
 
         # PER
         self.alpha = alpha
@@ -149,7 +153,7 @@ class Rainbow(DQN):
 
     def learn(self):
         transitions, weights, indices, sampled_p, mean_p = self.memory.sample(
-            self.beta, self.batch_size
+            self.beta, self.batch_size, self.n_step, self.gamma
         )
         for key in transitions.keys():
             transitions[key] = self.as_tensor(transitions[key])
@@ -159,60 +163,27 @@ class Rainbow(DQN):
         reward = transitions["reward"]
         next_state = transitions["next_state"]
         done = transitions["done"]
+        discount = transitions["discount"]
 
         logit = self.network(state, True)
         p_logit, q_action = self.logits2Q(logit)
 
-        action_eye = torch.eye(self.action_size).to(self.device)
-        action_onehot = action_eye[action.long()]
-
-        p_action = torch.squeeze(action_onehot @ p_logit, 1)
+        p_action = torch.squeeze(select_dist(p_logit, action), 1)
 
-        target_dist = torch.zeros(
-            self.batch_size, self.num_support, device=self.device, requires_grad=False
-        )
         with torch.no_grad():
             # Double
             _, next_q_action = self.logits2Q(self.network(next_state, True))
 
             target_p_logit, _ = self.logits2Q(self.target_network(next_state, True))
 
-            target_action = torch.argmax(next_q_action, -1, keepdim=True)
-            target_action_onehot = action_eye[target_action.long()]
-            target_p_action = torch.squeeze(target_action_onehot @ target_p_logit, 1)
-
-            Tz = self.z
-            for i in reversed(range(self.n_step)):
-                Tz = (
-                    reward[:, i].expand(-1, self.num_support)
-                    + (1 - done[:, i]) * self.gamma * Tz
-                )
-
-            b = torch.clamp(Tz - self.v_min, 0, self.v_max - self.v_min) / self.delta_z
-            l = torch.floor(b).long()
-            u = torch.ceil(b).long()
-
-            support_eye = torch.eye(self.num_support, device=self.device)
-            l_support_onehot = support_eye[l]
-            u_support_onehot = support_eye[u]
-
-            l_support_binary = torch.unsqueeze(u - b, -1)
-            u_support_binary = torch.unsqueeze(b - l, -1)
-            target_p_action_binary = torch.unsqueeze(target_p_action, -1)
-
-            lluu = (
-                l_support_onehot * l_support_binary
-                + u_support_onehot * u_support_binary
+            target_p_action = torch.squeeze(
+                select_greedy(next_q_action, target_p_logit), 1
             )
 
-            target_dist += done[:, 0, :] * torch.mean(
-                l_support_onehot * u_support_onehot + lluu, 1
-            )
-            target_dist += (1 - done[:, 0, :]) * torch.sum(
-                target_p_action_binary * lluu, 1
-            )
-            target_dist /= torch.clamp(
-                torch.sum(target_dist, 1, keepdim=True), min=1e-8
+            Tz = reward.expand(-1, self.num_support) + (1 - done) * discount * self.z
+
+            target_dist = project_distribution(
+                target_p_action, Tz, done, self.v_min, self.v_max, self.delta_z
             )
 
         max_Q = torch.max(q_action).item()
@@ -231,7 +202,7 @@ class Rainbow(DQN):
         loss = (weights * KL).mean()
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -262,12 +233,14 @@ class Rainbow(DQN):
         self.beta = min(1.0, self.beta + (self.beta_add * delta_t))
 
         if (
-            self.learn_period_stamp >= self.learn_period
-            and self.memory.buffer_counter >= self.batch_size
+            self.memory.buffer_counter >= self.batch_size
             and self.time_t >= self.start_train_step
         ):
-            result = self.learn()
-            self.learn_period_stamp = 0
+            learn_period = self.learn_period_stamp >= self.learn_period
+            for _ in range(self.permit_learn(len(transitions), int(learn_period))):
+                result = self.learn()
+            if learn_period:
+                self.learn_period_stamp = 0
 
         # Process per step if train start
         if self.num_learn > 0 and self.target_update_stamp >= self.target_update_period:
@@ -286,17 +259,4 @@ class Rainbow(DQN):
         return p_logit, q_action
 
     def interact_callback(self, transition):
-        _transition = {}
-        self.tmp_buffer.append(transition)
-        if len(self.tmp_buffer) == self.n_step:
-            _transition["state"] = self.tmp_buffer[0]["state"]
-            _transition["action"] = self.tmp_buffer[0]["action"]
-            _transition["next_state"] = self.tmp_buffer[-1]["next_state"]
-
-            for key in self.tmp_buffer[0].keys():
-                if key not in ["state", "action", "next_state"]:
-                    _transition[key] = np.stack(
-                        [t[key] for t in self.tmp_buffer], axis=1
-                    )
-
-        return _transition
+        return self.tag_episode(transition)
@@ -1,4 +1,3 @@
-from collections import deque
 import torch
 
 torch.backends.cudnn.benchmark = True
@@ -9,6 +8,7 @@ from core.network import Network
 from core.optimizer import Optimizer
 from core.buffer import PERBuffer
 from .rainbow import Rainbow
+from .utils import select_dist, select_greedy
 
 
 class RainbowIQN(Rainbow):
@@ -28,6 +28,7 @@ class RainbowIQN(Rainbow):
         start_train_step (int): steps to start learning.
         target_update_period (int): period to update the target network. (unit: step)
         n_step: number of steps in multi-step Q learning.
+            1-step transitions are stored, and n-step returns are computed at sample time, so n_step can be changed without re-collecting data.
         alpha (float): prioritization exponent.
         beta (float): initial value of degree to use importance sampling.
         learn_period (int): period to train (unit: step)
@@ -40,6 +41,7 @@ class RainbowIQN(Rainbow):
         sample_max (float): quantile maximum thresholds (tau_max).
         device (str): device to use. (e.g. 'cpu' or 'gpu'. None can also be used, and in this case, the cpu is used.)
         run_step (int): number of run step.
+        inference (bool): build only the network used in act, without the target network and the optimizer.
     """
 
     def __init__(
@@ -72,6 +74,7 @@ class RainbowIQN(Rainbow):
         sample_max=1.0,
         device=None,
         run_step=1e6,
+        inference=False,
         **kwargs,
     ):
         self.device = (
@@ -90,18 +93,20 @@ class RainbowIQN(Rainbow):
             D_hidden=hidden_size,
             head=head,
         ).to(self.device)
-        self.target_network = Network(
-            network,
-            state_size,
-            action_size,
-            embedding_dim,
-            num_sample,
-            noise_type,
-            D_hidden=hidden_size,
-            head=head,
-        ).to(self.device)
-        self.target_network.load_state_dict(self.network.state_dict())
-        self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
+        self.inference = inference
+        if not inference:
+            self.target_network = Network(
+                network,
+                state_size,
+                action_size,
+                embedding_dim,
+                num_sample,
+                noise_type,
+                D_hidden=hidden_size,
+                head=head,
+            ).to(self.device)
+            self.target_network.load_state_dict(self.network.state_dict())
+            self.optimizer = Optimizer(**optim_config, params=self.network.parameters())
         self.gamma = gamma
         self.explore_step = run_step * explore_ratio
         self.batch_size = batch_size
@@ -113,7 +118,6 @@ class RainbowIQN(Rainbow):
 
         # MultiStep
         self.n_step = n_step
-        self.tmp_buffer = deque(maxlen=n_step)
 
         # PER
         self.alpha = alpha
@@ -153,7 +157,7 @@ class RainbowIQN(Rainbow):
 
     def learn(self):
         transitions, weights, indices, sampled_p, mean_p = self.memory.sample(
-            self.beta, self.batch_size
+            self.beta, self.batch_size, self.n_step, self.gamma
         )
         for key in transitions.keys():
             transitions[key] = self.as_tensor(transitions[key])
@@ -163,14 +167,12 @@ class RainbowIQN(Rainbow):
         reward = transitions["reward"]
         next_state = transitions["next_state"]
         done = transitions["done"]
+        discount = transitions["discount"]
 
         # Get Theta Pred, Tau
         logit, tau = self.network(state, True)
         logits, q_action = self.logits2Q(logit)
-        action_eye = torch.eye(self.action_size, device=self.device)
-        action_onehot = action_eye[action.long()]
-
-        theta_pred = action_onehot @ logits
+        theta_pred = select_dist(logits, action)
         tau = torch.transpose(tau, 1, 2).contiguous()
 
         with torch.no_grad():
@@ -181,14 +183,8 @@ class RainbowIQN(Rainbow):
             logit_target, _ = self.target_network(next_state, True)
             logits_target, _ = self.logits2Q(logit_target)
 
-            max_a = torch.argmax(q_next, axis=-1, keepdim=True)
-            max_a_onehot = action_eye[max_a.long()]
-
-            theta_target = torch.squeeze(max_a_onehot @ logits_target, 1)
-            for i in reversed(range(self.n_step)):
-                theta_target = (
-                    reward[:, i] + (1 - done[:, i]) * self.gamma * theta_target
-                )
+            theta_target = torch.squeeze(select_greedy(q_next, logits_target), 1)
+            theta_target = reward + (1 - done) * discount * theta_target
             theta_target = torch.unsqueeze(theta_target, 2)
 
         error_loss = theta_target - theta_pred
@@ -215,7 +211,7 @@ class RainbowIQN(Rainbow):
         loss = (weights * loss).mean()
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         self.num_learn += 1
@@ -27,6 +27,9 @@ class REINFORCE(BaseAgent):
             (e.g. 'cpu' or 'gpu'. None can also be used, and in this case, the cpu is used.)
     """
 
+    # learns at the end of each episode in its own transitions.
+    data_parallel = False
+
     def __init__(
         self,
         state_size,
@@ -100,7 +103,7 @@ class REINFORCE(BaseAgent):
         loss = -(log_prob * ret).mean()
 
         self.optimizer.zero_grad(set_to_none=True)
-        loss.backward()
+        self.scale_loss(loss).backward()
         self.optimizer.step()
 
         result = {"loss": loss.item()}
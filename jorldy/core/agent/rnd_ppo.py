@@ -108,7 +108,9 @@ class RND_PPO(PPO):
         with torch.no_grad():
             # RND: calculate exploration reward, update moments of obs and r_i
             self.rnd.update_rms_obs(next_state)
-            r_i = self.rnd(next_state, update_ri=True)
+            # features of the frozen target network are computed once for the rollout, and reused in every minibatch.
+            target = self.rnd.get_target(next_state)
+            r_i = self.rnd(next_state, update_ri=True, t=target)
             r_i = r_i.unsqueeze(-1)
 
             # Scaling extrinsic and intrinsic reward
@@ -177,9 +179,9 @@ class RND_PPO(PPO):
                     lambda x: [_x[idx] for _x in x] if isinstance(x, list) else x[idx],
                     [state, action, ret, next_state, adv, prob_old],
                 )
-                _ret_i, _adv_i = map(lambda x: x[idx], [ret_i, adv_i])
+                _ret_i, _adv_i, _target = map(lambda x: x[idx], [ret_i, adv_i, target])
 
-                _r_i = self.rnd.forward(_next_state) * self.intrinsic_coeff
+                _r_i = self.rnd.forward(_next_state, t=_target) * self.intrinsic_coeff
 
                 if self.action_type == "continuous":
                     mu, std, value = self.network(_state)
@@ -214,7 +216,7 @@ class RND_PPO(PPO):
                 loss = ppo_loss + rnd_loss
 
                 self.optimizer.zero_grad(set_to_none=True)
-                loss.backward()
+                self.scale_loss(loss).backward()
                 torch.nn.utils.clip_grad_norm_(
                     self.network.parameters(), self.clip_grad_norm
                 )
@@ -6,6 +6,7 @@ from torch.distributions import Normal
 import os
 
 from core.network import Network
+from core.network.utils import update_target_network
 from core.optimizer import Optimizer
 from core.buffer import ReplayBuffer
 from .base import BaseAgent
@@ -31,9 +32,12 @@ class SAC(BaseAgent):
         static_log_alpha (float): static value used as log alpha when use_dynamic_alpha is false.
         device (str): device to use.
             (e.g. 'cpu' or 'gpu'. None can also be used, and in this case, the cpu is used.)
+        inference (bool): build only the actor used in act, without the critics and the optimizers.
 
     """
 
+    inference_members = ["actor"]
+
     def __init__(
         self,
         state_size,
@@ -58,6 +62,7 @@ class SAC(BaseAgent):
         start_train_step=2000,
         static_log_alpha=-2.0,
         device=None,
+        inference=False,
         **kwargs,
     ):
         self.device = (
@@ -71,27 +76,35 @@ class SAC(BaseAgent):
         self.actor = Network(
             actor, state_size, action_size, D_hidden=hidden_size, head=head
         ).to(self.device)
-        self.critic = Network(
-            critic, state_size, action_size, D_hidden=hidden_size, head=head
-        ).to(self.device)
-        self.target_critic = Network(
-            critic, state_size, action_size, D_hidden=hidden_size, head=head
-        ).to(self.device)
-        self.target_critic.load_state_dict(self.critic.state_dict())
-        self.actor_optimizer = Optimizer(
-            optim_config["actor"], self.actor.parameters(), lr=optim_config["actor_lr"]
-        )
-        self.critic_optimizer = Optimizer(
-            optim_config["critic"],
-            self.critic.parameters(),
-            lr=optim_config["critic_lr"],
-        )
+        self.inference = inference
+        if not inference:
+            self.critic = Network(
+                critic, state_size, action_size, D_hidden=hidden_size, head=head
+            ).to(self.device)
+            self.target_critic = Network(
+                critic, state_size, action_size, D_hidden=hidden_size, head=head
+            ).to(self.device)
+            self.target_critic.load_state_dict(self.critic.state_dict())
+            self.actor_optimizer = Optimizer(
+                optim_config["actor"],
+                self.actor.parameters(),
+                lr=optim_config["actor_lr"],
+            )
+            self.critic_optimizer = Optimizer(
+                optim_config["critic"],
+                self.critic.parameters(),
+                lr=optim_config["critic_lr"],
+            )
 
         self.use_dynamic_alpha = use_dynamic_alpha
         if use_dynamic_alpha:
             self.log_alpha = torch.zeros(1, requires_grad=True, device=self.device)
-            self.alpha_optimizer = Optimizer(
-                optim_config["alpha"], [self.log_alpha], lr=optim_config["alpha_lr"]
+            self.alpha_optimizer = (
+                Optimizer(
+                    optim_config["alpha"], [self.log_alpha], lr=optim_config["alpha_lr"]
+                )
+                if not inference
+                else None
             )
         else:
             self.log_alpha = torch.tensor(static_log_alpha).to(self.device)
@@ -155,7 +168,7 @@ class SAC(BaseAgent):
         critic_loss2 = F.mse_loss(q2, target_q)
         critic_loss = critic_loss1 + critic_loss2
         self.critic_optimizer.zero_grad()
-        critic_loss.backward()
+        self.scale_loss(critic_loss).backward()
         self.critic_optimizer.step()
 
         # Actor
@@ -167,7 +180,7 @@ class SAC(BaseAgent):
 
         actor_loss = ((self.alpha.to(self.device) * log_prob) - min_q).mean()
         self.actor_optimizer.zero_grad(set_to_none=True)
-        actor_loss.backward()
+        self.scale_loss(actor_loss).backward()
         self.actor_optimizer.step()
 
         # Alpha
@@ -178,6 +191,7 @@ class SAC(BaseAgent):
 
         if self.use_dynamic_alpha:
             self.alpha_optimizer.zero_grad(set_to_none=True)
+            # alpha loss does not pass through networks, so it is not scaled.
             alpha_loss.backward()
             self.alpha_optimizer.step()
 
@@ -194,8 +208,7 @@ class SAC(BaseAgent):
         return result
 
     def update_target_soft(self):
-        for t_p, p in zip(self.target_critic.parameters(), self.critic.parameters()):
-            t_p.data.copy_(self.tau * p.data + (1 - self.tau) * t_p.data)
+        update_target_network(self.target_critic, self.critic, self.tau)
 
     def process(self, transitions, step):
         result = {}
@@ -203,9 +216,9 @@ class SAC(BaseAgent):
         self.memory.store(transitions)
 
         if self.memory.size > self.batch_size and step >= self.start_train_step:
-            result = self.learn()
-        if self.num_learn > 0:
-            self.update_target_soft()
+            for _ in range(self.permit_learn(len(transitions))):
+                result = self.learn()
+                self.update_target_soft()
 
         return result
 
@@ -227,6 +240,8 @@ class SAC(BaseAgent):
         print(f"...Load model from {path}...")
         checkpoint = torch.load(os.path.join(path, "ckpt"), map_location=self.device)
         self.actor.load_state_dict(checkpoint["actor"])
+        if self.inference:
+            return
         self.actor_optimizer.load_state_dict(checkpoint["actor_optimizer"])
 
         self.critic.load_state_dict(checkpoint["critic"])
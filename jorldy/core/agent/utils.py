@@ -23,6 +23,137 @@ class OU_Noise:
         return self.X
 
 
+# Rate limiter class (samples per insert)
+class RateLimiter:
+    """Rate limiter which keeps the number of samples per inserted item.
+
+    Args:
+        samples_per_insert (float): target number of samples per inserted item.
+        tolerance (float): number of samples by which the sampler may run ahead of the target.
+    """
+
+    def __init__(self, samples_per_insert, tolerance=0.0):
+        assert samples_per_insert > 0 and tolerance >= 0
+        self.samples_per_insert = samples_per_insert
+        self.tolerance = tolerance
+        self.num_insert = 0
+        self.num_sample = 0
+
+    def insert(self, num=1):
+        self.num_insert += num
+
+    def sample(self, num=1):
+        self.num_sample += num
+
+    def can_sample(self):
+        return (
+            self.num_sample + 1
+            <= self.num_insert * self.samples_per_insert + self.tolerance
+        )
+
+    def permit(self, num_insert):
+        # insert items, then return the number of samples allowed within the band.
+        self.insert(num_insert)
+        num_sample = 0
+        while self.can_sample():
+            self.sample()
+            num_sample += 1
+        return num_sample
+
+
+# Action selection of value-based agents
+def select_q(q, action):
+    """
+    Select the values of the actions, with gather instead of one-hot actions.
+
+    Parameter Type / Shape
+    - q:        tensor / (N_batch, N_action)
+    - action:   tensor / (N_batch, 1)
+    - q_action: tensor / (N_batch, 1)
+    """
+    return q.gather(1, action.long())
+
+
+def select_dist(dist, action):
+    """
+    Select the distributions (e.g. quantiles, atoms) of the actions, with gather instead of one-hot actions.
+
+    Parameter Type / Shape
+    - dist:         tensor / (N_batch, N_action, N_support)
+    - action:       tensor / (N_batch, 1)
+    - dist_action:  tensor / (N_batch, 1, N_support)
+    """
+    index = action.long().view(-1, 1, 1).expand(-1, 1, dist.shape[-1])
+    return dist.gather(1, index)
+
+
+def select_greedy(q, values):
+    """
+    Select the values (q or distributions) of the greedy actions of q, e.g. of the target network with the online q in double DQN.
+
+    Parameter Type / Shape
+    - q:        tensor / (N_batch, N_action)
+    - values:   tensor / (N_batch, N_action) or (N_batch, N_action, N_support)
+    - values of greedy actions: tensor / (N_batch, 1) or (N_batch, 1, N_support)
+    """
+    action = torch.argmax(q, -1, keepdim=True)
+    return (
+        select_q(values, action) if values.dim() == 2 else select_dist(values, action)
+    )
+
+
+# Retrace targets of sequences (MPO)
+def retrace(q_ret, q_a, c, done, gamma):
+    """
+    Compute Retrace targets with a vectorized reverse scan, instead of a loop over steps:
+    Qret_t = q_ret_t + gamma * c_{t+1} * (1 - done_t) * (Qret_{t+1} - q_a_{t+1})
+
+    Parameter Type / Shape
+    - q_ret:    tensor / (N_batch, N_step, 1) 1-step targets r_t + gamma * (1 - done_t) * E_pi[Q(s_{t+1}, .)]
+    - q_a:      tensor / (N_batch, N_step, 1) target Q of the taken actions
+    - c:        tensor / (N_batch, N_step, 1) truncated importance weights
+    - done:     tensor / (N_batch, N_step, 1)
+    - Qret:     tensor / (N_batch, N_step, 1)
+    """
+    n_step = q_ret.shape[1]
+    # Qret_t = sum_{k >= t} (prod_{t <= j < k} a_j) * b_k
+    a = gamma * c[:, 1:] * (1 - done[:, :-1])
+    b = torch.cat([q_ret[:, :-1] - a * q_a[:, 1:], q_ret[:, -1:]], 1)
+
+    upper = torch.ones(n_step, n_step, dtype=torch.bool, device=q_ret.device).triu()
+    a = torch.cat([a, torch.ones_like(a[:, :1])], 1).transpose(1, 2)
+    prod_a = torch.cumprod(torch.where(upper, a, torch.ones_like(a)), -1)
+    discount = torch.cat([torch.ones_like(prod_a[..., :1]), prod_a[..., :-1]], -1)
+    return (discount * upper) @ b
+
+
+# Unique observations of a rollout (ICM)
+def unique_observation(state, next_state):
+    """
+    Gather the observations of a rollout without duplicates, since next_state of a step is the state of the following step within an episode.
+    Return the observations (state is obs[:N_batch]) and the indices of next_state in them.
+
+    Parameter Type / Shape
+    - state:        tensor or list of tensors / (N_batch, *D_state)
+    - next_state:   tensor or list of tensors / (N_batch, *D_state)
+    - obs:          tensor or list of tensors / (N_batch + N_new, *D_state)
+    - next_idx:     tensor / (N_batch,)
+    """
+    multi = isinstance(state, list)
+    states, next_states = (state, next_state) if multi else ([state], [next_state])
+    n = len(states[0])
+
+    shared = torch.ones(n, dtype=torch.bool, device=states[0].device)
+    shared[-1] = False
+    for s, s_next in zip(states, next_states):
+        shared[:-1] &= (s_next[:-1] == s[1:]).reshape(n - 1, -1).all(-1)
+
+    next_idx = torch.arange(1, n + 1, device=shared.device)
+    next_idx[~shared] = n + torch.arange(int((~shared).sum()), device=shared.device)
+    obs = [torch.cat([s, s_next[~shared]]) for s, s_next in zip(states, next_states)]
+    return (obs if multi else obs[0]), next_idx
+
+
 # Reference: m-rl official repository (stable_scaled_log_softmax, stable_softmax)
 # https://github.com/google-research/google-research/blob/master/munchausen_rl/common/utils.py
 def stable_scaled_log_softmax(x, tau):
@@ -36,3 +167,31 @@ def stable_softmax(x, tau):
     max_x, max_indices = torch.max(x, -1, keepdim=True)
     y = x - max_x
     return torch.exp(F.log_softmax(y / tau, -1))
+
+
+# Categorical projection of distributional agents (C51, Rainbow)
+def project_distribution(target_p, Tz, done, v_min, v_max, delta_z):
+    """
+    Project the target distribution target_p on the shifted support Tz onto the fixed support, with scatter_add_ in O(B*S).
+    For terminal transitions, the uniform distribution on Tz is projected instead of target_p.
+
+    Parameter Type / Shape
+    - target_p:     tensor / (N_batch, N_support)
+    - Tz:           tensor / (N_batch, N_support)
+    - done:         tensor / (N_batch, 1)
+    - target_dist:  tensor / (N_batch, N_support)
+    """
+    num_support = Tz.shape[-1]
+    b = torch.clamp(Tz - v_min, 0, v_max - v_min) / delta_z
+    l = torch.floor(b).long()
+    u = torch.ceil(b).long()
+
+    prob = torch.where(
+        done.bool(), torch.full_like(target_p, 1 / num_support), target_p
+    )
+    target_dist = torch.zeros_like(target_p)
+    target_dist.scatter_add_(1, l, prob * (u - b))
+    target_dist.scatter_add_(1, u, prob * (b - l))
+    target_dist.scatter_add_(1, l, done * prob * (l == u))
+    target_dist /= torch.clamp(torch.sum(target_dist, 1, keepdim=True), min=1e-8)
+    return target_dist
@@ -244,7 +244,7 @@ class VMPO(REINFORCE):
                 loss = critic_loss + actor_loss + eta_loss + alpha_loss
 
                 self.optimizer.zero_grad()
-                loss.backward()
+                self.scale_loss(loss).backward()
                 torch.nn.utils.clip_grad_norm_(
                     self.network.parameters(), self.clip_grad_norm
                 )
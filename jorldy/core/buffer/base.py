@@ -10,7 +10,7 @@ class BaseBuffer(ABC):
         print("########################################")
         print("You should check dimension of transition")
         for key, val in transition.items():
-            if len(val) > 1:
+            if isinstance(val, list):
                 for i in range(len(val)):
                     print(f"{key}{i}: {val[i].shape}")
             else:
@@ -40,17 +40,40 @@ class BaseBuffer(ABC):
         return transitions
 
     def stack_transition(self, batch):
+        # items of each transition have the batch dimension of envs (N_env, *D),
+        # and they are stacked env-major (N_env * len(batch), *D), so the transitions of each env stay contiguous.
         transitions = {}
 
         for key in batch[0].keys():
-            if len(batch[0][key]) > 1:
+            if isinstance(batch[0][key], list):
                 # Multimodal
                 b_list = []
                 for i in range(len(batch[0][key])):
-                    tmp_transition = np.stack([b[key][i][0] for b in batch], axis=0)
+                    tmp_transition = self.stack_batch([b[key][i] for b in batch])
                     b_list.append(tmp_transition)
                 transitions[key] = b_list
             else:
-                transitions[key] = np.stack([b[key][0] for b in batch], axis=0)
+                transitions[key] = self.stack_batch([b[key] for b in batch])
 
         return transitions
+
+    def stack_batch(self, items):
+        items = np.stack(items, axis=1)
+        return items.reshape(-1, *items.shape[2:])
+
+    def split_transition(self, transition):
+        """
+        Split a transition of vectorized envs into the transitions of each env.
+        """
+        num_env = len(transition["done"])
+        if num_env == 1:
+            return [transition]
+        return [
+            {
+                key: [v[i : i + 1] for v in val]
+                if isinstance(val, list)
+                else val[i : i + 1]
+                for key, val in transition.items()
+            }
+            for i in range(num_env)
+        ]
@@ -16,11 +16,13 @@ class PERBuffer(ReplayBuffer):
         self.uniform_sample_prob = uniform_sample_prob
 
     def store(self, transitions):
-        if self.first_store:
+        if self.first_store and len(transitions) > 0:
             self.check_dim(transitions[0])
 
-        for transition in transitions:
+        # transitions of vectorized envs are stored per env.
+        for transition in (t for ts in transitions for t in self.split_transition(ts)):
             self.buffer[self.buffer_index] = transition
+            self.store_episode(transition)
             new_priority = (
                 transition["priority"]
                 if "priority" in transition
@@ -66,7 +68,7 @@ class PERBuffer(ReplayBuffer):
 
         return index
 
-    def sample(self, beta, batch_size):
+    def sample(self, beta, batch_size, n_step=None, gamma=0.99):
         assert self.sum_tree[0] > 0.0
         uniform_sampling = np.random.uniform(size=batch_size) < self.uniform_sample_prob
         uniform_size = np.sum(uniform_sampling)
@@ -91,9 +93,13 @@ class PERBuffer(ReplayBuffer):
         sample_probs = (1.0 - usp) * prioritized_probs + usp * uniform_probs
         weights = (uniform_probs / sample_probs) ** beta
         weights /= np.max(weights)
-        batch = [self.buffer[idx] for idx in indices - self.first_leaf_index]
-
-        transitions = self.stack_transition(batch)
+        if n_step:
+            transitions = self.n_step_transition(
+                indices - self.first_leaf_index, n_step, gamma
+            )
+        else:
+            batch = [self.buffer[idx] for idx in indices - self.first_leaf_index]
+            transitions = self.stack_transition(batch)
 
         sampled_p = np.mean(priorities)
         mean_p = self.sum_tree[0] / self.buffer_counter
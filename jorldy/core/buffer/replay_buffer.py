@@ -12,24 +12,75 @@ class ReplayBuffer(BaseBuffer):
         self.buffer_index = 0
         self.buffer_size = buffer_size
         self.buffer_counter = 0
+        # episode ids, rewards and dones of transitions to compute n-step returns at sample time.
+        self.episode = None
 
     def store(self, transitions):
-        if self.first_store:
+        if self.first_store and len(transitions) > 0:
             self.check_dim(transitions[0])
 
-        for transition in transitions:
+        # transitions of vectorized envs are stored per env.
+        for transition in (t for ts in transitions for t in self.split_transition(ts)):
             self.buffer[self.buffer_index] = transition
+            self.store_episode(transition)
             self.buffer_index = (self.buffer_index + 1) % self.buffer_size
             self.buffer_counter = min(self.buffer_counter + 1, self.buffer_size)
 
-    def sample(self, batch_size):
+    def sample(self, batch_size, n_step=None, gamma=0.99):
         batch_idx = np.random.randint(self.buffer_counter, size=batch_size)
+        if n_step:
+            return self.n_step_transition(batch_idx, n_step, gamma)
+
         batch = self.buffer[batch_idx]
 
         transitions = self.stack_transition(batch)
 
         return transitions
 
+    def store_episode(self, transition):
+        if "episode" not in transition:
+            return
+        if self.episode is None:
+            self.episode = np.full(self.buffer_size, -1, dtype=np.int64)
+            self.reward = np.zeros(self.buffer_size, dtype=np.float32)
+            self.done = np.zeros(self.buffer_size, dtype=np.float32)
+        self.episode[self.buffer_index] = np.asarray(transition["episode"]).item()
+        self.reward[self.buffer_index] = np.asarray(transition["reward"]).item()
+        self.done[self.buffer_index] = np.asarray(transition["done"]).item()
+
+    def n_step_transition(self, batch_idx, n_step, gamma):
+        """
+        Compute n-step transitions of the stored 1-step transitions tagged with episode ids.
+        Following steps are used until the end of the episode, the newest transition, or a transition of other episode (e.g. from other actor),
+        so the return is discounted by gamma ** (the number of used steps) in 'discount'.
+        """
+        assert (
+            self.episode is not None
+        ), "transitions should be tagged with episode ids."
+        offset = np.arange(n_step)
+        idx = (batch_idx[:, None] + offset) % self.buffer_size
+        num_newer = (self.buffer_index - 1 - batch_idx) % self.buffer_size
+        valid = (offset <= num_newer[:, None]) & (
+            self.episode[idx] == self.episode[batch_idx][:, None]
+        )
+        valid = np.cumprod(valid, axis=1)
+        done = self.done[idx] * valid
+        valid[:, 1:] *= np.cumsum(done, axis=1)[:, :-1] == 0
+        num_step = valid.sum(axis=1)
+
+        transitions = self.stack_transition(self.buffer[batch_idx])
+        last_idx = idx[np.arange(len(batch_idx)), num_step - 1]
+        transitions["next_state"] = self.stack_transition(self.buffer[last_idx])[
+            "next_state"
+        ]
+        transitions["reward"] = np.sum(
+            self.reward[idx] * valid * gamma ** offset, axis=1, keepdims=True
+        )
+        transitions["done"] = np.sum(done * valid, axis=1, keepdims=True)
+        transitions["discount"] = gamma ** num_step[:, None]
+        del transitions["episode"]
+        return transitions
+
     @property
     def size(self):
         return self.buffer_counter
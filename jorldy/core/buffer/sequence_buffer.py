@@ -0,0 +1,85 @@
+from collections import deque
+import numpy as np
+
+from .replay_buffer import ReplayBuffer
+
+
+class SequenceBuffer(ReplayBuffer):
+    """Replay buffer of fixed-length sequences for recurrent agents.
+
+    Sequences are built from the transitions of an env with build (on the actor side), and stored and sampled like transitions.
+    Each sequence has the per-step items stacked on axis 1 and zero padded to seq_len after the end of an episode,
+    'mask' (1 for steps in the episode, 0 for padding), 'start' (1 if the sequence starts at the beginning of an episode),
+    the items of seq_keys (e.g. the hidden state) of its first step and the next_state of its last step.
+
+    Args:
+        buffer_size (int): the number of sequences in the buffer.
+        seq_len (int): length of each sequence.
+        overlap (int): the number of steps shared by adjacent sequences.
+        seq_keys (list): keys of the items stored once per sequence from its first step.
+    """
+
+    def __init__(self, buffer_size, seq_len, overlap=0, seq_keys=["hidden"]):
+        super(SequenceBuffer, self).__init__(buffer_size)
+        assert 0 <= overlap < seq_len
+        self.seq_len = seq_len
+        self.overlap = overlap
+        self.seq_keys = seq_keys
+        self.tmp_buffer = deque(maxlen=seq_len)
+        self.episode_step = 0
+        self.new_step = 0
+
+    def build(self, transition):
+        """
+        Add a transition of an env, and return a sequence once seq_len steps are collected and every seq_len - overlap steps after, and at the end of an episode.
+        Otherwise, return an empty dictionary.
+        """
+        self.tmp_buffer.append(transition)
+        self.episode_step += 1
+        self.new_step += 1
+
+        sequence = {}
+        done = np.any(transition["done"])
+        full = len(self.tmp_buffer) == self.seq_len
+        if done or (full and self.new_step >= self.seq_len - self.overlap):
+            # sequences are only padded after the end of an episode, and the last one starts right after the overlap with the previous one.
+            length = min(len(self.tmp_buffer), self.overlap + self.new_step)
+            steps = list(self.tmp_buffer)[-length:]
+            sequence = self.make_sequence(steps, self.episode_step == length)
+            self.new_step = 0
+        if done:
+            self.tmp_buffer.clear()
+            self.episode_step = 0
+        return sequence
+
+    def make_sequence(self, steps, start):
+        pad = self.seq_len - len(steps)
+        sequence = {}
+        for key in steps[0].keys():
+            if key in self.seq_keys:
+                sequence[key] = steps[0][key]
+            elif key == "next_state":
+                sequence[key] = self.stack([steps[-1]], 0, key)
+            else:
+                sequence[key] = self.stack(steps, pad, key)
+        mask = np.zeros((1, self.seq_len, 1), dtype=np.float32)
+        mask[:, : len(steps)] = 1.0
+        sequence["mask"] = mask
+        sequence["start"] = np.array([[float(start)]], dtype=np.float32)
+        return sequence
+
+    def stack(self, steps, pad, key):
+        if isinstance(steps[0][key], list):
+            # Multimodal
+            return [
+                self.pad(np.stack([s[key][i] for s in steps], axis=1), pad)
+                for i in range(len(steps[0][key]))
+            ]
+        return self.pad(np.stack([s[key] for s in steps], axis=1), pad)
+
+    def pad(self, x, pad):
+        if pad == 0:
+            return x
+        return np.concatenate(
+            [x, np.zeros((x.shape[0], pad, *x.shape[2:]), dtype=x.dtype)], axis=1
+        )
@@ -1,7 +1,7 @@
 import gym
 import numpy as np
 
-from .utils import ImgProcessor
+from .utils import ImgProcessor, FrameStacker
 from .base import BaseEnv
 
 COMMON_VERSION = "Deterministic-v4"
@@ -22,6 +22,11 @@ class _Atari(BaseEnv):
         reward_clip (bool): parameter that determine whether to use reward clipping.
         reward_scale (float): reward normalization denominator.
         dead_penatly (bool): parameter that determine whether to use penalty when the agent dies.
+        obs_type (str): type of observation of the emulator. One of ['rgb', 'grayscale']
+            'grayscale' gets gray images from the emulator, so that RGB images are not fetched and converted. (only with gray_img)
+        frame_skip (int): the number of frames an action is repeated for in each step. If it is larger than 1,
+            the NoFrameskip version of the game is used instead of the Deterministic version (which repeats 4 frames in the emulator).
+        max_pool (bool): parameter that determine whether to use the max of the last two frames of the repeat as the observation.
     """
 
     def __init__(
@@ -37,6 +42,9 @@ class _Atari(BaseEnv):
         reward_clip=False,
         reward_scale=None,
         dead_penalty=False,
+        obs_type="rgb",
+        frame_skip=1,
+        max_pool=False,
         **kwargs,
     ):
         self.render = render
@@ -48,11 +56,23 @@ class _Atari(BaseEnv):
 
         self.stack_frame = stack_frame
         self.num_channel = 1 if self.gray_img else 3
-        self.stacked_state = np.zeros(
-            [self.num_channel * stack_frame, img_height, img_width]
+        self.frame_stacker = FrameStacker(
+            1, stack_frame, [self.num_channel, img_height, img_width]
         )
 
-        self.env = gym.make(name)
+        assert frame_skip > 0
+        self.frame_skip = frame_skip
+        self.max_pool = max_pool and frame_skip > 1
+        self.pool_frame = None
+        if frame_skip > 1:
+            name = name.replace(COMMON_VERSION, "NoFrameskip-v4")
+
+        assert obs_type in ["rgb", "grayscale"]
+        if obs_type == "grayscale":
+            assert self.gray_img, "grayscale observation is only used with gray_img."
+            self.env = gym.make(name, obs_type=obs_type)
+        else:
+            self.env = gym.make(name)
         self.state_size = [stack_frame, img_height, img_width]
         self.action_size = self.env.action_space.n
         self.action_type = "discrete"
@@ -78,7 +98,7 @@ class _Atari(BaseEnv):
 
         if self.no_op:
             for _ in range(np.random.randint(0, self.no_op_max)):
-                state, reward, _, info = self.env.step(0)
+                state, reward, _, info = self.repeat_step(0)
                 self.score += reward
                 if self.life != info[self.life_key]:
                     if self.life > info[self.life_key]:
@@ -87,15 +107,14 @@ class _Atari(BaseEnv):
                     self.life = info[self.life_key]
 
         state = self.img_processor.convert_img(state)
-        self.stacked_state = np.tile(state, (self.stack_frame, 1, 1))
-        state = np.expand_dims(self.stacked_state, 0)
-        return state
+        self.frame_stacker.reset(state[None])
+        return self.frame_stacker.state.copy()
 
     def step(self, action):
         if self.render:
             self.env.render()
 
-        next_state, reward, done, info = self.env.step(action.item())
+        next_state, reward, done, info = self.repeat_step(action.item())
         self.score += reward
 
         dead = False
@@ -106,9 +125,7 @@ class _Atari(BaseEnv):
                 dead = True
             self.life = info[self.life_key]
         next_state = self.img_processor.convert_img(next_state)
-        self.stacked_state = np.concatenate(
-            (self.stacked_state[self.num_channel :], next_state), axis=0
-        )
+        self.frame_stacker.push(next_state[None])
 
         if self.reward_clip:
             reward = (
@@ -118,11 +135,30 @@ class _Atari(BaseEnv):
         if dead and self.dead_penalty:
             reward = -1
 
-        next_state, reward, done = map(
-            lambda x: np.expand_dims(x, 0), [self.stacked_state, [reward], [done]]
-        )
+        next_state = self.frame_stacker.state.copy()
+        reward, done = np.array([[reward]]), np.array([[done]])
         return (next_state, reward, done)
 
+    def repeat_step(self, action):
+        """
+        Repeat the action for frame_skip frames, and return the sum of rewards and the last frame,
+        or the max of the last two frames with max_pool. Repeat stops at the end of the episode or when a life is lost.
+        """
+        total_reward = 0
+        for i in range(self.frame_skip):
+            state, reward, done, info = self.env.step(action)
+            total_reward += reward
+            if done or self.life != info[self.life_key]:
+                break
+            if self.max_pool and i == self.frame_skip - 2:
+                # the frame may be a view of the emulator screen, so it is copied into a preallocated array.
+                if self.pool_frame is None:
+                    self.pool_frame = np.empty_like(state)
+                np.copyto(self.pool_frame, state)
+        if self.max_pool and i == self.frame_skip - 1:
+            state = np.maximum(self.pool_frame, state, out=self.pool_frame)
+        return state, total_reward, done, info
+
     def close(self):
         self.env.close()
 
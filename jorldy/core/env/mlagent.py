@@ -20,6 +20,9 @@ class _MLAgent(BaseEnv):
         env_name (str): name of environment in ML-Agents.
         train_mode (bool): parameter that determine whether to use low-resource training rendering mode.
         render (bool): parameter that determine whether to render.
+
+    Every agent of the behavior is an env of the batch, so states, rewards and dones have the batch dimension of num_envs (the number of agents).
+    Agents are reset by Unity at the end of their episodes, so after the first reset, reset returns the current states without resetting the scene.
     """
 
     def __init__(self, env_name, train_mode=True, render=False, id=None, **kwargs):
@@ -54,38 +57,70 @@ class _MLAgent(BaseEnv):
         engine_configuration_channel.set_configuration_parameters(time_scale=12.0)
         dec, term = self.env.get_steps(self.behavior_name)
 
+        # rows of the batch follow the order of agent ids in the first decision steps.
+        self.agent_index = {id: i for i, id in enumerate(dec.agent_id)}
+        self.num_envs = len(self.agent_index)
+        self.scores = np.zeros(self.num_envs)
+        self.dec_rows = np.arange(self.num_envs)
+        self.state = None
+
     def reset(self):
+        if self.num_envs > 1 and self.state is not None:
+            return copy_state(self.state)
+
         self.score = 0
+        self.scores[:] = 0
         self.env.reset()
         dec, term = self.env.get_steps(self.behavior_name)
+        self.dec_rows = self.rows(dec.agent_id)
         state = self.state_processing(dec.obs)
+        self.state = (
+            [np.zeros((self.num_envs, *_s.shape[1:]), _s.dtype) for _s in state]
+            if isinstance(state, list)
+            else np.zeros((self.num_envs, *state.shape[1:]), state.dtype)
+        )
+        set_rows(self.state, self.dec_rows, state)
 
-        return state
+        return copy_state(self.state)
 
     def step(self, action):
         action_tuple = ActionTuple()
 
+        # actions are only set for the agents which requested decisions.
         if self.is_continuous_action:
-            action_tuple.add_continuous(action)
+            action_tuple.add_continuous(action[self.dec_rows])
         else:
-            action_tuple.add_discrete(action)
+            action_tuple.add_discrete(action[self.dec_rows])
 
         self.env.set_actions(self.behavior_name, action_tuple)
         self.env.step()
 
         dec, term = self.env.get_steps(self.behavior_name)
-        done = len(term.agent_id) > 0
-        reward = term.reward if done else dec.reward
-        next_state = (
-            self.state_processing(term.obs) if done else self.state_processing(dec.obs)
-        )
-
-        self.score += reward[0]
-
-        reward, done = map(lambda x: np.expand_dims(x, 0), [reward, [done]])
+        reward = np.zeros((self.num_envs, 1), dtype=np.float32)
+        done = np.zeros((self.num_envs, 1), dtype=bool)
+
+        # agents which terminated in this step return the last states of their episodes,
+        # and the first states of their next episodes in the decision steps are kept for reset.
+        dec_rows, term_rows = self.rows(dec.agent_id), self.rows(term.agent_id)
+        set_rows(self.state, dec_rows, self.state_processing(dec.obs))
+        next_state = copy_state(self.state)
+        reward[dec_rows, 0] = dec.reward
+        if len(term_rows) > 0:
+            set_rows(next_state, term_rows, self.state_processing(term.obs))
+            reward[term_rows, 0] = term.reward
+            done[term_rows] = True
+        self.dec_rows = dec_rows
+
+        self.scores += reward[:, 0]
+        if np.any(done):
+            self.score = self.scores[done[:, 0]].mean()
+            self.scores[done[:, 0]] = 0
 
         return (next_state, reward, done)
 
+    def rows(self, agent_id):
+        return np.array([self.agent_index[id] for id in agent_id], dtype=np.int64)
+
     def state_processing(self, obs):
         return obs[0]
 
@@ -93,6 +128,19 @@ class _MLAgent(BaseEnv):
         self.env.close()
 
 
+def set_rows(state, rows, value):
+    if isinstance(state, list):
+        # Multimodal
+        for _state, _value in zip(state, value):
+            _state[rows] = _value
+    else:
+        state[rows] = value
+
+
+def copy_state(state):
+    return [s.copy() for s in state] if isinstance(state, list) else state.copy()
+
+
 class HopperMLAgent(_MLAgent):
     def __init__(self, **kwargs):
         env_name = "Hopper"
@@ -2,7 +2,7 @@ import cv2
 import numpy as np
 from procgen import ProcgenEnv
 
-from .utils import ImgProcessor
+from .utils import ImgProcessor, FrameStacker
 from .base import BaseEnv
 
 
@@ -18,6 +18,8 @@ class _Procgen(BaseEnv):
         stack_frame (int): the number of stacked frame in one single state.
         no_op (bool): parameter that determine whether or not to operate during the first 30(no_op_max) steps.
         reward_clip (bool): parameter that determine whether to use reward clipping.
+        num_envs (int): the number of levels run in one batch. states, rewards and dones have the batch dimension of num_envs,
+            and each level is reset automatically at the end of its episode.
     """
 
     def __init__(
@@ -30,6 +32,7 @@ class _Procgen(BaseEnv):
         stack_frame=4,
         no_op=False,
         reward_clip=False,
+        num_envs=1,
         **kwargs,
     ):
         self.render = render
@@ -41,15 +44,18 @@ class _Procgen(BaseEnv):
 
         self.stack_frame = stack_frame
         self.num_channel = 1 if self.gray_img else 3
-        self.stacked_state = np.zeros(
-            [self.num_channel * stack_frame, img_height, img_width]
+        self.num_envs = num_envs
+        self.frame_stacker = FrameStacker(
+            num_envs, stack_frame, [self.num_channel, img_height, img_width]
         )
+        self.started = False
 
-        self.env = ProcgenEnv(1, name, render_mode="rgb_array")
+        self.env = ProcgenEnv(num_envs, name, render_mode="rgb_array")
         self.state_size = [stack_frame, img_height, img_width]
         self.action_size = self.env.action_space.n
         self.action_type = "discrete"
         self.score = 0
+        self.scores = np.zeros(num_envs)
         self.no_op = no_op
         self.no_op_max = 30
         self.reward_clip = reward_clip
@@ -59,38 +65,44 @@ class _Procgen(BaseEnv):
         print(f"action size: {self.action_size}")
 
     def reset(self):
-        state = self.env.reset()["rgb"][0]
+        # levels of vectorized envs are reset automatically, so the running batch is kept after the first reset.
+        if self.num_envs > 1 and self.started:
+            return self.frame_stacker.state.copy()
+        self.started = True
 
-        obs, reward, _, info = self.env.step(np.ones(1))
-        self.score = reward[0]
+        self.env.reset()
+        obs, reward, _, info = self.env.step(np.ones(self.num_envs))
+        self.scores = reward.astype(np.float64)
 
         if self.no_op:
             for _ in range(np.random.randint(0, self.no_op_max)):
-                obs, reward, _, info = self.env.step(np.zeros(1))
-                self.score += reward
-        state = self.img_processor.convert_img(obs["rgb"][0])
-        self.stacked_state = np.tile(state, (self.stack_frame, 1, 1))
-        state = np.expand_dims(self.stacked_state, 0)
-        return state
+                obs, reward, _, info = self.env.step(np.zeros(self.num_envs))
+                self.scores += reward
+        self.score = self.scores.mean()
+        state = self.img_processor.convert_imgs(obs["rgb"])
+        self.frame_stacker.reset(state)
+        return self.frame_stacker.state.copy()
 
     def step(self, action):
         if self.render:
             self.env.render()
-        next_obs, reward, done, info = self.env.step(action.reshape((1,)))
-        self.score += reward[0]
-
-        next_state = self.img_processor.convert_img(next_obs["rgb"][0])
-        self.stacked_state = np.concatenate(
-            (self.stacked_state[self.num_channel :], next_state), axis=0
-        )
+        next_obs, reward, done, info = self.env.step(action.reshape((self.num_envs,)))
+        self.scores += reward
+        if np.any(done):
+            self.score = self.scores[done].mean()
+            self.scores[done] = 0
+
+        next_state = self.img_processor.convert_imgs(next_obs["rgb"])
+        self.frame_stacker.push(next_state)
+        next_stacked_state = self.frame_stacker.state.copy()
+        # next_state of a finished level is the first frame of the new level, which is returned as is (as in gym3 vector envs).
+        if np.any(done):
+            self.frame_stacker.reset(next_state[done], done)
 
         if self.reward_clip:
             reward = np.tanh(reward)
 
-        next_state, reward, done = map(
-            lambda x: np.expand_dims(x, 0), [self.stacked_state, reward, done]
-        )
-        return (next_state, reward, done)
+        return (next_stacked_state, reward[:, None], done[:, None])
 
     def close(self):
         self.env.close()
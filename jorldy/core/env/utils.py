@@ -3,15 +3,108 @@ import numpy as np
 
 
 class ImgProcessor:
+    """Image preprocessor of (vectorized) image environments.
+
+    Images are converted to gray before resizing, and resized into a preallocated array,
+    so the converted images are overwritten by the following conversions and should be copied to be kept (e.g. by FrameStacker).
+
+    Args:
+        gray_img (bool): parameter that determine whether to convert images to gray images.
+        img_width (int): width of converted images.
+        img_height (int): height of converted images.
+    """
+
     def __init__(self, gray_img, img_width, img_height):
         self.gray_img = gray_img
         self.img_width = img_width
         self.img_height = img_height
+        self.dst = None
 
     def convert_img(self, img):
-        img = cv2.resize(img, dsize=(self.img_width, self.img_height))
-        if self.gray_img:
-            img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-            img = np.expand_dims(img, axis=2)
-        img = img.transpose(2, 0, 1)
-        return img
+        """
+        Parameter Type / Shape
+        - img:      ndarray / (H, W, C), or (H, W) for gray images (e.g. ALE grayscale observation)
+        - return:   ndarray / (C', img_height, img_width)
+        """
+        return self.convert_imgs(img[None])[0]
+
+    def convert_imgs(self, imgs):
+        """
+        Convert a batch of images of vectorized envs at once.
+
+        Parameter Type / Shape
+        - imgs:     ndarray / (N_batch, H, W, C), or (N_batch, H, W) for gray images
+        - return:   ndarray / (N_batch, C', img_height, img_width)
+        """
+        if imgs.ndim == 4 and self.gray_img:
+            # color conversion is per pixel, so the batch is converted in one call as a tall image.
+            n, h, w, c = imgs.shape
+            imgs = cv2.cvtColor(imgs.reshape(n * h, w, c), cv2.COLOR_RGB2GRAY)
+            imgs = imgs.reshape(n, h, w)
+        assert (
+            self.gray_img or imgs.ndim == 4
+        ), "gray images can not be converted to color images."
+
+        if imgs.shape[1:3] != (self.img_height, self.img_width):
+            shape = (len(imgs), self.img_height, self.img_width, *imgs.shape[3:])
+            if self.dst is None or self.dst.shape != shape:
+                self.dst = np.empty(shape, dtype=imgs.dtype)
+            for img, dst in zip(imgs, self.dst):
+                cv2.resize(img, dsize=(self.img_width, self.img_height), dst=dst)
+            imgs = self.dst
+        return imgs[:, None] if imgs.ndim == 3 else imgs.transpose(0, 3, 1, 2)
+
+
+class FrameStacker:
+    """Stack of the last frames of (vectorized) image environments.
+
+    Frames are written into a preallocated ring buffer twice, at the write index and stack_frame slots after it,
+    so the stacked frames in order are always a contiguous slice of the buffer and state is a view without copy.
+    The view is overwritten by the following pushes, so it should be copied to be kept (e.g. in a transition).
+
+    Args:
+        num_envs (int): the number of envs in the batch.
+        stack_frame (int): the number of stacked frames.
+        frame_shape (list): shape of each frame (C, H, W).
+        dtype (type): type of frames.
+    """
+
+    def __init__(self, num_envs, stack_frame, frame_shape, dtype=np.uint8):
+        self.stack_frame = stack_frame
+        self.buffer = np.zeros((num_envs, 2 * stack_frame, *frame_shape), dtype=dtype)
+        self.index = 0
+
+    def reset(self, frames, mask=None):
+        """
+        Fill the stack with the first frames of episodes. If mask is given, only envs where mask is True are reset.
+
+        Parameter Type / Shape
+        - frames:   ndarray / (N_batch, C, H, W), or (N_mask, C, H, W) with mask
+        - mask:     ndarray / (N_batch,)
+        """
+        if mask is None:
+            self.buffer[:] = frames[:, None]
+        else:
+            self.buffer[mask] = frames[:, None]
+
+    def push(self, frames):
+        """
+        Parameter Type / Shape
+        - frames:   ndarray / (N_batch, C, H, W)
+        """
+        self.buffer[:, self.index] = frames
+        self.buffer[:, self.index + self.stack_frame] = frames
+        self.index = (self.index + 1) % self.stack_frame
+
+    @property
+    def state(self):
+        """
+        Read-only view of the stacked frames from the oldest to the newest.
+
+        Parameter Type / Shape
+        - state:    ndarray / (N_batch, stack_frame * C, H, W)
+        """
+        state = self.buffer[:, self.index : self.index + self.stack_frame]
+        state = state.reshape(state.shape[0], -1, *state.shape[3:])
+        state.flags.writeable = False
+        return state
@@ -52,12 +52,12 @@ class CNN(torch.nn.Module):
             x = F.relu(self.conv1(x))
             x = F.relu(self.conv2(x))
             x = F.relu(self.conv3(x))
-            x = x.view(batch_len, seq_len, -1)
+            x = x.reshape(batch_len, seq_len, -1)
         else:
             x = F.relu(self.conv1(x))
             x = F.relu(self.conv2(x))
             x = F.relu(self.conv3(x))
-            x = x.view(x.size(0), -1)
+            x = x.reshape(x.size(0), -1)
         return x
 
 
@@ -186,7 +186,7 @@ class CNN_LSTM(torch.nn.Module):
         x = F.relu(self.conv1(x))
         x = F.relu(self.conv2(x))
         x = F.relu(self.conv3(x))
-        x = x.view(-1, seq_len, self.D_conv_out)
+        x = x.reshape(-1, seq_len, self.D_conv_out)
         x, hidden_out = self.lstm(x, hidden_in)
 
         return x, hidden_in, hidden_out
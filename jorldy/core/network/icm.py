@@ -18,22 +18,25 @@ def define_mlp_batch_norm(instance, D_hidden, feature_size):
 
 
 def mlp_head(instance, s, s_next):
-    if instance.batch_norm:
-        s = F.elu(instance.bn1(instance.fc1(s)))
-        s = F.elu(instance.bn2(instance.fc2(s)))
+    if not instance.batch_norm:
+        return mlp_encode(instance, s), mlp_encode(instance, s_next)
 
-        s_next = F.elu(instance.bn1_next(instance.fc1(s_next)))
-    else:
-        s = F.elu(instance.fc1(s))
-        s = F.elu(instance.fc2(s))
-
-        s_next = F.elu(instance.fc1(s_next))
+    s = F.elu(instance.bn1(instance.fc1(s)))
+    s = F.elu(instance.bn2(instance.fc2(s)))
 
+    s_next = F.elu(instance.bn1_next(instance.fc1(s_next)))
     s_next = F.elu(instance.fc2(s_next))
 
     return s, s_next
 
 
+# encode observations without batch normalization
+def mlp_encode(instance, x):
+    x = F.elu(instance.fc1(x))
+    x = F.elu(instance.fc2(x))
+    return x
+
+
 def define_conv_head_weight(instance, D_in):
     instance.conv1 = torch.nn.Conv2d(
         in_channels=D_in[0], out_channels=32, kernel_size=3, stride=2
@@ -69,33 +72,34 @@ def define_conv_batch_norm(instance):
 
 
 def conv_head(instance, s, s_next):
-    if instance.batch_norm:
-        s = F.elu(instance.bn1_conv(instance.conv1(s)))
-        s = F.elu(instance.bn2_conv(instance.conv2(s)))
-        s = F.elu(instance.bn3_conv(instance.conv3(s)))
-        s = F.elu(instance.bn4_conv(instance.conv4(s)))
-
-        s_next = F.elu(instance.bn1_next_conv(instance.conv1(s_next)))
-        s_next = F.elu(instance.bn2_next_conv(instance.conv2(s_next)))
-        s_next = F.elu(instance.bn3_next_conv(instance.conv3(s_next)))
+    if not instance.batch_norm:
+        return conv_encode(instance, s), conv_encode(instance, s_next)
 
-    else:
-        s = F.elu(instance.conv1(s))
-        s = F.elu(instance.conv2(s))
-        s = F.elu(instance.conv3(s))
-        s = F.elu(instance.conv4(s))
-
-        s_next = F.elu(instance.conv1(s_next))
-        s_next = F.elu(instance.conv2(s_next))
-        s_next = F.elu(instance.conv3(s_next))
+    s = F.elu(instance.bn1_conv(instance.conv1(s)))
+    s = F.elu(instance.bn2_conv(instance.conv2(s)))
+    s = F.elu(instance.bn3_conv(instance.conv3(s)))
+    s = F.elu(instance.bn4_conv(instance.conv4(s)))
 
+    s_next = F.elu(instance.bn1_next_conv(instance.conv1(s_next)))
+    s_next = F.elu(instance.bn2_next_conv(instance.conv2(s_next)))
+    s_next = F.elu(instance.bn3_next_conv(instance.conv3(s_next)))
     s_next = F.elu(instance.conv4(s_next))
-    s = s.view(s.size(0), -1)
-    s_next = s_next.view(s_next.size(0), -1)
+
+    s = s.reshape(s.size(0), -1)
+    s_next = s_next.reshape(s_next.size(0), -1)
 
     return s, s_next
 
 
+# encode observations without batch normalization
+def conv_encode(instance, x):
+    x = F.elu(instance.conv1(x))
+    x = F.elu(instance.conv2(x))
+    x = F.elu(instance.conv3(x))
+    x = F.elu(instance.conv4(x))
+    return x.reshape(x.size(0), -1)
+
+
 def define_forward_weight(instance, feature_size, D_hidden, D_out):
     if instance.action_type == "discrete":
         instance.forward_fc1 = torch.nn.Linear(feature_size + 1, D_hidden)
@@ -142,11 +146,28 @@ def inverse_model(instance, s, a, s_next):
     return l_i
 
 
+def intrinsic_reward(instance, s, a, s_next, update_ri):
+    # Forward Model
+    x_forward, l_f = forward_model(instance, s, a, s_next)
+
+    # Inverse Model
+    l_i = inverse_model(instance, s, a, s_next)
+
+    # Get Ri
+    r_i = (instance.eta * 0.5) * torch.sum(torch.abs(x_forward - s_next), axis=1)
+
+    if update_ri:
+        ri_update(r_i, instance.num_workers, instance.rff, instance.update_rms_ri)
+
+    if instance.ri_normalize:
+        r_i = r_i / (torch.sqrt(instance.rms_ri.var) + 1e-7)
+
+    return r_i, l_f, l_i
+
+
 def ri_update(r_i, num_workers, rff, update_rms_ri):
     ri_T = r_i.view(num_workers, -1).T  # (n_batch, n_workers)
-    rewems = torch.stack(
-        [rff.update(rit.detach()) for rit in ri_T]
-    ).ravel()  # (n_batch, n_workers) -> (n_batch * n_workers)
+    rewems = rff.update(ri_T.detach()).ravel()  # (n_batch * n_workers)
     update_rms_ri(rewems)
 
 
@@ -193,29 +214,28 @@ class ICM_MLP(torch.nn.Module):
     def update_rms_ri(self, v):
         self.rms_ri.update(v)
 
-    def forward(self, s, a, s_next, update_ri=False):
+    def normalize(self, s):
         if self.obs_normalize:
             s = normalize_obs(s, self.rms_obs.mean, self.rms_obs.var)
-            s_next = normalize_obs(s_next, self.rms_obs.mean, self.rms_obs.var)
-
-        s, s_next = mlp_head(self, s, s_next)
-
-        # Forward Model
-        x_forward, l_f = forward_model(self, s, a, s_next)
+        return s
 
-        # Inverse Model
-        l_i = inverse_model(self, s, a, s_next)
+    def encode(self, s):
+        return mlp_encode(self, s)
 
-        # Get Ri
-        r_i = (self.eta * 0.5) * torch.sum(torch.abs(x_forward - s_next), axis=1)
-
-        if update_ri:
-            ri_update(r_i, self.num_workers, self.rff, self.update_rms_ri)
+    def forward(self, s, a, s_next, update_ri=False):
+        s, s_next = self.normalize(s), self.normalize(s_next)
+        s, s_next = mlp_head(self, s, s_next)
 
-        if self.ri_normalize:
-            r_i = r_i / (torch.sqrt(self.rms_ri.var) + 1e-7)
+        return intrinsic_reward(self, s, a, s_next, update_ri)
 
-        return r_i, l_f, l_i
+    def forward_index(self, obs, a, s_idx, s_next_idx, update_ri=False):
+        """
+        Same as forward, but s and s_next are given as indices of obs, so that each observation is normalized and encoded once.
+        It is only used without batch normalization, which normalizes s and s_next separately.
+        """
+        assert not self.batch_norm
+        x = self.encode(self.normalize(obs))
+        return intrinsic_reward(self, x[s_idx], a, x[s_next_idx], update_ri)
 
 
 class ICM_CNN(torch.nn.Module):
@@ -259,29 +279,28 @@ class ICM_CNN(torch.nn.Module):
     def update_rms_ri(self, v):
         self.rms_ri.update(v)
 
-    def forward(self, s, a, s_next, update_ri=False):
+    def normalize(self, s):
         if self.obs_normalize:
             s = normalize_obs(s, self.rms_obs.mean, self.rms_obs.var)
-            s_next = normalize_obs(s_next, self.rms_obs.mean, self.rms_obs.var)
-
-        s, s_next = conv_head(self, s, s_next)
-
-        # Forward Model
-        x_forward, l_f = forward_model(self, s, a, s_next)
-
-        # Inverse Model
-        l_i = inverse_model(self, s, a, s_next)
+        return s
 
-        # Get Ri
-        r_i = (self.eta * 0.5) * torch.sum(torch.abs(x_forward - s_next), axis=1)
+    def encode(self, s):
+        return conv_encode(self, s)
 
-        if update_ri:
-            ri_update(r_i, self.num_workers, self.rff, self.update_rms_ri)
+    def forward(self, s, a, s_next, update_ri=False):
+        s, s_next = self.normalize(s), self.normalize(s_next)
+        s, s_next = conv_head(self, s, s_next)
 
-        if self.ri_normalize:
-            r_i = r_i / (torch.sqrt(self.rms_ri.var) + 1e-7)
+        return intrinsic_reward(self, s, a, s_next, update_ri)
 
-        return r_i, l_f, l_i
+    def forward_index(self, obs, a, s_idx, s_next_idx, update_ri=False):
+        """
+        Same as forward, but s and s_next are given as indices of obs, so that each observation is normalized and encoded once.
+        It is only used without batch normalization, which normalizes s and s_next separately.
+        """
+        assert not self.batch_norm
+        x = self.encode(self.normalize(obs))
+        return intrinsic_reward(self, x[s_idx], a, x[s_next_idx], update_ri)
 
 
 class ICM_Multi(torch.nn.Module):
@@ -337,22 +356,19 @@ class ICM_Multi(torch.nn.Module):
     def update_rms_ri(self, v):
         self.rms_ri.update(v)
 
-    def forward(self, s, a, s_next, update_ri=False):
-        s_img = s[0]
-        s_vec = s[1]
-
-        s_next_img = s_next[0]
-        s_next_vec = s_next[1]
-
+    def normalize(self, s):
+        s_img, s_vec = s
         if self.obs_normalize:
             s_img = normalize_obs(s_img, self.rms_obs_img.mean, self.rms_obs_img.var)
             s_vec = normalize_obs(s_vec, self.rms_obs_vec.mean, self.rms_obs_vec.var)
-            s_next_img = normalize_obs(
-                s_next_img, self.rms_obs_img.mean, self.rms_obs_img.var
-            )
-            s_next_vec = normalize_obs(
-                s_next_vec, self.rms_obs_vec.mean, self.rms_obs_vec.var
-            )
+        return [s_img, s_vec]
+
+    def encode(self, s):
+        return torch.cat((conv_encode(self, s[0]), mlp_encode(self, s[1])), -1)
+
+    def forward(self, s, a, s_next, update_ri=False):
+        s_img, s_vec = self.normalize(s)
+        s_next_img, s_next_vec = self.normalize(s_next)
 
         s_vec, s_next_vec = mlp_head(self, s_vec, s_next_vec)
         s_img, s_next_img = conv_head(self, s_img, s_next_img)
@@ -360,19 +376,13 @@ class ICM_Multi(torch.nn.Module):
         s = torch.cat((s_img, s_vec), -1)
         s_next = torch.cat((s_next_img, s_next_vec), -1)
 
-        # Forward Model
-        x_forward, l_f = forward_model(self, s, a, s_next)
-
-        # Inverse Model
-        l_i = inverse_model(self, s, a, s_next)
-
-        # Get Ri
-        r_i = (self.eta * 0.5) * torch.sum(torch.abs(x_forward - s_next), axis=1)
-
-        if update_ri:
-            ri_update(r_i, self.num_workers, self.rff, self.update_rms_ri)
-
-        if self.ri_normalize:
-            r_i = r_i / (torch.sqrt(self.rms_ri.var) + 1e-7)
+        return intrinsic_reward(self, s, a, s_next, update_ri)
 
-        return r_i, l_f, l_i
+    def forward_index(self, obs, a, s_idx, s_next_idx, update_ri=False):
+        """
+        Same as forward, but s and s_next are given as indices of obs, so that each observation is normalized and encoded once.
+        It is only used without batch normalization, which normalizes s and s_next separately.
+        """
+        assert not self.batch_norm
+        x = self.encode(self.normalize(obs))
+        return intrinsic_reward(self, x[s_idx], a, x[s_next_idx], update_ri)
@@ -11,7 +11,10 @@ class IQN(BaseNetwork):
         D_head_out = super(IQN, self).__init__(D_in, D_hidden, head)
 
         self.N_sample = N_sample
-        self.i_pi = (torch.arange(0, D_em) * np.pi).view(1, 1, D_em)
+        # cosine basis is kept on the device of the network, and not saved in the state dict.
+        self.register_buffer(
+            "i_pi", (torch.arange(0, D_em) * np.pi).view(1, 1, D_em), persistent=False
+        )
 
         self.state_embed = torch.nn.Linear(D_head_out, D_hidden)
         self.sample_embed = torch.nn.Linear(D_em, D_hidden)
@@ -38,10 +41,8 @@ class IQN(BaseNetwork):
         return self.q(x), tau
 
     def make_embed(self, x, tau_min, tau_max):
-        tau = (
-            torch.FloatTensor(x.size(0), self.N_sample, 1)
-            .uniform_(tau_min, tau_max)
-            .to(x.device)
+        tau = torch.empty(x.size(0), self.N_sample, 1, device=x.device).uniform_(
+            tau_min, tau_max
         )
-        embed = torch.cos(tau * self.i_pi.to(x.device))
+        embed = torch.cos(tau * self.i_pi)
         return embed, tau
@@ -0,0 +1,20 @@
+import torch
+import torch.nn.functional as F
+
+from .base import BaseNetwork
+from .utils import orthogonal_init
+
+
+class R2D2(BaseNetwork):
+    def __init__(self, D_in, D_out, D_hidden=512, head="mlp_lstm"):
+        D_head_out = super(R2D2, self).__init__(D_in, D_hidden, head)
+        self.l = torch.nn.Linear(D_head_out, D_hidden)
+        self.q = torch.nn.Linear(D_hidden, D_out)
+
+        orthogonal_init(self.l)
+        orthogonal_init(self.q, "linear")
+
+    def forward(self, x, hidden_in=None):
+        x, hidden_in, hidden_out = super(R2D2, self).forward(x, hidden_in)
+        x = F.relu(self.l(x))
+        return self.q(x), hidden_in, hidden_out
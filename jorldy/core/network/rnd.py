@@ -25,21 +25,18 @@ def define_mlp_batch_norm(instance, D_hidden, feature_size):
     instance.bn2_target_mlp = torch.nn.BatchNorm1d(feature_size)
 
 
-def mlp_head(instance, s_next):
+def mlp_head(instance, s_next, tower):
+    # tower: 'predict' or 'target'
+    fc1 = getattr(instance, f"fc1_{tower}_mlp")
+    fc2 = getattr(instance, f"fc2_{tower}_mlp")
     if instance.batch_norm:
-        p = F.relu(instance.bn1_predict_mlp(instance.fc1_predict_mlp(s_next)))
-        p = F.relu(instance.bn2_predict_mlp(instance.fc2_predict_mlp(p)))
-
-        t = F.relu(instance.bn1_target_mlp(instance.fc1_target_mlp(s_next)))
-        t = F.relu(instance.bn2_target_mlp(instance.fc2_target_mlp(t)))
+        x = F.relu(getattr(instance, f"bn1_{tower}_mlp")(fc1(s_next)))
+        x = F.relu(getattr(instance, f"bn2_{tower}_mlp")(fc2(x)))
     else:
-        p = F.relu(instance.fc1_predict_mlp(s_next))
-        p = F.relu(instance.fc2_predict_mlp(p))
-
-        t = F.relu(instance.fc1_target_mlp(s_next))
-        t = F.relu(instance.fc2_target_mlp(t))
+        x = F.relu(fc1(s_next))
+        x = F.relu(fc2(x))
 
-    return p, t
+    return x
 
 
 def define_conv_head_weight(instance, D_in):
@@ -84,28 +81,16 @@ def define_conv_batch_norm(instance):
     instance.bn3_target_conv = torch.nn.BatchNorm2d(64)
 
 
-def conv_head(instance, s_next):
-    if instance.batch_norm:
-        p = F.relu(instance.bn1_predict_conv(instance.conv1_predict(s_next)))
-        p = F.relu(instance.bn2_predict_conv(instance.conv2_predict(p)))
-        p = F.relu(instance.bn3_predict_conv(instance.conv3_predict(p)))
-
-        t = F.relu(instance.bn1_target_conv(instance.conv1_target(s_next)))
-        t = F.relu(instance.bn2_target_conv(instance.conv2_target(t)))
-        t = F.relu(instance.bn3_target_conv(instance.conv3_target(t)))
-    else:
-        p = F.relu(instance.conv1_predict(s_next))
-        p = F.relu(instance.conv2_predict(p))
-        p = F.relu(instance.conv3_predict(p))
-
-        t = F.relu(instance.conv1_target(s_next))
-        t = F.relu(instance.conv2_target(t))
-        t = F.relu(instance.conv3_target(t))
-
-    p = p.view(p.size(0), -1)
-    t = t.view(t.size(0), -1)
+def conv_head(instance, s_next, tower):
+    # tower: 'predict' or 'target'
+    x = s_next
+    for i in range(1, 4):
+        x = getattr(instance, f"conv{i}_{tower}")(x)
+        if instance.batch_norm:
+            x = getattr(instance, f"bn{i}_{tower}_conv")(x)
+        x = F.relu(x)
 
-    return p, t
+    return x.reshape(x.size(0), -1)
 
 
 def define_fc_layers_weight(instance, feature_size, D_hidden):
@@ -116,21 +101,18 @@ def define_fc_layers_weight(instance, feature_size, D_hidden):
     instance.fc1_target = torch.nn.Linear(feature_size, D_hidden)
 
 
-def fc_layers(instance, p, t):
-    p = F.relu(instance.fc1_predict(p))
-    p = F.relu(instance.fc2_predict(p))
-    p = instance.fc3_predict(p)
-
-    t = instance.fc1_target(t)
+def fc_layers(instance, x, tower):
+    if tower == "target":
+        return instance.fc1_target(x)
 
-    return p, t
+    x = F.relu(instance.fc1_predict(x))
+    x = F.relu(instance.fc2_predict(x))
+    return instance.fc3_predict(x)
 
 
 def ri_update(r_i, num_workers, rff, update_rms_ri):
     ri_T = r_i.view(num_workers, -1).T  # (n_batch, n_workers)
-    rewems = torch.stack(
-        [rff.update(rit.detach()) for rit in ri_T]
-    ).ravel()  # (n_batch, n_workers) -> (n_batch * n_workers)
+    rewems = rff.update(ri_T.detach()).ravel()  # (n_batch * n_workers)
     update_rms_ri(rewems)
 
 
@@ -170,11 +152,26 @@ class RND_MLP(torch.nn.Module):
     def update_rms_ri(self, v):
         self.rms_ri.update(v)
 
-    def forward(self, s_next, update_ri=False):
+    def normalize(self, s_next):
         if self.obs_normalize:
             s_next = normalize_obs(s_next, self.rms_obs.mean, self.rms_obs.var)
+        return s_next
 
-        p, t = mlp_head(self, s_next)
+    def head(self, s_next, tower):
+        return mlp_head(self, s_next, tower)
+
+    @torch.no_grad()
+    def get_target(self, s_next):
+        """
+        Features of the frozen target network, which can be computed once for a rollout and given to forward.
+        """
+        return self.head(self.normalize(s_next), "target")
+
+    def forward(self, s_next, update_ri=False, t=None):
+        s_next = self.normalize(s_next)
+
+        p = self.head(s_next, "predict")
+        t = self.head(s_next, "target") if t is None else t
 
         r_i = torch.mean(torch.square(p - t), axis=1)
 
@@ -220,13 +217,27 @@ class RND_CNN(torch.nn.Module):
     def update_rms_ri(self, v):
         self.rms_ri.update(v)
 
-    def forward(self, s_next, update_ri=False):
+    def normalize(self, s_next):
         s_next = s_next / 255.0
         if self.obs_normalize:
             s_next = normalize_obs(s_next, self.rms_obs.mean, self.rms_obs.var)
+        return s_next
+
+    def head(self, s_next, tower):
+        return fc_layers(self, conv_head(self, s_next, tower), tower)
 
-        p, t = conv_head(self, s_next)
-        p, t = fc_layers(self, p, t)
+    @torch.no_grad()
+    def get_target(self, s_next):
+        """
+        Features of the frozen target network, which can be computed once for a rollout and given to forward.
+        """
+        return self.head(self.normalize(s_next), "target")
+
+    def forward(self, s_next, update_ri=False, t=None):
+        s_next = self.normalize(s_next)
+
+        p = self.head(s_next, "predict")
+        t = self.head(s_next, "target") if t is None else t
 
         r_i = torch.mean(torch.square(p - t), axis=1)
 
@@ -286,12 +297,10 @@ class RND_Multi(torch.nn.Module):
     def update_rms_ri(self, v):
         self.rms_ri.update(v)
 
-    def forward(self, s_next, update_ri=False):
-        s_next_img = s_next[0]
+    def normalize(self, s_next):
+        s_next_img = s_next[0] / 255.0
         s_next_vec = s_next[1]
 
-        s_next_img = s_next_img / 255.0
-
         if self.obs_normalize:
             s_next_img = normalize_obs(
                 s_next_img, self.rms_obs_img.mean, self.rms_obs_img.var
@@ -299,14 +308,25 @@ class RND_Multi(torch.nn.Module):
             s_next_vec = normalize_obs(
                 s_next_vec, self.rms_obs_vec.mean, self.rms_obs_vec.var
             )
+        return [s_next_img, s_next_vec]
+
+    def head(self, s_next, tower):
+        x_conv = conv_head(self, s_next[0], tower)
+        x_mlp = mlp_head(self, s_next[1], tower)
+        return fc_layers(self, torch.cat((x_conv, x_mlp), -1), tower)
 
-        p_conv, t_conv = conv_head(self, s_next_img)
-        p_mlp, t_mlp = mlp_head(self, s_next_vec)
+    @torch.no_grad()
+    def get_target(self, s_next):
+        """
+        Features of the frozen target network, which can be computed once for a rollout and given to forward.
+        """
+        return self.head(self.normalize(s_next), "target")
 
-        p = torch.cat((p_conv, p_mlp), -1)
-        t = torch.cat((t_conv, t_mlp), -1)
+    def forward(self, s_next, update_ri=False, t=None):
+        s_next = self.normalize(s_next)
 
-        p, t = fc_layers(self, p, t)
+        p = self.head(s_next, "predict")
+        t = self.head(s_next, "target") if t is None else t
 
         r_i = torch.mean(torch.square(p - t), axis=1)
 
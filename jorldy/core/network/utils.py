@@ -1,54 +1,331 @@
+import warnings
+
 import torch
 import torch.nn.functional as F
 
 # codes from https://github.com/openai/random-network-distillation
 class RewardForwardFilter(torch.nn.Module):
-    def __init__(self, gamma, num_workers):
+    def __init__(self, gamma, num_workers, chunk_size=256):
         super(RewardForwardFilter, self).__init__()
         self.rewems = torch.nn.Parameter(torch.zeros(num_workers), requires_grad=False)
         self.gamma = gamma
+        self.chunk_size = chunk_size
 
     def update(self, rews):
-        self.rewems.data = self.rewems * self.gamma + rews
-        return self.rewems
+        """
+        Update the discounted sum of rewards of each worker with the rewards of a step,
+        or the rewards of the steps in order of time at once, and return the discounted sums of each step.
+
+        Parameter Type / Shape
+        - rews:     tensor / (num_workers,) or (T, num_workers)
+        - return:   tensor / (num_workers,) or (T, num_workers)
+        """
+        if rews.dim() == 1:
+            self.rewems.data = self.rewems * self.gamma + rews
+            return self.rewems
+
+        # the scan rewems_t = gamma * rewems_t-1 + rews_t is computed in chunks of time with a matrix of discount factors.
+        rewems = []
+        for _rews in rews.split(self.chunk_size):
+            t = torch.arange(len(_rews), device=_rews.device)
+            lag = t[:, None] - t[None, :]
+            discount = torch.where(
+                lag >= 0, self.gamma ** lag.clamp(min=0).to(_rews.dtype), 0
+            )
+            _rewems = discount @ _rews + self.gamma ** (t[:, None] + 1) * self.rewems
+            self.rewems.data = _rewems[-1]
+            rewems.append(_rewems)
+        return torch.cat(rewems)
 
 
 # codes modified from https://github.com/openai/random-network-distillation
 class RunningMeanStd(torch.nn.Module):
+    """Streaming mean and variance of inputs.
+
+    Moments of each batch are computed in two passes and merged with Chan's parallel algorithm,
+    so moments of other workers (update_from_moments or merge) can be merged in any order.
+    """
+
     def __init__(self, shape, epsilon=1e-4):
         super(RunningMeanStd, self).__init__()
 
         self.mean = torch.nn.Parameter(torch.zeros(shape), requires_grad=False)
         self.var = torch.nn.Parameter(torch.zeros(shape), requires_grad=False)
-        self.count = torch.nn.Parameter(torch.tensor(epsilon), requires_grad=False)
+        # count is kept in float64 to count past 2 ** 24 samples.
+        self.count = torch.nn.Parameter(
+            torch.tensor(epsilon, dtype=torch.float64), requires_grad=False
+        )
 
     def update(self, x):
-        batch_mean, batch_std, batch_count = x.mean(axis=0), x.std(axis=0), x.shape[0]
-        batch_var = torch.square(batch_std)
-        self.update_from_moments(batch_mean, batch_var, batch_count)
+        x = x.reshape(-1, *self.mean.shape).to(self.mean.dtype)
+        batch_mean = x.mean(axis=0)
+        batch_var = x.var(axis=0, unbiased=False)
+        self.update_from_moments(batch_mean, batch_var, x.shape[0])
+
+    def merge(self, other):
+        self.update_from_moments(other.mean, other.var, other.count)
 
     def update_from_moments(self, batch_mean, batch_var, batch_count):
-        delta = batch_mean - self.mean
         tot_count = self.count + batch_count
+        ratio = (batch_count / tot_count).to(self.mean.dtype)
 
-        new_mean = self.mean + delta * batch_count / tot_count
-        m_a = self.var * self.count
-        m_b = batch_var * (batch_count)
-        M2 = (
-            m_a
-            + m_b
-            + torch.square(delta)
-            * self.count
-            * batch_count
-            / (self.count + batch_count)
-        )
-        new_var = M2 / (self.count + batch_count)
-
-        new_count = batch_count + self.count
+        delta = batch_mean - self.mean
+        new_mean = self.mean + delta * ratio
+        # M2 / tot_count = var_a * (1 - ratio) + var_b * ratio + delta^2 * ratio * (1 - ratio)
+        new_var = (self.var + torch.square(delta) * ratio) * (
+            1 - ratio
+        ) + batch_var * ratio
 
         self.mean.data = new_mean
         self.var.data = new_var
-        self.count.data = new_count
+        self.count.data = tot_count
+
+
+class LossScaler:
+    """Dynamic loss scale for float16 mixed precision.
+
+    Args:
+        init_scale (float): initial scale factor.
+        growth_factor (float): factor to multiply the scale by after growth_interval steps without inf or nan.
+        backoff_factor (float): factor to multiply the scale by when inf or nan gradients are found.
+        growth_interval (int): number of consecutive steps without inf or nan to grow the scale.
+    """
+
+    def __init__(
+        self,
+        init_scale=2.0 ** 16,
+        growth_factor=2.0,
+        backoff_factor=0.5,
+        growth_interval=2000,
+    ):
+        self.scale = init_scale
+        self.growth_factor = growth_factor
+        self.backoff_factor = backoff_factor
+        self.growth_interval = growth_interval
+        self.growth_stamp = 0
+
+    def update(self, found_inf):
+        if found_inf:
+            self.scale *= self.backoff_factor
+            self.growth_stamp = 0
+        else:
+            self.growth_stamp += 1
+            if self.growth_stamp >= self.growth_interval:
+                self.scale *= self.growth_factor
+                self.growth_stamp = 0
+
+
+class MixedPrecisionForward:
+    def __init__(self, forward, device_type, dtype, memory_format, hooks=[]):
+        self.forward = forward
+        self.device_type = device_type
+        self.dtype = dtype
+        self.memory_format = memory_format
+        self.hooks = hooks
+
+    def __call__(self, *args, **kwargs):
+        args = [self.to_memory_format(x) for x in args]
+        if self.dtype == torch.float32:
+            return self.forward(*args, **kwargs)
+        with torch.autocast(self.device_type, dtype=self.dtype):
+            out = self.forward(*args, **kwargs)
+        return self.to_float(out)
+
+    def to_memory_format(self, x):
+        if isinstance(x, (list, tuple)):
+            return type(x)(self.to_memory_format(_x) for _x in x)
+        if torch.is_tensor(x) and x.dim() == 4:
+            return x.contiguous(memory_format=self.memory_format)
+        return x
+
+    def to_float(self, x):
+        if isinstance(x, (list, tuple)):
+            return type(x)(self.to_float(_x) for _x in x)
+        if torch.is_tensor(x) and x.is_floating_point():
+            x = x.float()
+        return x
+
+
+def unscale_grad(params, loss_scaler):
+    # unscale gradients of parameters as soon as they are computed, since the loss is scaled once before backward.
+    return [
+        param.register_hook(lambda grad: grad / loss_scaler.scale)
+        for param in params
+        if param.requires_grad
+    ]
+
+
+def set_mixed_precision(
+    module,
+    device_type,
+    precision="fp32",
+    memory_format="contiguous_format",
+    loss_scaler=None,
+):
+    dtype = {"fp32": torch.float32, "bf16": torch.bfloat16, "fp16": torch.float16}[
+        precision
+    ]
+    assert memory_format in ["contiguous_format", "channels_last"]
+    assert dtype != torch.float16 or device_type == "cuda"
+    if dtype != torch.float32 and not hasattr(torch, "autocast"):
+        print("### torch.autocast is not supported. float32 is used. ###")
+        dtype = torch.float32
+    memory_format = getattr(torch, memory_format)
+
+    module.to(memory_format=memory_format)
+    forward = module.forward
+    if isinstance(forward, MixedPrecisionForward):
+        for hook in forward.hooks:
+            hook.remove()
+        forward = forward.forward
+    hooks = unscale_grad(module.parameters(), loss_scaler) if loss_scaler else []
+    module.forward = MixedPrecisionForward(
+        forward, device_type, dtype, memory_format, hooks
+    )
+    return module
+
+
+@torch.no_grad()
+def update_target_network(target, source, tau=1.0):
+    """
+    Update the parameters and buffers (e.g. batch norm statistics) of the target network in place,
+    with Polyak averaging target = (1 - tau) * target + tau * source, or copy when tau is 1.
+    Floating point tensors are updated with fused foreach kernels, and the others (e.g. num_batches_tracked) are copied.
+    """
+    targets, sources, t_others, s_others = [], [], [], []
+    for t_tensors, s_tensors in (
+        (target.parameters(), source.parameters()),
+        (target.buffers(), source.buffers()),
+    ):
+        for t, s in zip(t_tensors, s_tensors):
+            if t.is_floating_point() and tau < 1.0:
+                targets.append(t)
+                sources.append(s)
+            else:
+                t_others.append(t)
+                s_others.append(s)
+
+    if targets:
+        if hasattr(torch, "_foreach_lerp_"):
+            torch._foreach_lerp_(targets, sources, tau)
+        else:
+            for t, s in zip(targets, sources):
+                t.lerp_(s, tau)
+    if t_others:
+        if hasattr(torch, "_foreach_copy_"):
+            torch._foreach_copy_(t_others, s_others)
+        else:
+            for t, s in zip(t_others, s_others):
+                t.copy_(s)
+
+
+def is_input(x):
+    if isinstance(x, (list, tuple)):
+        return len(x) > 0 and all(torch.is_tensor(_x) for _x in x)
+    return torch.is_tensor(x)
+
+
+def flatten_output(x):
+    if isinstance(x, (list, tuple)):
+        return [_y for _x in x for _y in flatten_output(_x)]
+    return [x]
+
+
+class Traceable(torch.nn.Module):
+    def __init__(self, module, forward, args):
+        super(Traceable, self).__init__()
+        self.module = module
+        self.module_forward = forward
+        self.args = args
+
+    def forward(self, *inputs):
+        inputs = iter(inputs)
+        args = [next(inputs) if is_input(x) else x for x in self.args]
+        return self.module_forward(*args)
+
+
+class CompiledForward:
+    def __init__(self, module, forward, mode):
+        self.module = module
+        self.forward = forward
+        self.mode = mode
+        self.cache = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["cache"] = {}
+        return state
+
+    def __call__(self, *args, **kwargs):
+        # only inference path is compiled, learning path is run in eager mode.
+        if torch.is_grad_enabled() or kwargs:
+            return self.forward(*args, **kwargs)
+        try:
+            key = (self.module.training,) + tuple(
+                tuple((_x.shape, _x.dtype, _x.device) for _x in x)
+                if isinstance(x, (list, tuple)) and is_input(x)
+                else (x.shape, x.dtype, x.device)
+                if torch.is_tensor(x)
+                else x
+                for x in args
+            )
+            hash(key)
+        except TypeError:
+            return self.forward(*args)
+        if key not in self.cache:
+            self.cache[key] = self.compile(args)
+        compiled = self.cache[key]
+        if compiled is None:
+            return self.forward(*args)
+        return compiled(*[x for x in args if is_input(x)])
+
+    def compile(self, args):
+        traceable = Traceable(self.module, self.forward, args)
+        inputs = tuple(x for x in args if is_input(x))
+        devices = [x.device for x in flatten_output(inputs) if x.device.type == "cuda"][
+            :1
+        ]
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                compiled = None
+                if self.mode == "compile" and hasattr(torch, "compile"):
+                    try:
+                        compiled = torch.compile(traceable)
+                    except RuntimeError:
+                        compiled = None
+                if compiled is None:
+                    compiled = torch.jit.trace(traceable, inputs, check_trace=False)
+
+                # check compiled output is same as eager output with same random state.
+                with torch.random.fork_rng(devices=devices):
+                    rng_state = torch.get_rng_state()
+                    expected = flatten_output(self.forward(*args))
+                    torch.set_rng_state(rng_state)
+                    output = flatten_output(compiled(*inputs))
+            assert len(expected) == len(output)
+            for e, o in zip(expected, output):
+                assert torch.is_tensor(o) and torch.allclose(e, o, rtol=1e-4, atol=1e-5)
+        except Exception:
+            print(
+                f"### {self.module.__class__.__name__} does not support {self.mode} mode. eager mode is used. ###"
+            )
+            compiled = None
+        return compiled
+
+    def reset(self, *args):
+        self.cache.clear()
+
+
+def set_compile(module, mode="trace"):
+    assert mode in ["trace", "compile"]
+    if isinstance(module.forward, CompiledForward):
+        return module
+    module.forward = CompiledForward(module, module.forward, mode)
+    # recompile after load_state_dict (e.g. sync_in, load)
+    if hasattr(module, "register_load_state_dict_post_hook"):
+        module.register_load_state_dict_post_hook(module.forward.reset)
+    return module
 
 
 def noisy_l(x, mu_w, sig_w, mu_b, sig_b, noise_type, is_train):
@@ -1,6 +1,8 @@
 import os, sys, inspect, re
 from collections import OrderedDict
 
+import torch
+import torch.distributed as dist
 from torch.optim import *
 
 optimizer_dict = {}
@@ -29,3 +31,75 @@ class Optimizer:
             print(f"### can use only follows {[opt for opt in optimizer_dict.keys()]}")
             raise Exception
         return optimizer_dict[name](*args, **kwargs)
+
+
+class DataParallelOptimizer:
+    """Optimizer wrapper which averages gradients over the data parallel learners before step.
+    Note that gradient clipping in learn is applied to the local gradients.
+
+    Args:
+        optimizer (torch.optim.Optimizer): optimizer to wrap.
+    """
+
+    def __init__(self, optimizer):
+        assert dist.is_initialized()
+        self.optimizer = optimizer
+        self.world_size = dist.get_world_size()
+
+    def __getattr__(self, name):
+        return getattr(self.optimizer, name)
+
+    def step(self, *args, **kwargs):
+        params = [p for group in self.optimizer.param_groups for p in group["params"]]
+        # all-reduce every gradient and the number of learners which have it at once.
+        flat = torch.cat(
+            [
+                p.grad.reshape(-1)
+                if p.grad is not None
+                else torch.zeros_like(p).view(-1)
+                for p in params
+            ]
+            + [torch.tensor([float(p.grad is not None) for p in params]).to(params[0])]
+        )
+        dist.all_reduce(flat)
+        offset = 0
+        for p in params:
+            numel = p.numel()
+            grad = flat[offset : offset + numel].view_as(p) / self.world_size
+            offset += numel
+            if p.grad is not None:
+                p.grad.copy_(grad)
+            else:
+                p.grad = grad
+        for p, count in zip(params, flat[offset:]):
+            if count == 0:
+                p.grad = None
+        return self.optimizer.step(*args, **kwargs)
+
+
+class MixedPrecisionOptimizer:
+    """Optimizer wrapper which skips step and updates loss scale when gradients have inf or nan.
+
+    Args:
+        optimizer (torch.optim.Optimizer): optimizer to wrap.
+        loss_scaler (core.network.utils.LossScaler): loss scale shared with networks.
+    """
+
+    def __init__(self, optimizer, loss_scaler):
+        self.optimizer = optimizer
+        self.loss_scaler = loss_scaler
+
+    def __getattr__(self, name):
+        return getattr(self.optimizer, name)
+
+    def step(self, *args, **kwargs):
+        found_inf = not all(
+            torch.isfinite(p.grad).all()
+            for group in self.optimizer.param_groups
+            for p in group["params"]
+            if p.grad is not None
+        )
+        self.loss_scaler.update(found_inf)
+        if found_inf:
+            return None
+        return self.optimizer.step(*args, **kwargs)
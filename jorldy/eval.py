@@ -1,5 +1,7 @@
 import argparse
 
+import numpy as np
+
 from core import *
 from manager import *
 
@@ -21,11 +23,9 @@ if __name__ == "__main__":
         "optim_config": config.optim,
     }
     agent_config.update(config.agent)
-    agent = Agent(**agent_config)
-    assert agent.action_type == env.action_type
-
     assert config.train.load_path
-    agent.load(config.train.load_path)
+    agent = Agent.for_inference(load_path=config.train.load_path, **agent_config)
+    assert agent.action_type == env.action_type
 
     episode, score = 0, 0
     state = env.reset()
@@ -41,7 +41,7 @@ if __name__ == "__main__":
         transition.update(action_dict)
         agent.interact_callback(transition)
         state = next_state
-        if done:
+        if np.any(done):
             episode += 1
             print(f"{episode} Episode / Step : {step} / Score: {env.score}")
             state = env.reset()
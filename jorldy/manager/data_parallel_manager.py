@@ -0,0 +1,111 @@
+import socket
+import datetime
+import multiprocessing as mp
+
+import torch.distributed as dist
+
+
+class DataParallelManager:
+    def __init__(
+        self,
+        Agent,
+        agent_config,
+        num_learners,
+        backend="gloo",
+        resource_manager=None,
+        timeout=1800,
+    ):
+        assert num_learners > 1
+        self.num_learners = num_learners
+        timeout = datetime.timedelta(seconds=timeout)
+
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            init_method = f"tcp://127.0.0.1:{sock.getsockname()[1]}"
+        # spawn learners, since forking after torch has started its thread pools may hang.
+        ctx = mp.get_context("spawn")
+        self.learners = [
+            ctx.Process(
+                target=learner_process,
+                args=(
+                    Agent,
+                    agent_config,
+                    rank,
+                    num_learners,
+                    init_method,
+                    backend,
+                    resource_manager,
+                    timeout,
+                ),
+                daemon=True,
+            )
+            for rank in range(1, num_learners)
+        ]
+        for learner in self.learners:
+            learner.start()
+        try:
+            dist.init_process_group(
+                backend,
+                init_method=init_method,
+                rank=0,
+                world_size=num_learners,
+                timeout=timeout,
+            )
+        except:
+            self.kill()
+            raise
+
+    def scatter(self, transitions, step):
+        # split into contiguous shards of same size so that rollouts of each actor are kept together.
+        assert len(transitions) % self.num_learners == 0
+        shard_size = len(transitions) // self.num_learners
+        shards = [
+            (transitions[i : i + shard_size], step)
+            for i in range(0, len(transitions), shard_size)
+        ]
+        shard = [None]
+        dist.scatter_object_list(shard, shards, src=0)
+        return shard[0][0]
+
+    def terminate(self):
+        # learners exit without destroying their process group, since gloo teardown may hang.
+        dist.scatter_object_list([None], [None] * self.num_learners, src=0)
+        for learner in self.learners:
+            learner.join(timeout=10)
+        self.kill()
+
+    def kill(self):
+        for learner in self.learners:
+            learner.terminate()
+            learner.join()
+        if dist.is_initialized():
+            dist.destroy_process_group()
+
+
+def learner_process(
+    Agent,
+    agent_config,
+    rank,
+    num_learners,
+    init_method,
+    backend,
+    resource_manager,
+    timeout,
+):
+    if resource_manager:
+        resource_manager.apply("learner", rank)
+    dist.init_process_group(
+        backend,
+        init_method=init_method,
+        rank=rank,
+        world_size=num_learners,
+        timeout=timeout,
+    )
+    agent = Agent(**agent_config).set_data_parallel()
+    while True:
+        shard = [None]
+        dist.scatter_object_list(shard, None, src=0)
+        if shard[0] is None:
+            break
+        transitions, step = shard[0]
+        agent.process(transitions, step)
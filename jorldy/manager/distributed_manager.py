@@ -1,32 +1,58 @@
 import os
 from functools import reduce
 
+import numpy as np
 import ray
 
 
 class DistributedManager:
-    def __init__(self, Env, env_config, Agent, agent_config, num_workers, mode):
+    def __init__(
+        self,
+        Env,
+        env_config,
+        Agent,
+        agent_config,
+        num_workers,
+        mode,
+        max_policy_lag=0,
+        resource_manager=None,
+    ):
         assert ray.is_initialized() == False
         try:
             ray.init(address="auto")
         except:
             ray.init()
-        agent = Agent(**agent_config)
+        agent = Agent.for_inference(**agent_config)
         self.num_workers = num_workers if num_workers else os.cpu_count()
         Env, env_config, agent = map(ray.put, [Env, dict(env_config), agent])
         self.actors = [
-            Actor.remote(Env, env_config, agent, i) for i in range(self.num_workers)
+            RemoteActor.remote(Env, env_config, agent, i, resource_manager)
+            for i in range(self.num_workers)
         ]
 
         assert mode in ["sync", "async"]
+        assert max_policy_lag in [0, 1]
         self.mode = mode
+        self.max_policy_lag = max_policy_lag
         self.sync_item = None
         self.running_ids = []
+        self.sync_ids = []
 
     def run(self, step=1):
         assert step > 0
         if self.mode == "sync":
-            items = ray.get([actor.run.remote(step) for actor in self.actors])
+            if len(self.running_ids) == 0:
+                self.running_ids = [actor.run.remote(step) for actor in self.actors]
+            items = ray.get(self.running_ids)
+            # pipelined mode: actors collect the next batch while learner processes this one.
+            self.running_ids = (
+                [actor.run.remote(step) for actor in self.actors]
+                if self.max_policy_lag > 0
+                else []
+            )
+            # queued syncs are applied before the new runs, so check their results here.
+            ray.get(self.sync_ids)
+            self.sync_ids = []
             transitions = reduce(lambda x, y: x + y, [item[1] for item in items])
         else:
             if len(self.running_ids) == 0:
@@ -53,20 +79,25 @@ class DistributedManager:
     def sync(self, sync_item):
         if self.mode == "sync":
             sync_item = ray.put(sync_item)
-            ray.get([actor.sync.remote(sync_item) for actor in self.actors])
+            self.sync_ids += [actor.sync.remote(sync_item) for actor in self.actors]
+            # actor calls are executed in order, so sync is applied right after the running batch.
+            if self.max_policy_lag == 0:
+                ray.get(self.sync_ids)
+                self.sync_ids = []
         else:
             self.sync_item = ray.put(sync_item)
 
     def terminate(self):
-        if len(self.running_ids) > 0:
-            ray.get(self.running_ids)
+        if len(self.running_ids + self.sync_ids) > 0:
+            ray.get(self.running_ids + self.sync_ids)
         ray.shutdown()
 
 
-@ray.remote
 class Actor:
-    def __init__(self, Env, env_config, agent, id):
+    def __init__(self, Env, env_config, agent, id, resource_manager=None):
         self.id = id
+        if resource_manager:
+            resource_manager.apply("actor", id)
         self.env = Env(id=id + 1, **env_config)
         self.agent = agent.set_distributed(id)
         self.state = self.env.reset()
@@ -86,8 +117,11 @@ class Actor:
             transition = self.agent.interact_callback(transition)
             if transition:
                 transitions.append(transition)
-            self.state = next_state if not done else self.env.reset()
+            self.state = next_state if not np.any(done) else self.env.reset()
         return self.id, transitions
 
     def sync(self, sync_item):
         self.agent.sync_in(**sync_item)
+
+
+RemoteActor = ray.remote(Actor)
@@ -3,6 +3,9 @@ import numpy as np
 
 class EvalManager:
     def __init__(self, Env, env_config, iteration=10, record=None, record_period=None):
+        # evaluation runs a single env, even if the training env is vectorized.
+        if env_config.get("num_envs", 1) > 1:
+            env_config = {**env_config, "num_envs": 1}
         self.env = Env(**env_config)
         self.iteration = iteration if iteration else 10
         assert iteration > 0
@@ -21,7 +24,7 @@ class EvalManager:
         for i in range(self.iteration):
             done = False
             state = self.env.reset()
-            while not done:
+            while not np.any(done):
                 # record first iteration
                 if record and i == 0:
                     frames.append(self.env.get_frame())
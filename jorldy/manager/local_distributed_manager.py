@@ -0,0 +1,157 @@
+import os
+import queue
+import traceback
+import multiprocessing as mp
+from functools import reduce
+
+import torch
+
+from .distributed_manager import Actor
+
+
+class LocalDistributedManager:
+    def __init__(
+        self,
+        Env,
+        env_config,
+        Agent,
+        agent_config,
+        num_workers,
+        mode,
+        max_policy_lag=0,
+        resource_manager=None,
+        timeout=600,
+    ):
+        agent = Agent.for_inference(**agent_config)
+        self.num_workers = num_workers if num_workers else os.cpu_count()
+        self.timeout = timeout
+
+        # actors read weights from shared memory tensors and sync in only when the version is changed.
+        ctx = mp.get_context("spawn")
+        self.sync_item = share_memory(agent.sync_out())
+        self.version = ctx.Value("i", 0)
+        self.run_queues = [ctx.Queue() for _ in range(self.num_workers)]
+        self.result_queue = ctx.Queue()
+        self.actors = [
+            ctx.Process(
+                target=actor_process,
+                args=(
+                    Env,
+                    dict(env_config),
+                    agent,
+                    i,
+                    resource_manager,
+                    self.sync_item,
+                    self.version,
+                    self.run_queues[i],
+                    self.result_queue,
+                ),
+                daemon=True,
+            )
+            for i in range(self.num_workers)
+        ]
+        for actor in self.actors:
+            actor.start()
+
+        assert mode in ["sync", "async"]
+        assert max_policy_lag in [0, 1]
+        self.mode = mode
+        self.max_policy_lag = max_policy_lag
+        self.running_ids = []
+
+    def run(self, step=1):
+        assert step > 0
+        if len(self.running_ids) == 0:
+            self.request(range(self.num_workers), step)
+        if self.mode == "sync":
+            items = sorted(self.receive(self.num_workers))
+            # pipelined mode: actors collect the next batch while learner processes this one.
+            if self.max_policy_lag > 0:
+                self.request(range(self.num_workers), step)
+        else:
+            items = self.receive(1)
+            while len(self.running_ids) > 0:
+                try:
+                    items += self.receive(1, block=False)
+                except queue.Empty:
+                    break
+            self.request([item[0] for item in items], step)
+
+        transitions = reduce(lambda x, y: x + y, [item[1] for item in items])
+        return transitions
+
+    def sync(self, sync_item):
+        # actors check the version before each run, so the running batch keeps its weights.
+        with self.version.get_lock():
+            copy_memory(self.sync_item, sync_item)
+            self.version.value += 1
+
+    def request(self, ids, step):
+        for id in ids:
+            self.run_queues[id].put(step)
+            self.running_ids.append(id)
+
+    def receive(self, num, block=True):
+        items = []
+        for _ in range(num):
+            id, item = self.result_queue.get(block=block, timeout=self.timeout)
+            if isinstance(item, str):
+                raise RuntimeError(f"Actor {id} failed.\n{item}")
+            self.running_ids.remove(id)
+            items.append((id, item))
+        return items
+
+    def terminate(self):
+        try:
+            while len(self.running_ids) > 0:
+                self.receive(1)
+        finally:
+            for run_queue in self.run_queues:
+                run_queue.put(None)
+            for actor in self.actors:
+                actor.join(timeout=10)
+                if actor.is_alive():
+                    actor.terminate()
+                    actor.join()
+
+
+def share_memory(item):
+    if isinstance(item, dict):
+        return {key: share_memory(value) for key, value in item.items()}
+    assert isinstance(item, torch.Tensor), "sync item should only have tensors."
+    return item.detach().cpu().clone().share_memory_()
+
+
+def copy_memory(shared_item, item):
+    if isinstance(shared_item, dict):
+        for key in shared_item.keys():
+            copy_memory(shared_item[key], item[key])
+    else:
+        shared_item.copy_(item)
+
+
+def actor_process(
+    Env,
+    env_config,
+    agent,
+    id,
+    resource_manager,
+    sync_item,
+    version,
+    run_queue,
+    result_queue,
+):
+    try:
+        actor = Actor(Env, env_config, agent, id, resource_manager)
+        _version = 0
+        while True:
+            step = run_queue.get()
+            if step is None:
+                break
+            with version.get_lock():
+                if version.value != _version:
+                    actor.sync(sync_item)
+                    _version = version.value
+            result_queue.put(actor.run(step))
+    except Exception as e:
+        result_queue.put((id, traceback.format_exc()))
@@ -0,0 +1,68 @@
+import os
+
+import torch
+
+
+class ResourceManager:
+    def __init__(
+        self,
+        num_workers,
+        num_learners=1,
+        learner_cores=None,
+        actor_threads=1,
+        pin_cores=True,
+    ):
+        self.cpus = (
+            sorted(os.sched_getaffinity(0))
+            if hasattr(os, "sched_getaffinity")
+            else list(range(os.cpu_count()))
+        )
+        num_cpus = len(self.cpus)
+        num_workers = num_workers if num_workers is not None else num_cpus
+        self.num_learners = num_learners
+        self.actor_threads = actor_threads
+        self.pin_cores = pin_cores and hasattr(os, "sched_setaffinity")
+
+        # reserve learner cores first, then one core shared by manage and interact process, and the rest for actors.
+        if learner_cores is None:
+            learner_cores = num_cpus - 1 - num_workers * actor_threads
+        learner_cores = min(max(learner_cores, num_learners), num_cpus)
+        self.learner_cpus = self.cpus[:learner_cores]
+        self.manage_cpus = self.cpus[learner_cores : learner_cores + 1] or self.cpus
+        self.actor_cpus = self.cpus[learner_cores + 1 :] or self.cpus
+
+    def plan(self, role, id=0):
+        """
+        Return the cores and the number of threads of the id-th process of the role.
+
+        Args:
+            role (str): role of the process ('learner', 'actor', 'manage' or 'interact').
+            id (int): id of the process in the role (rank of the learner, id of the actor).
+        """
+        assert role in ["learner", "actor", "manage", "interact"]
+        if role == "learner":
+            # split learner cores into contiguous groups for data parallel learners.
+            size = max(len(self.learner_cpus) // self.num_learners, 1)
+            cores = self.learner_cpus[id * size : (id + 1) * size] or self.learner_cpus
+            return cores, len(cores)
+        elif role == "actor":
+            # actors get disjoint cores while there are enough, and are spread round-robin otherwise.
+            cores = [
+                self.actor_cpus[(id * self.actor_threads + i) % len(self.actor_cpus)]
+                for i in range(self.actor_threads)
+            ]
+            return sorted(set(cores)), self.actor_threads
+        else:
+            return self.manage_cpus, 1
+
+    def apply(self, role, id=0):
+        """
+        Set the thread count of torch, OpenMP and MKL, and the core affinity of the current process according to the plan.
+        """
+        cores, num_threads = self.plan(role, id)
+        os.environ["OMP_NUM_THREADS"] = str(num_threads)
+        os.environ["MKL_NUM_THREADS"] = str(num_threads)
+        torch.set_num_threads(num_threads)
+        if self.pin_cores:
+            os.sched_setaffinity(0, cores)
+        return cores, num_threads
@@ -9,8 +9,11 @@ def interact_process(
     sync_queue,
     run_step,
     update_period,
+    resource_manager=None,
 ):
     distributed_manager = DistributedManager(*distributed_manager_config)
+    if resource_manager:
+        resource_manager.apply("interact")
     num_workers = distributed_manager.num_workers
     step = 0
     try:
@@ -44,8 +47,11 @@ def manage_process(
     LogManager,
     log_manager_config,
     config_manager,
+    resource_manager=None,
 ):
-    agent = Agent(**agent_config)
+    if resource_manager:
+        resource_manager.apply("manage")
+    agent = Agent.for_inference(**agent_config)
     eval_manager = EvalManager(*eval_manager_config)
     metric_manager = MetricManager()
     log_manager = LogManager(*log_manager_config)
@@ -1,6 +1,7 @@
 import argparse
 
 import multiprocessing as mp
+import numpy as np
 
 from core import *
 from manager import *
@@ -26,6 +27,16 @@ if __name__ == "__main__":
     }
     agent_config.update(config.agent)
 
+    resource_manager = (
+        ResourceManager(
+            num_workers=0,
+            learner_cores=config.train.learner_cores,
+            pin_cores=config.train.pin_cores != False,
+        )
+        if config.train.plan_resource
+        else None
+    )
+
     result_queue = mp.Queue()
     manage_sync_queue = mp.Queue(1)
     path_queue = mp.Queue(1)
@@ -60,10 +71,13 @@ if __name__ == "__main__":
             LogManager,
             log_manager_config,
             config_manager,
+            resource_manager,
         ),
     )
     manage.start()
     try:
+        if resource_manager:
+            resource_manager.apply("learner")
         agent = Agent(**agent_config)
         assert agent.action_type == env.action_type
         if config.train.load_path:
@@ -82,9 +96,9 @@ if __name__ == "__main__":
             }
             transition.update(action_dict)
             transition = agent.interact_callback(transition)
-            if transition:
-                result = agent.process([transition], step)
-                result_queue.put((step, result))
+            # report every step, since recurrent agents do not return a transition at every step.
+            result = agent.process([transition], step) if transition else {}
+            result_queue.put((step, result))
             if step % config.train.print_period == 0 or step == config.train.run_step:
                 try:
                     manage_sync_queue.get_nowait()
@@ -94,7 +108,7 @@ if __name__ == "__main__":
             if step % config.train.save_period == 0 or step == config.train.run_step:
                 agent.save(save_path)
 
-            state = next_state if not done else env.reset()
+            state = next_state if not np.any(done) else env.reset()
     except Exception as e:
         traceback.print_exc()
         manage.terminate()
@@ -28,8 +28,31 @@ if __name__ == "__main__":
     env.close()
 
     agent_config.update(config.agent)
+    num_learners = config.train.num_learners if config.train.num_learners else 1
+    assert config.train.num_workers % num_learners == 0
     if config.train.distributed_batch_size:
-        agent_config["batch_size"] = config.train.distributed_batch_size
+        agent_config["batch_size"] = config.train.distributed_batch_size // num_learners
+    if config.train.replay_ratio:
+        agent_config["replay_ratio"] = config.train.replay_ratio
+    # each learner processes contiguous transitions of num_workers // num_learners actors.
+    learner_config = {
+        **agent_config,
+        "num_workers": config.train.num_workers // num_learners,
+    }
+
+    resource_manager = (
+        ResourceManager(
+            config.train.num_workers,
+            num_learners=num_learners,
+            learner_cores=config.train.learner_cores,
+            actor_threads=config.train.actor_threads
+            if config.train.actor_threads
+            else 1,
+            pin_cores=config.train.pin_cores != False,
+        )
+        if config.train.plan_resource
+        else None
+    )
 
     result_queue = mp.Queue()
     manage_sync_queue = mp.Queue(1)
@@ -65,24 +88,43 @@ if __name__ == "__main__":
             LogManager,
             log_manager_config,
             config_manager,
+            resource_manager,
         ),
     )
 
     manage.start()
     try:
-        distributed_manager = DistributedManager(
+        data_parallel_manager = (
+            DataParallelManager(
+                Agent, learner_config, num_learners, resource_manager=resource_manager
+            )
+            if num_learners > 1
+            else None
+        )
+
+        distributed_manager = (
+            LocalDistributedManager
+            if config.train.distributed_backend == "local"
+            else DistributedManager
+        )(
             Env,
             config.env,
             Agent,
             {"device": "cpu", **agent_config},
             config.train.num_workers,
             "sync",
+            config.train.max_policy_lag if config.train.max_policy_lag else 0,
+            resource_manager,
         )
+        if resource_manager:
+            resource_manager.apply("learner")
 
-        agent = Agent(**agent_config)
+        agent = Agent(**learner_config)
         assert agent.action_type == env.action_type
         if config.train.load_path:
             agent.load(config.train.load_path)
+        if data_parallel_manager:
+            agent.set_data_parallel()
 
         save_path = path_queue.get()
         step, print_stamp, save_stamp = 0, 0, 0
@@ -91,6 +133,8 @@ if __name__ == "__main__":
             step += config.train.update_period
             print_stamp += config.train.update_period
             save_stamp += config.train.update_period
+            if data_parallel_manager:
+                transitions = data_parallel_manager.scatter(transitions, step)
             result = agent.process(transitions, step)
             distributed_manager.sync(agent.sync_out())
             result_queue.put((step, result))
@@ -107,6 +151,9 @@ if __name__ == "__main__":
             if save_stamp >= config.train.save_period or step >= config.train.run_step:
                 agent.save(save_path)
                 save_stamp = 0
+        distributed_manager.terminate()
+        if data_parallel_manager:
+            data_parallel_manager.terminate()
     except Exception as e:
         traceback.print_exc()
         manage.terminate()
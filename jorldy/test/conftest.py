@@ -7,7 +7,7 @@ import pytest
 
 
 class _MockEnv:
-    def __init__(self, state_size, action_size, action_type, episode_len):
+    def __init__(self, state_size, action_size, action_type, episode_len, id=0):
         self.state_size = state_size
         self.action_size = action_size
         self.action_type = action_type
@@ -53,6 +53,10 @@ class _MockAgent:
 
         assert self.action_type in ["discrete", "continuous"]
 
+    @classmethod
+    def for_inference(cls, *args, **kwargs):
+        return cls(*args, **kwargs)
+
     def act(self, state, training=True):
         batch_size = state[0].shape[0] if isinstance(state, list) else state.shape[0]
 
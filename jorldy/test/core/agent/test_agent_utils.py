@@ -0,0 +1,123 @@
+import torch
+
+from core.agent.utils import (
+    RateLimiter,
+    project_distribution,
+    retrace,
+    select_q,
+    select_dist,
+    select_greedy,
+    unique_observation,
+)
+
+
+def test_rate_limiter():
+    samples_per_insert, tolerance = 0.25, 1.0
+    rate_limiter = RateLimiter(samples_per_insert, tolerance)
+
+    # test throttle when learner is ahead
+    assert rate_limiter.permit(2) == 1
+    assert rate_limiter.permit(1) == 0
+
+    # test catch up when actors outpace learner
+    assert rate_limiter.permit(100) == 25
+    assert rate_limiter.num_sample <= rate_limiter.num_insert * samples_per_insert + 1
+
+
+def dense_project_distribution(target_p, Tz, done, v_min, v_max, delta_z):
+    # projection with one-hot supports, which project_distribution replaces.
+    num_support = Tz.shape[-1]
+    b = torch.clamp(Tz - v_min, 0, v_max - v_min) / delta_z
+    l = torch.floor(b).long()
+    u = torch.ceil(b).long()
+
+    support_eye = torch.eye(num_support)
+    l_support_onehot = support_eye[l]
+    u_support_onehot = support_eye[u]
+    lluu = l_support_onehot * torch.unsqueeze(
+        u - b, -1
+    ) + u_support_onehot * torch.unsqueeze(b - l, -1)
+
+    target_dist = done * torch.mean(l_support_onehot * u_support_onehot + lluu, 1)
+    target_dist += (1 - done) * torch.sum(torch.unsqueeze(target_p, -1) * lluu, 1)
+    target_dist /= torch.clamp(torch.sum(target_dist, 1, keepdim=True), min=1e-8)
+    return target_dist
+
+
+def test_project_distribution():
+    batch_size, num_support, v_min, v_max, gamma = 64, 51, -10, 10, 0.99
+    delta_z = (v_max - v_min) / (num_support - 1)
+    z = torch.linspace(v_min, v_max, num_support).view(1, -1)
+
+    target_p = torch.softmax(torch.randn(batch_size, num_support), -1)
+    # rewards on the support (l == u), out of the support (clamped) and random
+    reward = torch.cat(
+        [
+            torch.zeros(batch_size // 4, 1),
+            torch.full((batch_size // 4, 1), 2 * v_max),
+            torch.randn(batch_size // 2, 1) * v_max,
+        ]
+    )
+    done = (torch.rand(batch_size, 1) < 0.5).float()
+    for discount in [gamma, 1.0]:
+        Tz = reward + (1 - done) * discount * z
+        args = (target_p, Tz, done, v_min, v_max, delta_z)
+        assert torch.allclose(
+            project_distribution(*args), dense_project_distribution(*args), atol=1e-6
+        )
+
+
+def test_select():
+    batch_size, action_size, num_support = 8, 4, 5
+    q = torch.randn(batch_size, action_size)
+    dist = torch.randn(batch_size, action_size, num_support)
+    action = torch.randint(action_size, (batch_size, 1)).float()
+    one_hot_action = torch.eye(action_size)[action.view(-1).long()]
+
+    # test selection against one-hot actions
+    assert torch.equal(select_q(q, action), (q * one_hot_action).sum(1, keepdims=True))
+    assert torch.equal(select_dist(dist, action), one_hot_action.unsqueeze(1) @ dist)
+
+    # test greedy selection of other values
+    max_a = torch.argmax(q, -1, keepdim=True)
+    assert torch.equal(select_greedy(q, q), q.max(1, keepdims=True).values)
+    assert torch.equal(select_greedy(q, dist), select_dist(dist, max_a))
+
+
+def test_retrace():
+    batch_size, n_step, gamma = 5, 8, 0.9
+    q_ret, q_a = torch.randn(batch_size, n_step, 1), torch.randn(batch_size, n_step, 1)
+    c = torch.rand(batch_size, n_step, 1)
+    done = (torch.rand(batch_size, n_step, 1) < 0.2).float()
+
+    # test against the reverse loop over steps
+    expected = q_ret.clone()
+    for i in reversed(range(n_step - 1)):
+        expected[:, i] += (
+            gamma
+            * c[:, i + 1]
+            * (1 - done[:, i])
+            * (expected[:, i + 1] - q_a[:, i + 1])
+        )
+    assert torch.allclose(retrace(q_ret, q_a, c, done, gamma), expected, atol=1e-6)
+
+
+def test_unique_observation():
+    # two episodes of 3 steps, observations are the time step (the reset observation of the second episode is 10)
+    state = torch.tensor([0, 1, 2, 10, 11, 12.0])[:, None]
+    next_state = torch.tensor([1, 2, 3, 11, 12, 13.0])[:, None]
+
+    for multi in [False, True]:
+        s, s_next = (
+            ([state, state * 2], [next_state, next_state * 2])
+            if multi
+            else (state, next_state)
+        )
+        obs, next_idx = unique_observation(s, s_next)
+
+        # observations shared by next_state and the following state are kept once
+        obs = obs[0] if multi else obs
+        assert len(obs) == len(state) + 2
+        assert (obs[: len(state)] == state).all()
+        assert (obs[next_idx] == next_state).all()
+        assert (next_idx == torch.tensor([1, 2, 6, 4, 5, 7])).all()
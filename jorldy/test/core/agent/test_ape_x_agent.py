@@ -44,7 +44,7 @@ def test_ape_x(MockEnv):
 
     # test after inteact
     assert agent.time_t == run_step
-    assert agent.memory.size == (run_step - n_step)
+    assert agent.memory.size == run_step - n_step
     assert agent.beta == 1.0
 
     # test save and load
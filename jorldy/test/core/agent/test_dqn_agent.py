@@ -1,3 +1,6 @@
+import torch
+
+from core.agent import Agent
 from core.agent.dqn import DQN
 from .utils import check_interact, check_save_load, check_sync_in_out
 
@@ -41,3 +44,98 @@ def test_dqn(MockEnv):
 
     # test sync in and out
     check_sync_in_out(agent)
+
+
+def test_replay_ratio(MockEnv):
+    state_size, action_size, action_type = 2, 3, "discrete"
+    episode_len = 10
+    env = MockEnv(state_size, action_size, action_type, episode_len)
+
+    batch_size, start_train_step, run_step = 4, 8, 20
+    replay_ratio = 0.5
+    agent = DQN(
+        state_size=state_size,
+        action_size=action_size,
+        hidden_size=4,
+        batch_size=batch_size,
+        start_train_step=start_train_step,
+        run_step=run_step,
+    ).set_replay_ratio(replay_ratio)
+
+    check_interact(env, agent, run_step)
+
+    num_insert = run_step - start_train_step + 1
+    assert agent.num_learn == int(num_insert * replay_ratio)
+
+
+def test_set_precision(MockEnv):
+    state_size, action_size, action_type = [1, 3, 36, 36], 3, "discrete"
+    env = MockEnv(state_size, action_size, action_type, episode_len=10)
+
+    agent = DQN(
+        state_size=state_size[1:],
+        action_size=action_size,
+        hidden_size=4,
+        head="cnn",
+        batch_size=4,
+        start_train_step=4,
+    ).set_precision("bf16", "channels_last")
+
+    # test after set precision
+    conv = agent.network.head.conv1.weight
+    assert conv.is_contiguous(memory_format=torch.channels_last)
+    q = agent.network(agent.as_tensor(env.reset()))
+    assert q.dtype == torch.float32
+
+    check_interact(env, agent, 12)
+    assert agent.num_learn > 0
+
+
+def test_set_compile(MockEnv):
+    state_size, action_size, action_type = 2, 3, "discrete"
+    env = MockEnv(state_size, action_size, action_type, episode_len=10)
+
+    agent = DQN(
+        state_size=state_size,
+        action_size=action_size,
+        hidden_size=4,
+        batch_size=4,
+        start_train_step=4,
+    ).set_compile("trace")
+
+    # test compiled inference path is same as eager
+    state = agent.as_tensor(env.reset())
+    with torch.no_grad():
+        q = agent.network(state)
+        assert len(agent.network.forward.cache) == 1
+        assert torch.allclose(q, agent.network.forward.forward(state))
+
+    check_interact(env, agent, 12)
+
+    # test recompile after sync in
+    check_sync_in_out(agent)
+    assert len(agent.network.forward.cache) == 0
+
+
+def test_for_inference_dqn(MockEnv, tmp_path):
+    state_size, action_size, action_type = 2, 3, "discrete"
+    env = MockEnv(state_size, action_size, action_type, episode_len=10)
+    agent_config = {
+        "name": "dqn",
+        "state_size": state_size,
+        "action_size": action_size,
+        "hidden_size": 4,
+    }
+    agent = Agent(**agent_config)
+    path = str(tmp_path)
+    agent.save(path)
+
+    # test target network and optimizer are not built
+    inference_agent = Agent.for_inference(load_path=path, **agent_config)
+    assert inference_agent.inference
+    assert not hasattr(inference_agent, "target_network")
+    assert not hasattr(inference_agent, "optimizer")
+
+    state = env.reset()
+    inference_agent.act(state)
+    inference_agent.sync_in(**agent.sync_out())
@@ -37,7 +37,7 @@ def test_multistep(MockEnv):
     # test after inteact
     assert agent.epsilon == epsilon_min
     assert agent.time_t == run_step
-    assert agent.memory.size == (run_step - n_step + 1)
+    assert agent.memory.size == run_step
 
     # test save and load
     check_save_load(agent, "./tmp_test_multistep")
@@ -0,0 +1,63 @@
+import numpy as np
+import torch
+
+from core.agent.r2d2 import R2D2
+from .utils import check_interact, check_save_load, check_sync_in_out
+
+
+def test_r2d2(MockEnv):
+    state_size, action_size, action_type = 2, 3, "discrete"
+    episode_len = 10
+    env = MockEnv(state_size, action_size, action_type, episode_len)
+
+    hidden_size = 4
+    buffer_size, batch_size, start_train_step, target_update_period = 100, 4, 8, 5
+    run_step = 20
+    seq_len, burn_in = 6, 2
+    agent = R2D2(
+        state_size=state_size,
+        action_size=action_size,
+        hidden_size=hidden_size,
+        buffer_size=buffer_size,
+        batch_size=batch_size,
+        start_train_step=start_train_step,
+        target_update_period=target_update_period,
+        run_step=run_step,
+        seq_len=seq_len,
+        burn_in=burn_in,
+    )
+
+    # test after initialize
+    assert agent.action_type == action_type
+    assert agent.overlap == burn_in
+
+    # test inteact
+    check_interact(env, agent, run_step)
+
+    # test after inteact: sequences start at 0 and 4 in each episode
+    assert agent.time_t == run_step
+    assert agent.memory.size == 2 * (run_step // episode_len)
+    assert agent.num_learn > 0
+
+    # test hidden state is carried across act, and reset at the end of episode
+    state = env.reset()
+    hidden = agent.act(state)["hidden"]
+    assert hidden.shape == (1, 2, hidden_size)
+    assert not torch.equal(agent.hidden[0], torch.zeros_like(agent.hidden[0]))
+    next_state, reward, _ = env.step(hidden)
+    transition = {
+        "state": state,
+        "next_state": next_state,
+        "reward": reward,
+        "done": np.array([[True]]),
+        "action": np.array([[0]]),
+        "hidden": hidden,
+    }
+    agent.interact_callback(transition)
+    assert torch.equal(agent.hidden[0], torch.zeros_like(agent.hidden[0]))
+
+    # test save and load
+    check_save_load(agent, "./tmp_test_r2d2")
+
+    # test sync in and out
+    check_sync_in_out(agent)
@@ -1,3 +1,7 @@
+import pickle
+import torch
+
+from core.agent import Agent
 from core.agent.sac import SAC
 from .utils import check_interact, check_save_load, check_sync_in_out
 
@@ -78,3 +82,36 @@ def test_static_alpha_sac(MockEnv):
 
     # test sync in and out
     check_sync_in_out(agent)
+
+
+def test_for_inference(MockEnv, tmp_path):
+    state_size, action_size, action_type = 2, 3, "continuous"
+    env = MockEnv(state_size, action_size, action_type, episode_len=10)
+    agent_config = {
+        "name": "sac",
+        "state_size": state_size,
+        "action_size": action_size,
+        "hidden_size": 4,
+        "buffer_size": 1000,
+    }
+    agent = Agent(**agent_config, use_dynamic_alpha=True)
+    path = str(tmp_path)
+    agent.save(path)
+
+    inference_agent = Agent.for_inference(
+        load_path=path, use_dynamic_alpha=True, **agent_config
+    )
+
+    # test after init
+    for key in ["critic", "target_critic", "actor_optimizer", "critic_optimizer"]:
+        assert not hasattr(inference_agent, key)
+    assert inference_agent.alpha_optimizer is None
+    assert inference_agent.memory.buffer_size == 1
+    assert len(pickle.dumps(inference_agent)) < len(pickle.dumps(agent))
+    for p, q in zip(agent.actor.parameters(), inference_agent.actor.parameters()):
+        assert torch.equal(p, q)
+
+    # test act and sync in
+    state = env.reset()
+    inference_agent.act(state)
+    inference_agent.sync_in(**agent.sync_out())
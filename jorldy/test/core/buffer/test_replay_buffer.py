@@ -34,3 +34,59 @@ def test_replay_buffer(mock_transition):
         else:
             assert isinstance(val, np.ndarray)
             assert val.shape == (batch_size, *mock_transition[0][key].shape[1:])
+
+
+def test_replay_buffer_n_step():
+    buffer_size, gamma = 10, 0.5
+    memory = ReplayBuffer(buffer_size=buffer_size)
+
+    # episode 0 of 4 steps (t=0..3), and episode 1 (t=4..) which is still running
+    for t in range(7):
+        transition = {
+            "state": np.full((1, 2), t),
+            "action": np.full((1, 1), t),
+            "reward": np.ones((1, 1)),
+            "next_state": np.full((1, 2), t + 1),
+            "done": np.array([[float(t == 3)]]),
+            "episode": np.array([[int(t > 3)]]),
+        }
+        memory.store([transition])
+
+    batch_idx = np.array([0, 2, 3, 4, 5, 6])
+    for n_step in [1, 3]:
+        transitions = memory.n_step_transition(batch_idx, n_step, gamma)
+        assert "episode" not in transitions
+        assert (transitions["state"][:, 0] == batch_idx).all()
+
+    # n-step windows are truncated at the end of an episode and at the newest transition
+    num_step = np.array([3, 2, 1, 3, 2, 1])
+    assert (transitions["next_state"][:, 0] == batch_idx + num_step).all()
+    assert np.allclose(transitions["reward"][:, 0], 2 - 0.5 ** (num_step - 1))
+    assert (transitions["done"][:, 0] == [0, 1, 1, 0, 0, 0]).all()
+    assert np.allclose(transitions["discount"][:, 0], gamma ** num_step)
+
+    # windows are truncated at the write head after the buffer wraps around
+    for t in range(7, 12):
+        transition["state"] = np.full((1, 2), t)
+        transition["next_state"] = np.full((1, 2), t + 1)
+        transition["done"] = np.zeros((1, 1))
+        memory.store([transition])
+    transitions = memory.n_step_transition(np.array([9, 1]), 3, gamma)
+    assert (transitions["next_state"][:, 0] == [12, 12]).all()
+
+
+def test_replay_buffer_num_envs(mock_transition):
+    num_envs = 3
+    memory = ReplayBuffer(buffer_size=10)
+
+    # transitions of vectorized envs are stored per env
+    transition = {
+        key: [np.repeat(v, num_envs, axis=0) for v in val]
+        if isinstance(val, list)
+        else np.repeat(val, num_envs, axis=0)
+        for key, val in mock_transition[0].items()
+    }
+    memory.store([transition])
+    assert memory.size == num_envs
+    assert memory.buffer[0]["state"].shape == mock_transition[0]["state"].shape
+    assert memory.buffer[0]["multi_modal"][0].shape == (1, 3, 8, 8)
@@ -36,3 +36,23 @@ def test_rollout_buffer(mock_transition):
 
     # test after sample
     assert memory.size == 0
+
+
+def test_rollout_buffer_num_envs():
+    num_envs, n_step = 3, 4
+    memory = RolloutBuffer()
+
+    for t in range(n_step):
+        memory.store(
+            [
+                {
+                    "state": np.stack([[t, e] for e in range(num_envs)]),
+                    "done": np.zeros((num_envs, 1)),
+                }
+            ]
+        )
+
+    # transitions of vectorized envs are stacked env-major, n_step contiguous steps per env
+    state = memory.sample()["state"].reshape(num_envs, n_step, 2)
+    assert (state[..., 0] == np.arange(n_step)).all()
+    assert (state[..., 1] == np.arange(num_envs)[:, None]).all()
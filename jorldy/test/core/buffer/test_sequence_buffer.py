@@ -0,0 +1,46 @@
+import numpy as np
+
+from core.buffer.sequence_buffer import SequenceBuffer
+
+
+def test_sequence_buffer():
+    buffer_size, seq_len, overlap = 10, 4, 2
+    memory = SequenceBuffer(buffer_size, seq_len, overlap)
+
+    # test build: sequences of an episode of 9 steps start at 0, 2, 4 and 6
+    sequences = []
+    for t in range(9):
+        transition = {
+            "state": np.full((1, 2), t),
+            "action": np.full((1, 1), t),
+            "reward": np.full((1, 1), t),
+            "next_state": np.full((1, 2), t + 1),
+            "done": np.array([[t == 8]]),
+            "hidden": np.full((1, 2, 3), t),
+        }
+        sequence = memory.build(transition)
+        if sequence:
+            sequences.append(sequence)
+    assert len(sequences) == 4
+    assert [s["hidden"][0, 0, 0] for s in sequences] == [0, 2, 4, 6]
+    assert [s["start"].item() for s in sequences] == [1, 0, 0, 0]
+    assert [s["next_state"][0, 0, 0] for s in sequences] == [4, 6, 8, 9]
+    for s in sequences:
+        assert s["state"].shape == (1, seq_len, 2)
+        assert s["next_state"].shape == (1, 1, 2)
+        assert s["hidden"].shape == (1, 2, 3)
+
+    # test padding after the end of an episode
+    assert sequences[-1]["mask"].ravel().tolist() == [1, 1, 1, 0]
+    assert sequences[-1]["action"].ravel().tolist() == [6, 7, 8, 0]
+    assert len(memory.tmp_buffer) == 0
+
+    # test store and sample
+    memory.store(sequences)
+    assert memory.size == len(sequences)
+    batch_size = 8
+    transitions = memory.sample(batch_size)
+    assert transitions["state"].shape == (batch_size, seq_len, 2)
+    assert transitions["mask"].shape == (batch_size, seq_len, 1)
+    assert transitions["hidden"].shape == (batch_size, 2, 3)
+    assert transitions["start"].shape == (batch_size, 1)
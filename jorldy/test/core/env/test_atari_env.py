@@ -97,3 +97,17 @@ def test_montezuma_revenge(MockAgent):
     agent = MockAgent(env.state_size, env.action_size, env.action_type)
 
     check_env(env, agent)
+
+
+def test_breakout_grayscale(MockAgent):
+    env = Breakout(obs_type="grayscale")
+    agent = MockAgent(env.state_size, env.action_size, env.action_type)
+
+    check_env(env, agent)
+
+
+def test_breakout_frame_skip(MockAgent):
+    env = Breakout(frame_skip=4, max_pool=True)
+    agent = MockAgent(env.state_size, env.action_size, env.action_type)
+
+    check_env(env, agent)
@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+from core.env.utils import ImgProcessor, FrameStacker
+
+
+def test_convert_imgs():
+    imgs = np.random.randint(0, 256, size=(5, 64, 48, 3), dtype=np.uint8)
+    gray_imgs = np.stack([cv2.cvtColor(img, cv2.COLOR_RGB2GRAY) for img in imgs])
+    for img_width, img_height in [(48, 64), (32, 40)]:
+        dsize = (img_width, img_height)
+
+        # images are converted to gray before resizing
+        img_processor = ImgProcessor(True, img_width, img_height)
+        expected = np.stack([cv2.resize(img, dsize) for img in gray_imgs])[:, None]
+        assert np.array_equal(img_processor.convert_imgs(imgs), expected)
+        assert np.array_equal(img_processor.convert_imgs(gray_imgs), expected)
+        assert np.array_equal(img_processor.convert_img(imgs[0]), expected[0])
+
+        img_processor = ImgProcessor(False, img_width, img_height)
+        expected = np.stack([cv2.resize(img, dsize) for img in imgs])
+        expected = expected.transpose(0, 3, 1, 2)
+        assert np.array_equal(img_processor.convert_imgs(imgs), expected)
+        assert np.array_equal(img_processor.convert_img(imgs[0]), expected[0])
+
+
+def test_frame_stacker():
+    num_envs, stack_frame = 2, 3
+    frame_stacker = FrameStacker(num_envs, stack_frame, [1, 2, 2])
+    frame = lambda t: np.full((num_envs, 1, 2, 2), t)
+
+    frame_stacker.reset(frame(0))
+    assert frame_stacker.state.shape == (num_envs, stack_frame, 2, 2)
+    assert (frame_stacker.state[:, :, 0, 0] == 0).all()
+
+    # frames are stacked from the oldest to the newest through the ring buffer
+    for t in range(1, 6):
+        frame_stacker.push(frame(t))
+        state = frame_stacker.state
+        assert (state[:, :, 0, 0] == np.arange(t - 2, t + 1).clip(0)).all()
+        assert np.shares_memory(state, frame_stacker.buffer)
+        assert not state.flags.writeable
+
+    # only masked envs are reset
+    frame_stacker.reset(frame(9)[:1], np.array([False, True]))
+    assert (frame_stacker.state[0, :, 0, 0] == [3, 4, 5]).all()
+    assert (frame_stacker.state[1, :, 0, 0] == 9).all()
@@ -1,4 +1,9 @@
+from types import SimpleNamespace
+
+import numpy as np
+
 from .utils import check_env
+from core.env import mlagent
 from core.env.mlagent import HopperMLAgent, PongMLAgent, DroneDeliveryMLAgent
 
 
@@ -21,3 +26,98 @@ def test_pong_mlagent(MockAgent):
 #     agent = MockAgent(env.state_size, env.action_size, env.action_type)
 
 #     check_env(env, agent)
+
+
+class _MockSteps:
+    def __init__(self, agent_id, obs, reward):
+        self.agent_id = np.array(agent_id, dtype=np.int32)
+        self.obs = [obs]
+        self.reward = np.array(reward, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.agent_id)
+
+
+class _MockUnityEnvironment:
+    """Stand-in of a Unity scene with agents which end their episodes at different times."""
+
+    BASE_ENVIRONMENT_PORT = 5005
+    agent_id = [3, 7, 11]
+    episode_len = [2, 3, 4]
+    state_size = 4
+
+    def __init__(self, **kwargs):
+        action_spec = SimpleNamespace(is_continuous=lambda: True)
+        self.behavior_specs = {"mock": SimpleNamespace(action_spec=action_spec)}
+        self.actions = []
+
+    def reset(self):
+        self.t = np.zeros(len(self.agent_id), dtype=np.int64)
+        self.num_step = 0
+        self.term = []
+
+    def obs(self, idx):
+        # states of each agent are its id and step in the episode.
+        return np.array(
+            [[self.agent_id[i], self.t[i]] + [0] * (self.state_size - 2) for i in idx],
+            dtype=np.float32,
+        ).reshape(-1, self.state_size)
+
+    def get_steps(self, behavior_name):
+        # the order of agents in the steps changes every step.
+        idx = list(np.roll(range(len(self.agent_id)), self.num_step))
+        dec = _MockSteps([self.agent_id[i] for i in idx], self.obs(idx), [1.0] * 3)
+        term_idx = [i for i in idx if i in self.term]
+        term = _MockSteps(
+            [self.agent_id[i] for i in term_idx],
+            self.obs(term_idx) + 100,
+            [-1.0] * len(term_idx),
+        )
+        return dec, term
+
+    def set_actions(self, behavior_name, action_tuple):
+        self.actions.append(action_tuple.continuous)
+
+    def step(self):
+        self.num_step += 1
+        self.t += 1
+        self.term = [i for i in range(len(self.t)) if self.t[i] == self.episode_len[i]]
+        self.t[self.term] = 0
+
+    def close(self):
+        pass
+
+
+def test_mlagent_num_envs(MockAgent, monkeypatch):
+    monkeypatch.setattr(mlagent, "UnityEnvironment", _MockUnityEnvironment)
+    env = HopperMLAgent()
+    env.state_size, env.action_size = _MockUnityEnvironment.state_size, 2
+    agent = MockAgent(env.state_size, env.action_size, env.action_type)
+
+    # every agent of the behavior is an env of the batch
+    assert env.num_envs == len(_MockUnityEnvironment.agent_id)
+    check_env(env, agent)
+
+    env = HopperMLAgent()
+    state = env.reset()
+    assert (state[:, 0] == _MockUnityEnvironment.agent_id).all()
+    for t in range(1, 5):
+        action = np.arange(env.num_envs)[:, None].repeat(2, axis=1)
+        next_state, reward, done = env.step(action)
+
+        # actions are given in the order of the decision steps
+        assert (env.env.actions[-1][:, 0] == np.roll(range(env.num_envs), t - 1)).all()
+
+        # agents end their episodes at different times with their terminal states
+        expected_done = t % np.array(_MockUnityEnvironment.episode_len) == 0
+        assert (done[:, 0] == expected_done).all()
+        assert (next_state[done[:, 0], 0] >= 100).all()
+        step = t % np.array(_MockUnityEnvironment.episode_len)
+        assert (next_state[~done[:, 0], 1] == step[~done[:, 0]]).all()
+        assert (reward[:, 0] == np.where(expected_done, -1.0, 1.0)).all()
+
+        # the first states of the next episodes are returned by reset
+        state = env.reset() if np.any(done) else next_state
+        assert (state[done[:, 0], 1] == 0).all()
+    # score is the mean score of the agents which ended their episodes
+    assert env.score == np.mean([1.0 - 1.0, 1.0 * 3 - 1.0])
@@ -129,3 +129,10 @@ def test_starpilot(MockAgent):
     agent = MockAgent(env.state_size, env.action_size, env.action_type)
 
     check_env(env, agent)
+
+
+def test_procgen_num_envs(MockAgent):
+    env = Coinrun(num_envs=4)
+    agent = MockAgent(env.state_size, env.action_size, env.action_type)
+
+    check_env(env, agent)
@@ -241,3 +241,37 @@ def test_continuous_icm_multi_call():
     assert out[0].shape == (batch_size,)
     assert out[1].shape == ()
     assert out[2].shape == ()
+
+
+def test_icm_forward_index():
+    D_out, D_hidden, num_workers, gamma, eta = 3, 4, 1, 0.99, 0.1
+    batch_size = 5
+    for Net, D_in in [
+        (ICM_MLP, 2),
+        (ICM_CNN, [3, 36, 36]),
+        (ICM_Multi, [[3, 36, 36], 2]),
+    ]:
+        net = Net(
+            D_in=D_in,
+            D_out=D_out,
+            D_hidden=D_hidden,
+            num_workers=num_workers,
+            gamma=gamma,
+            eta=eta,
+            action_type="continuous",
+            batch_norm=False,
+        )
+        obs = (
+            [torch.rand((batch_size, *D_in[0])), torch.rand((batch_size, D_in[1]))]
+            if Net is ICM_Multi
+            else torch.rand((batch_size, *([D_in] if Net is ICM_MLP else D_in)))
+        )
+        action = torch.rand((batch_size - 1, D_out))
+        s_idx, s_next_idx = torch.arange(batch_size - 1), torch.arange(1, batch_size)
+
+        # forward with indices of observations is the same as forward with the observations
+        index = lambda x, idx: [_x[idx] for _x in x] if isinstance(x, list) else x[idx]
+        expected = net(index(obs, s_idx), action, index(obs, s_next_idx))
+        out = net.forward_index(obs, action, s_idx, s_next_idx)
+        for o, e in zip(out, expected):
+            assert torch.allclose(o, e, atol=1e-6)
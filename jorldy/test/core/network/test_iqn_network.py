@@ -18,3 +18,7 @@ def test_iqn_call():
 
     assert (tau_min <= out[1]).all()
     assert (tau_max >= out[1]).all()
+
+    # test cosine basis is a buffer, not saved in the state dict
+    assert any(buffer is net.i_pi for buffer in net.buffers())
+    assert "i_pi" not in net.state_dict()
@@ -0,0 +1,100 @@
+import copy
+
+import torch
+
+from core.network.utils import (
+    LossScaler,
+    RewardForwardFilter,
+    RunningMeanStd,
+    set_compile,
+    set_mixed_precision,
+    update_target_network,
+)
+
+
+def test_mixed_precision_chained():
+    torch.manual_seed(0)
+    actor, critic = torch.nn.Linear(4, 4), torch.nn.Linear(4, 1)
+    x = torch.rand(8, 4)
+    critic(actor(x)).mean().backward()
+    grads = [param.grad.clone() for param in actor.parameters()]
+    actor.zero_grad()
+
+    loss_scaler = LossScaler(init_scale=1024.0)
+    # set twice to check that gradients are unscaled once
+    for _ in range(2):
+        for module in [actor, critic]:
+            set_mixed_precision(module, "cpu", "bf16", loss_scaler=loss_scaler)
+
+    # test gradients of upstream network are scaled and unscaled once
+    loss = critic(actor(x)).mean()
+    (loss * loss_scaler.scale).backward()
+    for param, grad in zip(actor.parameters(), grads):
+        assert torch.allclose(param.grad, grad, rtol=0.05, atol=1e-3)
+
+
+def test_set_compile_fallback():
+    class Unsupported(torch.nn.Module):
+        def forward(self, x):
+            return x.sum().item()
+
+    module = set_compile(Unsupported())
+    with torch.no_grad():
+        assert module(torch.ones(2)) == 2.0
+    assert list(module.forward.cache.values()) == [None]
+
+
+def test_update_target_network():
+    source = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.BatchNorm1d(4))
+    target = copy.deepcopy(source)
+    source(torch.randn(8, 3)).sum().backward()
+    with torch.no_grad():
+        for param in source.parameters():
+            param.add_(1.0)
+    target_state = copy.deepcopy(target.state_dict())
+
+    # test polyak averaging of parameters and floating point buffers
+    tau = 0.1
+    update_target_network(target, source, tau)
+    for key, value in target.state_dict().items():
+        expected = source.state_dict()[key]
+        if value.is_floating_point():
+            expected = (1 - tau) * target_state[key] + tau * expected
+        assert torch.allclose(value, expected)
+
+    # test copy
+    update_target_network(target, source)
+    for key, value in target.state_dict().items():
+        assert torch.equal(value, source.state_dict()[key])
+
+
+def test_running_mean_std():
+    torch.manual_seed(0)
+    x = torch.randn(1000, 3) * 5 + 1e3
+
+    # moments of batches merged in any order match the moments of all inputs
+    rms = RunningMeanStd(3, epsilon=0)
+    for _x in x.split([1, 99, 400, 500]):
+        rms.update(_x)
+    rms_a, rms_b = RunningMeanStd(3, epsilon=0), RunningMeanStd(3, epsilon=0)
+    rms_a.update(x[:300])
+    rms_b.update(x[300:])
+    rms_b.merge(rms_a)
+    for _rms in [rms, rms_b]:
+        assert _rms.count.item() == len(x)
+        assert torch.allclose(_rms.mean, x.mean(0))
+        assert torch.allclose(_rms.var, x.var(0, unbiased=False), rtol=1e-3)
+
+
+def test_reward_forward_filter():
+    torch.manual_seed(0)
+    gamma, num_workers = 0.99, 3
+    rews = torch.rand(300, num_workers)
+
+    # the vectorized scan over time is the same as updating each step
+    rff, expected_rff = [RewardForwardFilter(gamma, num_workers) for _ in range(2)]
+    for _rews in rews.split([280, 20]):
+        rewems = rff.update(_rews)
+        expected = torch.stack([expected_rff.update(r).clone() for r in _rews])
+        assert torch.allclose(rewems, expected, atol=1e-5)
+    assert torch.allclose(rff.rewems, expected_rff.rewems, atol=1e-5)
@@ -0,0 +1,22 @@
+import torch
+
+from core.network.r2d2 import R2D2
+
+
+def test_r2d2_call():
+    D_in, D_out, D_hidden = 2, 3, 4
+    net = R2D2(D_in=D_in, D_out=D_out, D_hidden=D_hidden)
+
+    batch_size, seq_len = 5, 6
+    mock_input = torch.rand((batch_size, seq_len, D_in))
+    out, hidden_in, hidden_out = net(mock_input)
+
+    assert out.shape == (batch_size, seq_len, D_out)
+    assert hidden_in[0].shape == (1, batch_size, D_hidden)
+    assert hidden_out[0].shape == (1, batch_size, D_hidden)
+
+    # test unrolling step by step is same as the whole sequence
+    hidden = None
+    for t in range(seq_len):
+        out_t, _, hidden = net(mock_input[:, t : t + 1], hidden)
+    assert torch.allclose(out_t[:, 0], out[:, -1], atol=1e-6)
@@ -85,3 +85,31 @@ def test_rnd_multi_call():
     out = net(*mock_input, update_ri=False)
 
     assert out.shape == (batch_size,)
+
+
+def test_rnd_cached_target():
+    D_out, D_hidden, num_workers, gamma_i = 3, 4, 1, 0.99
+    batch_size = 5
+    for Net, D_in in [
+        (RND_MLP, 2),
+        (RND_CNN, [3, 36, 36]),
+        (RND_Multi, [[3, 36, 36], 2]),
+    ]:
+        net = Net(
+            D_in=D_in,
+            D_out=D_out,
+            D_hidden=D_hidden,
+            num_workers=num_workers,
+            gamma_i=gamma_i,
+            batch_norm=False,
+        )
+        mock_input = (
+            [torch.rand((batch_size, *D_in[0])), torch.rand((batch_size, D_in[1]))]
+            if Net is RND_Multi
+            else torch.rand((batch_size, *([D_in] if Net is RND_MLP else D_in)))
+        )
+
+        # forward with the cached features of the target network is the same as without them
+        t = net.get_target(mock_input)
+        assert not t.requires_grad
+        assert torch.allclose(net(mock_input, t=t), net(mock_input))
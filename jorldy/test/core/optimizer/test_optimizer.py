@@ -0,0 +1,20 @@
+import torch
+
+from core.network.utils import LossScaler
+from core.optimizer import MixedPrecisionOptimizer
+
+
+def test_mixed_precision_optimizer():
+    param = torch.nn.Parameter(torch.zeros(2))
+    loss_scaler = LossScaler(init_scale=4.0, growth_interval=1)
+    optimizer = MixedPrecisionOptimizer(torch.optim.SGD([param], lr=1.0), loss_scaler)
+
+    # test skip step when gradients have inf
+    param.grad = torch.tensor([float("inf"), 1.0])
+    optimizer.step()
+    assert torch.equal(param, torch.zeros(2)) and loss_scaler.scale == 2.0
+
+    # test step and grow scale
+    param.grad = torch.ones(2)
+    optimizer.step()
+    assert torch.equal(param.detach(), -torch.ones(2)) and loss_scaler.scale == 4.0
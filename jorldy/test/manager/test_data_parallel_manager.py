@@ -0,0 +1,137 @@
+import socket
+import datetime
+import multiprocessing as mp
+
+import pytest
+import torch
+import torch.distributed as dist
+
+from core import Agent
+from manager.data_parallel_manager import DataParallelManager
+
+
+def test_data_parallel_manager(MockEnv):
+    state_size, action_size, action_type = 2, 3, "discrete"
+    env = MockEnv(state_size, action_size, action_type, episode_len=10)
+    agent_config = {
+        "name": "dqn",
+        "state_size": state_size,
+        "action_size": action_size,
+        "hidden_size": 4,
+        "batch_size": 4,
+        "start_train_step": 0,
+        "device": "cpu",
+    }
+
+    # test init
+    num_learners = 2
+    data_parallel_manager = DataParallelManager(
+        Agent, agent_config, num_learners, timeout=60
+    )
+    try:
+        agent = Agent(**agent_config).set_data_parallel()
+
+        # test scatter
+        state = env.reset()
+        for step in range(1, 4):
+            transitions = []
+            for _ in range(8):
+                action_dict = agent.act(state)
+                next_state, reward, done = env.step(action_dict["action"])
+                transitions.append(
+                    {
+                        "state": state,
+                        "next_state": next_state,
+                        "reward": reward,
+                        "done": done,
+                        **action_dict,
+                    }
+                )
+                state = next_state
+            shard = data_parallel_manager.scatter(transitions, step * 8)
+            assert len(shard) == len(transitions) // num_learners
+            agent.process(shard, step * 8)
+
+        data_parallel_manager.terminate()
+        assert not dist.is_initialized()
+    finally:
+        data_parallel_manager.kill()
+
+
+def check_data_parallel(rank, num_learners, init_method, agent_config, queue, done):
+    dist.init_process_group(
+        "gloo",
+        init_method=init_method,
+        rank=rank,
+        world_size=num_learners,
+        timeout=datetime.timedelta(seconds=60),
+    )
+    torch.manual_seed(rank)
+    agent = Agent(**agent_config).set_data_parallel()
+
+    # each learner samples different transitions
+    for step in range(1, 4):
+        transitions = [
+            {
+                "state": torch.rand(1, agent_config["state_size"]).numpy(),
+                "action": torch.randint(agent_config["action_size"], (1, 1)).numpy(),
+                "reward": torch.rand(1, 1).numpy(),
+                "next_state": torch.rand(1, agent_config["state_size"]).numpy(),
+                "done": torch.zeros(1, 1).numpy(),
+            }
+            for _ in range(4)
+        ]
+        agent.process(transitions, step * 4)
+
+    # learners keep same network
+    for param in agent.network.parameters():
+        gathered = [torch.zeros_like(param) for _ in range(num_learners)]
+        dist.all_gather(gathered, param.detach())
+        if not all(torch.equal(gathered[0], x) for x in gathered):
+            queue.put(False)
+            break
+    else:
+        queue.put(agent.num_learn > 0)
+    # keep the connections until all learners are checked
+    done.wait()
+
+
+def test_set_data_parallel():
+    agent_config = {
+        "name": "dqn",
+        "state_size": 2,
+        "action_size": 3,
+        "hidden_size": 4,
+        "batch_size": 4,
+        "start_train_step": 0,
+        "device": "cpu",
+    }
+    num_learners = 2
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        init_method = f"tcp://127.0.0.1:{sock.getsockname()[1]}"
+    ctx = mp.get_context("spawn")
+    queue, done = ctx.Queue(), ctx.Event()
+    learners = [
+        ctx.Process(
+            target=check_data_parallel,
+            args=(rank, num_learners, init_method, agent_config, queue, done),
+        )
+        for rank in range(num_learners)
+    ]
+    try:
+        for learner in learners:
+            learner.start()
+        results = [queue.get(timeout=120) for _ in learners]
+    finally:
+        done.set()
+        for learner in learners:
+            learner.join(timeout=10)
+            learner.terminate()
+    assert all(results)
+
+
+def test_data_parallel_learn_schedule():
+    agent = Agent(name="reinforce", state_size=2, action_size=3, device="cpu")
+    with pytest.raises(AssertionError):
+        agent.set_data_parallel()
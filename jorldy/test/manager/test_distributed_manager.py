@@ -1,6 +1,32 @@
+import os
+import numpy as np
+
 from manager.distributed_manager import DistributedManager
 
 
+class _VersionAgent:
+    def __init__(self, action_size):
+        self.action_size = action_size
+        self.version = 0
+
+    @classmethod
+    def for_inference(cls, *args, **kwargs):
+        return cls(*args, **kwargs)
+
+    def set_distributed(self, id):
+        return self
+
+    def act(self, state, training=True):
+        action = np.random.randint(0, self.action_size, size=(state.shape[0], 1))
+        return {"action": action, "version": np.array([[self.version]])}
+
+    def interact_callback(self, transition):
+        return transition
+
+    def sync_in(self, version):
+        self.version = version
+
+
 def test_distributed_manager(MockEnv, env_config, MockAgent, agent_config):
     # test init
     num_workers, mode = 2, "sync"
@@ -18,3 +44,31 @@ def test_distributed_manager(MockEnv, env_config, MockAgent, agent_config):
 
     # can not test run
     distributed_manager.terminate()
+
+
+def test_distributed_manager_pipelined(MockEnv, env_config, monkeypatch):
+    # ray workers import the mock classes from the test modules
+    test_path = os.path.dirname(os.path.abspath(__file__))
+    monkeypatch.setenv(
+        "PYTHONPATH", os.pathsep.join([test_path, os.path.dirname(test_path)])
+    )
+    num_workers, update_period = 2, 3
+    distributed_manager = DistributedManager(
+        Env=MockEnv,
+        env_config=env_config,
+        Agent=_VersionAgent,
+        agent_config={"action_size": env_config["action_size"]},
+        num_workers=num_workers,
+        mode="sync",
+        max_policy_lag=1,
+    )
+    try:
+        # learner version after k updates is k, batches are at most one update stale
+        for version in range(5):
+            transitions = distributed_manager.run(update_period)
+            assert len(transitions) == num_workers * update_period
+            versions = [transition["version"].item() for transition in transitions]
+            assert all(version - 1 <= v <= version for v in versions)
+            distributed_manager.sync({"version": version + 1})
+    finally:
+        distributed_manager.terminate()
@@ -0,0 +1,73 @@
+import numpy as np
+import torch
+
+from manager.local_distributed_manager import LocalDistributedManager
+
+
+class _VersionAgent:
+    def __init__(self, action_size):
+        self.action_size = action_size
+        self.version = torch.zeros(1)
+
+    @classmethod
+    def for_inference(cls, *args, **kwargs):
+        return cls(*args, **kwargs)
+
+    def set_distributed(self, id):
+        return self
+
+    def act(self, state, training=True):
+        action = np.random.randint(0, self.action_size, size=(state.shape[0], 1))
+        return {"action": action, "version": np.array([[self.version.item()]])}
+
+    def interact_callback(self, transition):
+        return transition
+
+    def sync_in(self, version):
+        self.version.copy_(version)
+
+    def sync_out(self, device="cpu"):
+        return {"version": self.version.to(device)}
+
+
+def check_versions(mode, max_policy_lag, MockEnv, env_config):
+    num_workers, update_period = 2, 3
+    distributed_manager = LocalDistributedManager(
+        Env=MockEnv,
+        env_config=env_config,
+        Agent=_VersionAgent,
+        agent_config={"action_size": env_config["action_size"]},
+        num_workers=num_workers,
+        mode=mode,
+        max_policy_lag=max_policy_lag,
+        timeout=60,
+    )
+    try:
+        for version in range(5):
+            transitions = distributed_manager.run(update_period)
+            assert len(transitions) % update_period == 0
+            versions = [transition["version"].item() for transition in transitions]
+            assert all(v <= version for v in versions)
+            if mode == "sync":
+                assert len(transitions) == num_workers * update_period
+                # learner version after k updates is k, batches are at most max_policy_lag updates stale
+                assert all(version - max_policy_lag <= v for v in versions)
+            distributed_manager.sync({"version": torch.full((1,), version + 1.0)})
+    finally:
+        distributed_manager.terminate()
+
+    # test after terminate
+    assert len(distributed_manager.running_ids) == 0
+    assert all(not actor.is_alive() for actor in distributed_manager.actors)
+
+
+def test_local_distributed_manager(MockEnv, env_config):
+    check_versions("sync", 0, MockEnv, env_config)
+
+
+def test_local_distributed_manager_pipelined(MockEnv, env_config):
+    check_versions("sync", 1, MockEnv, env_config)
+
+
+def test_local_distributed_manager_async(MockEnv, env_config):
+    check_versions("async", 0, MockEnv, env_config)
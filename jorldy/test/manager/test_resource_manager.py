@@ -0,0 +1,35 @@
+import os
+import torch
+
+from manager.resource_manager import ResourceManager
+
+
+def test_resource_manager(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)), False)
+    resource_manager = ResourceManager(num_workers=4, num_learners=2)
+
+    # test plan: 3 learner cores, 1 core for manage and interact, 4 actor cores
+    assert resource_manager.plan("learner", 0) == ([0], 1)
+    assert resource_manager.plan("learner", 1) == ([1], 1)
+    assert resource_manager.plan("manage") == ([3], 1)
+    assert resource_manager.plan("interact") == ([3], 1)
+    actor_cores = [resource_manager.plan("actor", id)[0] for id in range(4)]
+    assert actor_cores == [[4], [5], [6], [7]]
+
+    # test plan when actors outnumber cores
+    resource_manager = ResourceManager(num_workers=8, learner_cores=2)
+    assert resource_manager.plan("learner") == ([0, 1], 2)
+    assert resource_manager.plan("actor", 5) == ([3], 1)
+
+
+def test_resource_manager_apply(monkeypatch):
+    for key in ["OMP_NUM_THREADS", "MKL_NUM_THREADS"]:
+        monkeypatch.setenv(key, "")
+    num_threads = torch.get_num_threads()
+    resource_manager = ResourceManager(num_workers=1, pin_cores=False)
+    try:
+        cores, _num_threads = resource_manager.apply("actor", 0)
+        assert torch.get_num_threads() == _num_threads == 1
+        assert os.environ["OMP_NUM_THREADS"] == "1"
+    finally:
+        torch.set_num_threads(num_threads)